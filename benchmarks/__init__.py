@@ -0,0 +1,40 @@
+"""Performance benchmarks for the renderer hot paths.
+
+Run ``python -m benchmarks --help`` for the command line interface.
+"""
+
+from .generators import GENERATORS, chain, dag, dense_clusters, edit_stream, generate, scale_free
+from .harness import (
+    BENCHMARKS,
+    DEFAULT_THRESHOLDS,
+    BenchmarkResult,
+    Regression,
+    calibrate,
+    compare,
+    load_report,
+    median_result,
+    report,
+    run_suite,
+    write_report,
+)
+
+__all__ = [
+    "BENCHMARKS",
+    "DEFAULT_THRESHOLDS",
+    "GENERATORS",
+    "BenchmarkResult",
+    "Regression",
+    "calibrate",
+    "chain",
+    "compare",
+    "dag",
+    "dense_clusters",
+    "edit_stream",
+    "generate",
+    "load_report",
+    "median_result",
+    "report",
+    "run_suite",
+    "scale_free",
+    "write_report",
+]
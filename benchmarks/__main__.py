@@ -0,0 +1,94 @@
+"""Command line entry point: ``python -m benchmarks``."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Dict, List, Optional
+
+from .generators import GENERATORS
+from .harness import (
+    BENCHMARKS,
+    DEFAULT_MAX_ELEMENTS,
+    DEFAULT_NOISE_FLOOR_MS,
+    calibrate,
+    compare,
+    load_report,
+    report,
+    run_suite,
+    write_report,
+)
+
+
+def _thresholds(values: List[str]) -> Dict[str, float]:
+    parsed: Dict[str, float] = {}
+    for value in values:
+        metric, _, ratio = value.partition("=")
+        if not ratio:
+            raise argparse.ArgumentTypeError(f"threshold must look like metric=ratio, got {value!r}")
+        parsed[metric] = float(ratio)
+    return parsed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("--kinds", nargs="+", default=list(GENERATORS), choices=list(GENERATORS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1_000, 10_000])
+    parser.add_argument("--benchmarks", nargs="+", default=list(BENCHMARKS), choices=list(BENCHMARKS))
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=3, help="runs per benchmark; the median is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report to this path")
+    parser.add_argument(
+        "--baseline",
+        help="report recorded on this machine to compare against (exit code 1 on regression)",
+    )
+    parser.add_argument(
+        "--noise-floor-ms",
+        type=float,
+        default=DEFAULT_NOISE_FLOOR_MS,
+        help="ignore timing changes of results faster than this",
+    )
+    parser.add_argument(
+        "--threshold",
+        action="append",
+        default=[],
+        metavar="METRIC=RATIO",
+        help="override a regression threshold, e.g. p99_ms=2.0 or throughput=0.7",
+    )
+    parser.add_argument("--no-limits", action="store_true", help="run every benchmark at every size")
+    args = parser.parse_args(argv)
+
+    try:
+        thresholds = _thresholds(args.threshold)
+    except argparse.ArgumentTypeError as exc:
+        parser.error(str(exc))
+
+    # Calibrating on both sides of the suite tracks drift during the run.
+    before = calibrate()
+    results = run_suite(
+        kinds=args.kinds,
+        sizes=args.sizes,
+        benchmarks=args.benchmarks,
+        iterations=args.iterations,
+        seed=args.seed,
+        max_elements={} if args.no_limits else DEFAULT_MAX_ELEMENTS,
+        progress=lambda line: print(line, file=sys.stderr),
+        repeats=args.repeats,
+    )
+    calibration_ms = (before + calibrate()) / 2
+    if args.output:
+        write_report(args.output, report(results, seed=args.seed, calibration_ms=calibration_ms))
+    if not args.baseline:
+        return 0
+
+    regressions = compare(
+        results, load_report(args.baseline), thresholds, args.noise_floor_ms, calibration_ms=calibration_ms
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression.describe()}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
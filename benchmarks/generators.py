@@ -0,0 +1,178 @@
+"""Seeded synthetic graphs and edit streams for benchmarking."""
+
+from __future__ import annotations
+
+import random
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from renderer.models import Edge, Node
+from renderer.ot import GraphOperation, OperationType
+
+Graph = Tuple[List[Node], List[Edge]]
+
+
+def _nodes(count: int, rng: random.Random) -> List[Node]:
+    return [
+        Node(
+            id=f"n{index:07d}",
+            label=f"Topic {index % 997}",
+            trust=round(rng.uniform(0.2, 1.0), 3),
+            ambiguous=rng.random() < 0.05,
+        )
+        for index in range(count)
+    ]
+
+
+def _edges(pairs: List[Tuple[int, int]], rng: random.Random) -> List[Edge]:
+    return [
+        Edge(
+            id=f"e{index:07d}",
+            source=f"n{source:07d}",
+            target=f"n{target:07d}",
+            label="relates" if rng.random() < 0.2 else "",
+            weight=round(rng.uniform(0.5, 2.0), 3),
+        )
+        for index, (source, target) in enumerate(pairs)
+    ]
+
+
+def chain(node_count: int, seed: int = 0) -> Graph:
+    """A single path; the deepest possible DAG."""
+    rng = random.Random(seed)
+    pairs = [(index, index + 1) for index in range(node_count - 1)]
+    return _nodes(node_count, rng), _edges(pairs, rng)
+
+
+def dag(node_count: int, seed: int = 0, out_degree: int = 2, window: int = 50) -> Graph:
+    """Random DAG whose edges point forward to nearby nodes."""
+    rng = random.Random(seed)
+    pairs = []
+    for source in range(node_count - 1):
+        reach = min(window, node_count - source - 1)
+        for target in rng.sample(range(source + 1, source + reach + 1), min(out_degree, reach)):
+            pairs.append((source, target))
+    return _nodes(node_count, rng), _edges(pairs, rng)
+
+
+def dense_clusters(
+    node_count: int, seed: int = 0, cluster_size: int = 20, density: float = 0.3
+) -> Graph:
+    """Dense clusters connected by a sparse ring of bridge edges (with cycles)."""
+    rng = random.Random(seed)
+    pairs = []
+    starts = list(range(0, node_count, cluster_size))
+    for start in starts:
+        members = range(start, min(start + cluster_size, node_count))
+        for source in members:
+            for target in members:
+                if source != target and rng.random() < density:
+                    pairs.append((source, target))
+    for position, start in enumerate(starts[:-1]):
+        pairs.append((start, starts[position + 1]))
+    return _nodes(node_count, rng), _edges(pairs, rng)
+
+
+def scale_free(node_count: int, seed: int = 0, attachments: int = 2) -> Graph:
+    """Barabasi-Albert preferential attachment graph."""
+    rng = random.Random(seed)
+    pairs: List[Tuple[int, int]] = []
+    endpoints: List[int] = []
+    for source in range(node_count):
+        targets = set()
+        if endpoints:
+            while len(targets) < min(attachments, source):
+                targets.add(rng.choice(endpoints))
+        elif source:
+            targets.add(0)
+        for target in sorted(targets):
+            pairs.append((source, target))
+            endpoints.extend((source, target))
+    return _nodes(node_count, rng), _edges(pairs, rng)
+
+
+# Approximate edges per node, used to size graphs by total element count.
+GENERATORS: Dict[str, Tuple[Callable[..., Graph], float]] = {
+    "chain": (chain, 1.0),
+    "dag": (dag, 2.0),
+    "clusters": (dense_clusters, 5.7),
+    "scale_free": (scale_free, 2.0),
+}
+
+
+def generate(kind: str, elements: int, seed: int = 0) -> Graph:
+    """Builds a ``kind`` graph with roughly ``elements`` nodes plus edges."""
+    if kind not in GENERATORS:
+        raise ValueError(f"unknown graph kind {kind!r}; expected one of {sorted(GENERATORS)}")
+    factory, edges_per_node = GENERATORS[kind]
+    return factory(max(2, int(round(elements / (1.0 + edges_per_node)))), seed=seed)
+
+
+def edit_stream(
+    nodes: List[Node],
+    edges: List[Edge],
+    count: int,
+    start_version: int,
+    seed: int = 0,
+    session_id: str = "bench",
+) -> Iterator[GraphOperation]:
+    """Yields ``count`` valid, consecutively versioned operations.
+
+    The mix resembles interactive editing: mostly node/edge additions and
+    updates, with occasional removals.
+    """
+    rng = random.Random(seed)
+    node_ids = [node.id for node in nodes]
+    edge_ids = [edge.id for edge in edges]
+    live_nodes = set(node_ids)
+    live_edges = set(edge_ids)
+    incident: Dict[str, set] = {}
+    for edge in edges:
+        incident.setdefault(edge.source, set()).add(edge.id)
+        incident.setdefault(edge.target, set()).add(edge.id)
+    fresh = 0
+    for offset in range(count):
+        version = start_version + offset
+        roll = rng.random()
+        if roll < 0.3 or len(live_nodes) < 2:
+            fresh += 1
+            node_id = f"x{fresh:07d}"
+            node_ids.append(node_id)
+            live_nodes.add(node_id)
+            payload = {"id": node_id, "label": f"New {fresh}", "trust": round(rng.random(), 3)}
+            op_type = OperationType.ADD_NODE
+        elif roll < 0.55:
+            op_type = OperationType.UPDATE_NODE
+            payload = {"id": _pick(rng, node_ids, live_nodes), "trust": round(rng.random(), 3)}
+        elif roll < 0.8:
+            fresh += 1
+            edge_id = f"y{fresh:07d}"
+            source, target = _pick(rng, node_ids, live_nodes), _pick(rng, node_ids, live_nodes)
+            edge_ids.append(edge_id)
+            live_edges.add(edge_id)
+            incident.setdefault(source, set()).add(edge_id)
+            incident.setdefault(target, set()).add(edge_id)
+            payload = {"id": edge_id, "source": source, "target": target}
+            op_type = OperationType.ADD_EDGE
+        elif roll < 0.9 and live_edges:
+            op_type = OperationType.UPDATE_EDGE
+            payload = {"id": _pick(rng, edge_ids, live_edges), "weight": round(rng.uniform(0.5, 2), 3)}
+        elif roll < 0.97 and live_edges:
+            op_type = OperationType.REMOVE_EDGE
+            edge_id = _pick(rng, edge_ids, live_edges)
+            live_edges.discard(edge_id)
+            payload = {"id": edge_id}
+        else:
+            op_type = OperationType.REMOVE_NODE
+            node_id = _pick(rng, node_ids, live_nodes)
+            live_nodes.discard(node_id)
+            # The engine drops incident edges along with the node.
+            live_edges -= incident.pop(node_id, set())
+            payload = {"id": node_id}
+        yield GraphOperation(type=op_type, payload=payload, session_id=session_id, version=version)
+
+
+def _pick(rng: random.Random, pool: List[str], live: set) -> str:
+    while True:
+        candidate = pool[rng.randrange(len(pool))]
+        if candidate in live:
+            return candidate
@@ -0,0 +1,402 @@
+"""Benchmark runner, JSON reports and baseline comparison.
+
+Timings depend on the host, so a baseline is only meaningful when it was
+recorded on the same machine as the run it is compared with, e.g. by
+running the suite on the base commit and then on the change in one CI job.
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import math
+import platform
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from renderer.exporters import BUNDLE_FORMATS, ExportService
+from renderer.models import Edge, GraphVersion, Node
+from renderer.ot import CollaborationEngine
+from renderer.quality import QualityAnalyzer
+from renderer.storage import GraphPersistence
+
+from .generators import GENERATORS, edit_stream, generate
+
+# Benchmarks whose cost grows super-linearly (layout) or that replay many
+# versions are skipped above these sizes unless limits are disabled.
+DEFAULT_MAX_ELEMENTS: Dict[str, int] = {
+    "engine.apply": 100_000,
+    "storage.history": 100_000,
+    "exporters.bundle": 20_000,
+}
+
+# Allowed ratio of current to baseline value before a metric counts as a
+# regression; throughput is "higher is better" so its ratio is a floor.
+# Separate processes on a shared host drift by up to ~1.6x on identical
+# code, so timings only flag larger slowdowns. With a handful of iterations
+# p99 is effectively the slowest sample and gets the widest margin; peak
+# memory is close to deterministic.
+DEFAULT_THRESHOLDS: Dict[str, float] = {
+    "p50_ms": 1.75,
+    "p99_ms": 2.5,
+    "peak_memory_bytes": 1.25,
+    "throughput": 0.57,
+}
+_HIGHER_IS_BETTER = {"throughput"}
+_TIMINGS = {"p50_ms", "p90_ms", "p99_ms", "max_ms", "throughput"}
+
+# Timings of results faster than this are dominated by scheduler and GC
+# jitter; only their memory is compared.
+DEFAULT_NOISE_FLOOR_MS = 1.0
+
+# The bundle benchmark rasterizes PNG too, capped so large graphs measure
+# the rasterizer rather than allocating a huge canvas.
+BENCH_PNG_MAX_DIMENSION = 1000
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    graph: str
+    elements: int
+    iterations: int
+    units: str
+    throughput: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+    peak_memory_bytes: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}/{self.graph}/{self.elements}"
+
+    def to_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+
+@dataclass
+class Regression:
+    key: str
+    metric: str
+    baseline: float
+    current: float
+    threshold: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else math.inf
+
+    def describe(self) -> str:
+        return (
+            f"{self.key} {self.metric}: {self.current:.4g} vs baseline {self.baseline:.4g} "
+            f"(x{self.ratio:.2f}, threshold x{self.threshold:.2f})"
+        )
+
+
+@dataclass
+class _Case:
+    """One benchmark: ``run()`` performs one measured iteration of ``units`` items."""
+
+    run: Callable[[], object]
+    units: int
+    unit_name: str
+    setup: Callable[[], None] = field(default=lambda: None)
+
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of ``samples``."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def measure(
+    name: str,
+    graph: str,
+    elements: int,
+    case: _Case,
+    iterations: int,
+    warmup: int = 1,
+) -> BenchmarkResult:
+    """Times ``iterations`` runs, then re-runs once under tracemalloc for peak memory."""
+    for _ in range(warmup):
+        case.setup()
+        case.run()
+    samples: List[float] = []
+    for _ in range(iterations):
+        case.setup()
+        gc.collect()
+        started = time.perf_counter()
+        case.run()
+        samples.append(time.perf_counter() - started)
+
+    case.setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        case.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    total = sum(samples)
+    latencies = [sample * 1000.0 for sample in samples]
+    return BenchmarkResult(
+        name=name,
+        graph=graph,
+        elements=elements,
+        iterations=iterations,
+        units=case.unit_name,
+        throughput=(case.units * len(samples) / total) if total else 0.0,
+        p50_ms=percentile(latencies, 0.5),
+        p90_ms=percentile(latencies, 0.9),
+        p99_ms=percentile(latencies, 0.99),
+        max_ms=max(latencies),
+        peak_memory_bytes=peak,
+    )
+
+
+def median_result(results: Sequence[BenchmarkResult]) -> BenchmarkResult:
+    """Per-metric median of repeated measurements of the same benchmark."""
+    first = results[0]
+    if any(result.key != first.key for result in results):
+        raise ValueError("can only combine results of the same benchmark")
+    return BenchmarkResult(
+        name=first.name,
+        graph=first.graph,
+        elements=first.elements,
+        iterations=sum(result.iterations for result in results),
+        units=first.units,
+        throughput=statistics.median(result.throughput for result in results),
+        p50_ms=statistics.median(result.p50_ms for result in results),
+        p90_ms=statistics.median(result.p90_ms for result in results),
+        p99_ms=statistics.median(result.p99_ms for result in results),
+        max_ms=statistics.median(result.max_ms for result in results),
+        peak_memory_bytes=int(statistics.median(result.peak_memory_bytes for result in results)),
+    )
+
+
+def calibrate(repeats: int = 5) -> float:
+    """Median milliseconds of a fixed pure-Python workload.
+
+    Recorded with every report so a comparison can factor out how fast the
+    host happens to be running, e.g. under frequency scaling or neighbours.
+    """
+    samples: List[float] = []
+    for _ in range(repeats):
+        gc.collect()
+        started = time.perf_counter()
+        squares = {str(index): index * index for index in range(100_000)}
+        sorted(squares.items(), key=lambda item: item[1] % 97)
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return statistics.median(samples)
+
+
+def _engine_apply(nodes: List[Node], edges: List[Edge], seed: int) -> _Case:
+    state: Dict[str, object] = {}
+
+    def setup() -> None:
+        # One engine per case: every measured call applies the next edit.
+        if state:
+            return
+        persistence = GraphPersistence()
+        base = persistence.save_version("bench", nodes, edges, author_session=None)
+        state["engine"] = CollaborationEngine(persistence)
+        state["ops"] = iter(edit_stream(nodes, edges, 1_000_000, base.version, seed=seed))
+
+    def run() -> None:
+        state["engine"].apply("bench", next(state["ops"]))
+
+    return _Case(run=run, units=1, unit_name="ops", setup=setup)
+
+
+def _persistence_with(nodes: List[Node], edges: List[Edge], versions: int) -> GraphPersistence:
+    persistence = GraphPersistence()
+    for _ in range(versions):
+        persistence.save_version("bench", nodes, edges, author_session="bench")
+    return persistence
+
+
+def _read(versions: Iterable[GraphVersion]) -> int:
+    """Materializes lazily loaded versions so decoding is part of the timing."""
+    return sum(len(list(version.nodes)) + len(list(version.edges)) for version in versions)
+
+
+def build_cases(nodes: List[Node], edges: List[Edge], seed: int) -> Dict[str, _Case]:
+    """Hot paths exercised for one synthetic graph."""
+    elements = len(nodes) + len(edges)
+    store: Dict[str, GraphPersistence] = {}
+    analyzer = QualityAnalyzer()
+    exporters: Dict[str, ExportService] = {}
+    version = GraphVersion(graph_id="bench", version=1, nodes=nodes, edges=edges)
+
+    def fresh_store() -> None:
+        store["save"] = GraphPersistence()
+
+    def fresh_exporter() -> None:
+        # ExportService caches layouts per graph; start cold every iteration.
+        exporters["bundle"] = ExportService()
+
+    def loaded_store() -> None:
+        if "load" not in store:
+            store["load"] = _persistence_with(nodes, edges, 3)
+
+    return {
+        "engine.apply": _engine_apply(nodes, edges, seed),
+        "storage.save_version": _Case(
+            run=lambda: store["save"].save_version("bench", nodes, edges, author_session="bench"),
+            units=elements,
+            unit_name="elements",
+            setup=fresh_store,
+        ),
+        "storage.load_version": _Case(
+            run=lambda: _read([store["load"].load_version("bench", 1)]),
+            units=elements,
+            unit_name="elements",
+            setup=loaded_store,
+        ),
+        "storage.history": _Case(
+            run=lambda: _read(store["load"].history("bench")),
+            units=elements * 3,
+            unit_name="elements",
+            setup=loaded_store,
+        ),
+        "quality.evaluate": _Case(
+            run=lambda: analyzer.evaluate(nodes, edges),
+            units=elements,
+            unit_name="elements",
+        ),
+        "exporters.bundle": _Case(
+            run=lambda: exporters["bundle"].bundle(
+                version, formats=BUNDLE_FORMATS, png_max_dimension=BENCH_PNG_MAX_DIMENSION
+            ),
+            units=elements,
+            unit_name="elements",
+            setup=fresh_exporter,
+        ),
+    }
+
+
+BENCHMARKS = (
+    "engine.apply",
+    "storage.save_version",
+    "storage.load_version",
+    "storage.history",
+    "quality.evaluate",
+    "exporters.bundle",
+)
+
+
+def run_suite(
+    kinds: Iterable[str] = tuple(GENERATORS),
+    sizes: Iterable[int] = (100, 1_000, 10_000),
+    benchmarks: Iterable[str] = BENCHMARKS,
+    iterations: int = 5,
+    seed: int = 0,
+    max_elements: Optional[Dict[str, int]] = None,
+    progress: Optional[Callable[[str], None]] = None,
+    repeats: int = 3,
+) -> List[BenchmarkResult]:
+    """Measures every selected benchmark ``repeats`` times and keeps the median."""
+    if repeats <= 0:
+        raise ValueError("repeats must be positive")
+    limits = DEFAULT_MAX_ELEMENTS if max_elements is None else max_elements
+    selected = list(benchmarks)
+    unknown = sorted(set(selected) - set(BENCHMARKS))
+    if unknown:
+        raise ValueError(f"unknown benchmarks: {', '.join(unknown)}")
+    results: List[BenchmarkResult] = []
+    for kind in kinds:
+        for size in sizes:
+            nodes, edges = generate(kind, size, seed=seed)
+            elements = len(nodes) + len(edges)
+            cases = build_cases(nodes, edges, seed)
+            for name in selected:
+                if elements > limits.get(name, elements):
+                    if progress:
+                        progress(f"skip {name}/{kind}/{size} (> {limits[name]} elements)")
+                    continue
+                # apply is cheap per call; sample enough ops for stable percentiles.
+                runs = iterations * 20 if name == "engine.apply" else iterations
+                result = median_result([measure(name, kind, size, cases[name], runs) for _ in range(repeats)])
+                results.append(result)
+                if progress:
+                    progress(f"{result.key}: p50 {result.p50_ms:.2f} ms, {result.throughput:,.0f} {result.units}/s")
+    return results
+
+
+def report(
+    results: Iterable[BenchmarkResult], seed: int = 0, calibration_ms: Optional[float] = None
+) -> Dict[str, object]:
+    return {
+        "meta": {
+            "created_at": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "calibration_ms": calibration_ms,
+        },
+        "results": [result.to_dict() for result in results],
+    }
+
+
+def write_report(path: str, payload: Dict[str, object]) -> None:
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle, indent=2)
+        handle.write("\n")
+
+
+def load_report(path: str) -> Dict[str, object]:
+    with open(path, "r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def compare(
+    results: Iterable[BenchmarkResult],
+    baseline: Dict[str, object],
+    thresholds: Optional[Dict[str, float]] = None,
+    noise_floor_ms: float = DEFAULT_NOISE_FLOOR_MS,
+    calibration_ms: Optional[float] = None,
+) -> List[Regression]:
+    """Lists metrics that moved past their threshold relative to ``baseline``.
+
+    Results without a baseline entry are ignored, so new benchmarks or
+    sizes do not fail the comparison. Results whose p50 stays below
+    ``noise_floor_ms`` only have their memory compared. When both this run's
+    ``calibration_ms`` and the baseline's are known, baseline timings are
+    rescaled by their ratio first.
+    """
+    limits = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    recorded = (baseline.get("meta") or {}).get("calibration_ms")
+    speed = calibration_ms / float(recorded) if calibration_ms and recorded else 1.0
+    previous = {
+        f"{entry['name']}/{entry['graph']}/{entry['elements']}": entry
+        for entry in baseline.get("results", [])
+    }
+    regressions: List[Regression] = []
+    for result in results:
+        entry = previous.get(result.key)
+        if entry is None:
+            continue
+        for metric, threshold in limits.items():
+            if metric in _TIMINGS and result.p50_ms < noise_floor_ms:
+                continue
+            before = float(entry.get(metric, 0.0))
+            if metric in _TIMINGS:
+                before = before / speed if metric in _HIGHER_IS_BETTER else before * speed
+            current = float(getattr(result, metric))
+            if before <= 0:
+                continue
+            ratio = current / before
+            failed = ratio < threshold if metric in _HIGHER_IS_BETTER else ratio > threshold
+            if failed:
+                regressions.append(Regression(result.key, metric, before, current, threshold))
+    return regressions
@@ -1,12 +1,16 @@
 """Core package for collaborative graph rendering."""
 
-from .models import GraphVersion, Node, Edge
+from .models import GraphFrame, GraphVersion, Node, Edge
 from .storage import GraphPersistence
 from .ot import CollaborationEngine, GraphOperation, OperationType
 from .exporters import ExportService
+from .gateway import CollaborationGateway
+from .patches import ExportPatch
+from .persistent import PersistentSortedMap
 from .quality import QualityReport
 
 __all__ = [
+    "GraphFrame",
     "GraphVersion",
     "Node",
     "Edge",
@@ -15,5 +19,8 @@ __all__ = [
     "GraphOperation",
     "OperationType",
     "ExportService",
+    "CollaborationGateway",
+    "ExportPatch",
+    "PersistentSortedMap",
     "QualityReport",
 ]
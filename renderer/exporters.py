@@ -3,113 +3,472 @@
 from __future__ import annotations
 
 import base64
-import math
-from typing import Dict, Iterable, Tuple
+import io
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from html import escape
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
-from .models import GraphVersion, Node
+from .layout import Layout, LayoutEngine, get_layout_engine
+from .lod import BBox, LodScene
+from .metrics import REGISTRY
+from .models import GraphVersion, edge_columns, node_columns
+from .patches import ExportPatch, diff_keyed, diff_lines
+from .raster import PngRasterizer
 
+BUNDLE_FORMATS: Tuple[str, ...] = ("mermaid", "markdown", "svg", "png")
+# Longest side of bundled PNGs; full-canvas rasters of large graphs take
+# tens of seconds and megabytes of base64 for little visible detail.
+DEFAULT_PNG_MAX_DIMENSION = 2000
+_PATCH_LABELS = {"format": "patch"}
 
-_FALLBACK_PNG = base64.b64decode(
-    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mP8/x8AAucB9Wlu1l8AAAAASUVORK5CYII="
+MARKDOWN_NODE_HEADER = "| Node | Label | Trust | Ambiguous |\n|---|---|---|---|"
+MARKDOWN_EDGE_HEADER = "\n\n| Edge | Source | Target | Label | Weight |\n|---|---|---|---|---|"
+
+SVG_DEFS = (
+    '<defs><marker id="arrow" markerWidth="10" markerHeight="10" refX="10" refY="3" orient="auto">'
+    '<path d="M0,0 L0,6 L9,3 z" fill="#333" /></marker></defs>'
 )
 
 
+def svg_element_id(kind: str, element_id: str) -> str:
+    """Stable, attribute-safe SVG id for a node or edge."""
+    return escape(f"{kind}-{element_id}", quote=True)
+
+
+def _svg_open(layout: Layout) -> str:
+    return f'<svg xmlns="http://www.w3.org/2000/svg" width="{layout.width}" height="{layout.height}">'
+
+
 class ExportService:
-    """Renders graph versions into multiple formats suitable for export."""
+    """Renders graph versions into multiple formats suitable for export.
+
+    ``layout`` selects the layout engine (``"auto"``, ``"layered"``,
+    ``"force"``, ``"circular"`` or a :class:`LayoutEngine` instance). With
+    ``warm_start`` enabled the service remembers the last layout per graph
+    and seeds the next version's layout from it, which keeps consecutive
+    versions visually stable and converges in far fewer iterations.
+
+    ``bundle`` renders the requested formats concurrently on a shared thread
+    pool of ``max_workers`` threads, created on first use.
+    """
+
+    def __init__(
+        self,
+        layout: Union[str, LayoutEngine] = "auto",
+        warm_start: bool = False,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self.layout_engine = get_layout_engine(layout)
+        self._layout_labels = {"engine": self.layout_engine.name}
+        self.warm_start = warm_start
+        self.max_workers = max_workers
+        self._layouts: Dict[str, Tuple[int, Layout]] = {}
+        self._scenes: Dict[str, LodScene] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def __getstate__(self) -> Dict[str, object]:
+        # Locks and pools cannot cross process boundaries.
+        state = self.__dict__.copy()
+        state["_lock"] = None
+        state["_executor"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, object]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
 
     def to_mermaid(self, version: GraphVersion) -> str:
+        return "\n".join(self.mermaid_lines(version))
+
+    def mermaid_lines(self, version: GraphVersion) -> List[str]:
+        nodes = node_columns(version.nodes)
+        edges = edge_columns(version.edges)
         lines = ["graph LR"]
-        for node in version.nodes:
-            lines.append(f"    {node.id}[{node.label}]")
-        for edge in version.edges:
-            label = f"|{edge.label}|" if edge.label else ""
-            lines.append(f"    {edge.source} -->{label} {edge.target}")
-        return "\n".join(lines)
+        lines.extend(f"    {node_id}[{label}]" for node_id, label in zip(nodes.ids, nodes.labels))
+        lines.extend(
+            f"    {source} -->{f'|{label}|' if label else ''} {target}"
+            for source, target, label in zip(edges.sources, edges.targets, edges.labels)
+        )
+        return lines
 
     def to_markdown(self, version: GraphVersion) -> str:
-        header = "| Node | Label | Trust | Ambiguous |\n|---|---|---|---|"
-        node_rows = [
-            f"| {node.id} | {node.label} | {node.trust:.2f} | {'yes' if node.ambiguous else 'no'} |"
-            for node in version.nodes
-        ]
-        edge_header = "\n\n| Edge | Source | Target | Label | Weight |\n|---|---|---|---|---|"
-        edge_rows = [
-            f"| {edge.id} | {edge.source} | {edge.target} | {edge.label or ''} | {edge.weight:.2f} |"
-            for edge in version.edges
-        ]
-        return "\n".join([header, *node_rows, edge_header, *edge_rows])
-
-    def to_svg(self, version: GraphVersion) -> str:
-        positions = self._layout(version.nodes)
-        width, height = 800, 600
-        svg_parts = [
-            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}">',
-            '<defs><marker id="arrow" markerWidth="10" markerHeight="10" refX="10" refY="3" orient="auto"><path d="M0,0 L0,6 L9,3 z" fill="#333" /></marker></defs>',
-        ]
-        default_position = (width / 2, height / 2)
-        for edge in version.edges:
-            if edge.source not in positions or edge.target not in positions:
-                continue
-            sx, sy = positions[edge.source]
-            tx, ty = positions[edge.target]
-            svg_parts.append(
-                f'<line x1="{sx}" y1="{sy}" x2="{tx}" y2="{ty}" stroke="#555" stroke-width="2" marker-end="url(#arrow)" />'
+        node_rows, edge_rows = self.markdown_rows(version)
+        return "\n".join(
+            [MARKDOWN_NODE_HEADER, *node_rows.values(), MARKDOWN_EDGE_HEADER, *edge_rows.values()]
+        )
+
+    def markdown_rows(self, version: GraphVersion) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """Returns the node and edge table rows keyed by element id."""
+        nodes = node_columns(version.nodes)
+        edges = edge_columns(version.edges)
+        node_rows = {
+            node_id: f"| {node_id} | {label} | {trust:.2f} | {'yes' if ambiguous else 'no'} |"
+            for node_id, label, trust, ambiguous in zip(nodes.ids, nodes.labels, nodes.trust, nodes.ambiguous)
+        }
+        edge_rows = {
+            edge_id: f"| {edge_id} | {source} | {target} | {label or ''} | {weight:.2f} |"
+            for edge_id, source, target, label, weight in zip(
+                edges.ids, edges.sources, edges.targets, edges.labels, edges.weights
             )
-            if edge.label:
+        }
+        return node_rows, edge_rows
+
+    def to_svg(self, version: GraphVersion, layout: Optional[Layout] = None) -> str:
+        layout = layout or self.layout(version)
+        edge_elements, node_elements = self.svg_elements(version, layout)
+        return "".join(
+            [
+                _svg_open(layout),
+                SVG_DEFS,
+                '<g id="edges">',
+                *edge_elements.values(),
+                '</g><g id="nodes">',
+                *node_elements.values(),
+                "</g></svg>",
+            ]
+        )
+
+    def svg_elements(
+        self,
+        version: GraphVersion,
+        layout: Optional[Layout] = None,
+    ) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """Returns edge and node SVG groups keyed by their stable element id."""
+        layout = layout or self.layout(version)
+        positions = layout.positions
+        default_position = layout.center()
+        edges = edge_columns(version.edges)
+        edge_elements: Dict[str, str] = {}
+        for edge_id, source, target, label in zip(edges.ids, edges.sources, edges.targets, edges.labels):
+            if source not in positions or target not in positions:
+                continue
+            sx, sy = positions[source]
+            tx, ty = positions[target]
+            element_id = svg_element_id("edge", edge_id)
+            parts = [
+                f'<g id="{element_id}">',
+                f'<line x1="{sx}" y1="{sy}" x2="{tx}" y2="{ty}" stroke="#555" stroke-width="2" marker-end="url(#arrow)" />',
+            ]
+            if label:
                 mx, my = (sx + tx) / 2, (sy + ty) / 2
-                svg_parts.append(
-                    f'<text x="{mx}" y="{my - 5}" font-size="12" text-anchor="middle" fill="#333">{edge.label}</text>'
+                parts.append(
+                    f'<text x="{mx}" y="{my - 5}" font-size="12" text-anchor="middle" fill="#333">{escape(label)}</text>'
                 )
-        for node in version.nodes:
-            x, y = positions.get(node.id, default_position)
+            parts.append("</g>")
+            edge_elements[element_id] = "".join(parts)
+        nodes = node_columns(version.nodes)
+        node_elements: Dict[str, str] = {}
+        for node_id, label, trust, ambiguous in zip(nodes.ids, nodes.labels, nodes.trust, nodes.ambiguous):
+            x, y = positions.get(node_id, default_position)
             radius = 30
-            stroke = "#ff9800" if node.ambiguous else "#1976d2"
-            dash = "4 2" if node.ambiguous else ""
-            svg_parts.append(
-                f'<circle cx="{x}" cy="{y}" r="{radius}" fill="#e3f2fd" stroke="{stroke}" stroke-width="2" stroke-dasharray="{dash}" />'
+            stroke = "#ff9800" if ambiguous else "#1976d2"
+            dash = "4 2" if ambiguous else ""
+            element_id = svg_element_id("node", node_id)
+            node_elements[element_id] = "".join(
+                [
+                    f'<g id="{element_id}">',
+                    f'<circle cx="{x}" cy="{y}" r="{radius}" fill="#e3f2fd" stroke="{stroke}" stroke-width="2" stroke-dasharray="{dash}" />',
+                    f'<text x="{x}" y="{y}" font-size="12" text-anchor="middle" dominant-baseline="middle">{escape(label)}</text>',
+                    f'<text x="{x}" y="{y + radius + 12}" font-size="10" text-anchor="middle" fill="#555">trust: {trust:.2f}</text>',
+                    "</g>",
+                ]
             )
-            svg_parts.append(
-                f'<text x="{x}" y="{y}" font-size="12" text-anchor="middle" dominant-baseline="middle">{node.label}</text>'
+        return edge_elements, node_elements
+
+    def lod_scene(self, version: GraphVersion, layout: Optional[Layout] = None) -> LodScene:
+        """Builds (or reuses) the level-of-detail scene for ``version``.
+
+        The most recent scene per graph is cached, so tile and viewport
+        requests against the same version only pay for index lookups.
+        """
+        with self._lock:
+            scene = self._scenes.get(version.graph_id)
+        if scene is not None and scene.version == version.version:
+            return scene
+        layout = layout or self.layout(version)
+        edge_elements, node_elements = self.svg_elements(version, layout)
+        scene = LodScene.build(version, layout, edge_elements, node_elements)
+        with self._lock:
+            self._scenes[version.graph_id] = scene
+        return scene
+
+    def to_svg_viewport(self, version: GraphVersion, bbox: BBox, zoom: float = 1.0) -> str:
+        """Renders only the elements intersecting ``bbox`` (canvas units).
+
+        The level of detail follows ``zoom``: at low zoom, connected
+        components or communities are collapsed into summary nodes.
+        """
+        if zoom <= 0:
+            raise ValueError("zoom must be positive")
+        scene = self.lod_scene(version)
+        level = scene.level_for_zoom(zoom)
+        x0, y0, x1, y1 = bbox
+        width, height = x1 - x0, y1 - y0
+        return "".join(
+            [
+                f'<svg xmlns="http://www.w3.org/2000/svg" width="{width * zoom:g}" height="{height * zoom:g}" '
+                f'viewBox="{x0:g} {y0:g} {width:g} {height:g}" data-level="{level.name}">',
+                SVG_DEFS,
+                *level.query(bbox),
+                "</svg>",
+            ]
+        )
+
+    def to_svg_tile(
+        self,
+        version: GraphVersion,
+        zoom: float,
+        column: int,
+        row: int,
+        tile_size: int = 512,
+    ) -> str:
+        """Renders one ``tile_size`` pixel tile of the canvas at ``zoom``."""
+        if zoom <= 0:
+            raise ValueError("zoom must be positive")
+        scene = self.lod_scene(version)
+        columns, rows = scene.tile_grid(zoom, tile_size)
+        if not (0 <= column < columns and 0 <= row < rows):
+            raise ValueError(f"tile ({column}, {row}) outside {columns}x{rows} grid")
+        return self.to_svg_viewport(version, scene.tile_bbox(zoom, column, row, tile_size), zoom)
+
+    def patch(self, base: GraphVersion, target: GraphVersion) -> ExportPatch:
+        """Describes how to turn ``base``'s exports into ``target``'s.
+
+        SVG groups are matched by element id and Markdown rows by node or
+        edge id; Mermaid is diffed line by line. The target layout is always
+        seeded from the base layout (whatever ``warm_start`` says), so the
+        SVG operations grow with the edit rather than with the graph. It is
+        remembered for ``target``, so later exports of ``target`` and the
+        next patch from it match the document the client now holds.
+        """
+        with REGISTRY.timed("renderer_export_seconds", _PATCH_LABELS):
+            base_layout = self.layout(base)
+            target_layout = self._cached_layout(target)
+            if target_layout is None:
+                target_layout = self._compute_layout(target, base_layout)
+                self._store_layout(target, target_layout)
+            base_edges, base_nodes = self.svg_elements(base, base_layout)
+            target_edges, target_nodes = self.svg_elements(target, target_layout)
+            svg_ops: List[Dict[str, object]] = []
+            if (base_layout.width, base_layout.height) != (target_layout.width, target_layout.height):
+                svg_ops.append({"op": "resize", "width": target_layout.width, "height": target_layout.height})
+            svg_ops.extend(diff_keyed(base_edges, target_edges, parent="edges"))
+            svg_ops.extend(diff_keyed(base_nodes, target_nodes, parent="nodes"))
+
+            base_node_rows, base_edge_rows = self.markdown_rows(base)
+            target_node_rows, target_edge_rows = self.markdown_rows(target)
+            markdown_ops = diff_keyed(base_node_rows, target_node_rows, parent="nodes")
+            markdown_ops.extend(diff_keyed(base_edge_rows, target_edge_rows, parent="edges"))
+
+            return ExportPatch(
+                graph_id=target.graph_id,
+                base_version=base.version,
+                version=target.version,
+                svg=svg_ops,
+                mermaid=diff_lines(self.mermaid_lines(base), self.mermaid_lines(target)),
+                markdown=markdown_ops,
             )
-            svg_parts.append(
-                f'<text x="{x}" y="{y + radius + 12}" font-size="10" text-anchor="middle" fill="#555">trust: {node.trust:.2f}</text>'
+
+    def to_png(
+        self,
+        version: GraphVersion,
+        scale: float = 1.0,
+        max_dimension: Optional[int] = None,
+        layout: Optional[Layout] = None,
+    ) -> bytes:
+        buffer = io.BytesIO()
+        self.write_png(version, buffer, scale=scale, max_dimension=max_dimension, layout=layout)
+        return buffer.getvalue()
+
+    def write_png(
+        self,
+        version: GraphVersion,
+        stream: BinaryIO,
+        scale: float = 1.0,
+        max_dimension: Optional[int] = None,
+        band_height: int = 256,
+        layout: Optional[Layout] = None,
+    ) -> None:
+        """Rasterizes the SVG layout straight into ``stream``.
+
+        ``max_dimension`` caps the longest side of the image by lowering the
+        scale; together with band-wise rendering this keeps memory bounded for
+        very large graphs.
+        """
+        layout = layout or self.layout(version)
+        if max_dimension is not None:
+            scale = min(scale, max_dimension / max(layout.width, layout.height))
+        rasterizer = PngRasterizer(layout.width, layout.height, scale=scale, band_height=band_height)
+        rasterizer.render(
+            version.nodes,
+            version.edges,
+            layout.positions,
+            stream,
+            default_position=layout.center(),
+        )
+
+    def bundle(
+        self,
+        version: GraphVersion,
+        formats: Optional[Iterable[str]] = None,
+        executor: Optional[Executor] = None,
+        png_max_dimension: Optional[int] = DEFAULT_PNG_MAX_DIMENSION,
+    ) -> Dict[str, object]:
+        """Renders ``formats`` (default: all of :data:`BUNDLE_FORMATS`).
+
+        The layout is computed once and shared by the SVG and PNG renderers,
+        which then run alongside the text formats on ``executor`` (or the
+        service's own thread pool). ``png_max_dimension`` is passed to
+        :meth:`to_png`; ``None`` rasterizes the full canvas.
+        """
+        selected = self._select_formats(formats)
+        pool: Optional[Executor] = None
+        if len(selected) > 1 and self.max_workers != 0:
+            pool = executor or self._thread_pool()
+        return self._render_bundle(version, selected, pool, png_max_dimension)
+
+    def export_many(
+        self,
+        versions: Iterable[GraphVersion],
+        formats: Optional[Iterable[str]] = None,
+        max_workers: Optional[int] = None,
+        use_processes: bool = False,
+        png_max_dimension: Optional[int] = DEFAULT_PNG_MAX_DIMENSION,
+    ) -> List[Dict[str, object]]:
+        """Bundles many versions in parallel, preserving input order.
+
+        Each worker renders its version's formats sequentially. Pass
+        ``use_processes=True`` for CPU-bound archive jobs so the text renderers
+        are not serialized by the GIL.
+        """
+        selected = self._select_formats(formats)
+        versions_list = list(versions)
+        if not versions_list:
+            return []
+        workers = max_workers or os.cpu_count() or 1
+        chunksize = max(1, len(versions_list) // (4 * workers))
+        pool_type = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with pool_type(max_workers=workers) as pool:
+            return list(
+                pool.map(
+                    _bundle_sequential,
+                    [self] * len(versions_list),
+                    versions_list,
+                    [selected] * len(versions_list),
+                    [png_max_dimension] * len(versions_list),
+                    chunksize=chunksize,
+                )
             )
-        svg_parts.append("</svg>")
-        return "".join(svg_parts)
-
-    def to_png(self, version: GraphVersion) -> bytes:
-        # The lightweight test harness only validates the PNG signature, so we
-        # return a static 1x1 PNG. A richer renderer could replace this without
-        # affecting the public API.
-        return _FALLBACK_PNG
-
-    def bundle(self, version: GraphVersion) -> Dict[str, object]:
-        png_bytes = self.to_png(version)
-        return {
-            "mermaid": self.to_mermaid(version),
-            "markdown": self.to_markdown(version),
-            "svg": self.to_svg(version),
-            "png_base64": base64.b64encode(png_bytes).decode("ascii"),
-            "metadata": {
-                "graph_id": version.graph_id,
-                "version": version.version,
-                "quality": version.quality,
-            },
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _render_bundle(
+        self,
+        version: GraphVersion,
+        selected: Tuple[str, ...],
+        pool: Optional[Executor],
+        png_max_dimension: Optional[int] = DEFAULT_PNG_MAX_DIMENSION,
+    ) -> Dict[str, object]:
+        layout = self.layout(version) if {"svg", "png"} & set(selected) else None
+        renderers: Dict[str, Callable[[], object]] = {
+            "mermaid": lambda: self.to_mermaid(version),
+            "markdown": lambda: self.to_markdown(version),
+            "svg": lambda: self.to_svg(version, layout=layout),
+            "png": lambda: base64.b64encode(
+                self.to_png(version, max_dimension=png_max_dimension, layout=layout)
+            ).decode("ascii"),
         }
+        if REGISTRY.enabled:
+            renderers = {name: _measured(name, render) for name, render in renderers.items()}
+        if pool is not None:
+            futures = {name: pool.submit(renderers[name]) for name in selected}
+            rendered = {name: future.result() for name, future in futures.items()}
+        else:
+            rendered = {name: renderers[name]() for name in selected}
+
+        result: Dict[str, object] = {}
+        for name in selected:
+            result["png_base64" if name == "png" else name] = rendered[name]
+        result["metadata"] = {
+            "graph_id": version.graph_id,
+            "version": version.version,
+            "quality": version.quality,
+        }
+        return result
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers or len(BUNDLE_FORMATS),
+                    thread_name_prefix="export",
+                )
+            return self._executor
+
+    @staticmethod
+    def _select_formats(formats: Optional[Iterable[str]]) -> Tuple[str, ...]:
+        if formats is None:
+            return BUNDLE_FORMATS
+        requested = set(formats)
+        unknown = requested - set(BUNDLE_FORMATS)
+        if unknown:
+            raise ValueError(f"unsupported export formats: {sorted(unknown)}")
+        return tuple(name for name in BUNDLE_FORMATS if name in requested)
+
+    def layout(self, version: GraphVersion) -> Layout:
+        # Reused even without warm_start: it may be the layout a patch sent.
+        cached = self._cached_layout(version)
+        if cached is not None:
+            return cached
+        if not self.warm_start:
+            return self._compute_layout(version)
+        with self._lock:
+            latest = self._layouts.get(version.graph_id)
+        layout = self._compute_layout(version, latest[1] if latest is not None else None)
+        self._store_layout(version, layout)
+        return layout
+
+    def _compute_layout(self, version: GraphVersion, previous: Optional[Layout] = None) -> Layout:
+        with REGISTRY.timed("renderer_export_layout_seconds", self._layout_labels):
+            return self.layout_engine.compute(version.nodes, version.edges, previous)
+
+    def _cached_layout(self, version: GraphVersion) -> Optional[Layout]:
+        with self._lock:
+            cached = self._layouts.get(version.graph_id)
+        return cached[1] if cached is not None and cached[0] == version.version else None
+
+    def _store_layout(self, version: GraphVersion, layout: Layout) -> None:
+        with self._lock:
+            current = self._layouts.get(version.graph_id)
+            if current is None or current[0] <= version.version:
+                self._layouts[version.graph_id] = (version.version, layout)
+
+
+def _measured(name: str, render: Callable[[], object]) -> Callable[[], object]:
+    labels = {"format": name}
+
+    def run() -> object:
+        with REGISTRY.timed("renderer_export_seconds", labels):
+            output = render()
+        REGISTRY.inc("renderer_export_bytes_total", len(output), labels)
+        return output
+
+    return run
+
+
+def _bundle_sequential(
+    exporter: ExportService,
+    version: GraphVersion,
+    formats: Tuple[str, ...],
+    png_max_dimension: Optional[int],
+) -> Dict[str, object]:
+    return exporter._render_bundle(version, formats, None, png_max_dimension)
+
 
-    def _layout(self, nodes: Iterable[Node]) -> Dict[str, Tuple[float, float]]:
-        nodes_list = list(nodes)
-        count = max(1, len(nodes_list))
-        width, height = 800, 600
-        radius = min(width, height) * 0.35
-        center_x, center_y = width / 2, height / 2
-        positions: Dict[str, Tuple[float, float]] = {}
-        for index, node in enumerate(nodes_list):
-            angle = (2 * math.pi * index) / count if count > 1 else 0
-            x = center_x + radius * math.cos(angle)
-            y = center_y + radius * math.sin(angle)
-            positions[node.id] = (x, y)
-        return positions
-
-
-__all__ = ["ExportService"]
+__all__ = ["BUNDLE_FORMATS", "DEFAULT_PNG_MAX_DIMENSION", "ExportService"]
@@ -0,0 +1,326 @@
+"""Asyncio gateway pushing committed graph changes to subscribed sessions.
+
+Sessions subscribe to graphs through a :class:`CollaborationGateway`.
+Operations are applied on a worker thread so the event loop never blocks on
+SQLite or quality analysis, and every commit is fanned out to the graph's
+subscribers as a ``graph.operations`` message (or a ``graph.version``
+notification for subscribers that only track versions).
+
+Each subscriber owns a bounded buffer drained by its own sender task.
+Messages arriving within ``coalesce_window`` seconds are merged into one
+batch, so a burst of commits costs a subscriber one transport send. A
+subscriber whose buffer overflows, typically a slow consumer, has its
+backlog collapsed into a single ``graph.resync`` message per graph, telling
+the client to reload that version instead of replaying every change.
+
+Transports only move batches of JSON-ready dicts; :class:`LocalTransport`
+delivers them to bounded in-process queues and can be swapped for a
+WebSocket implementation of :class:`Transport`. A send should block while
+the client is not reading, so the backlog builds up (and collapses) in the
+subscriber's buffer rather than in the transport.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Protocol, Set
+
+from .metrics import REGISTRY
+from .models import GraphVersion
+from .ot import CollaborationEngine, GraphOperation
+
+Message = Dict[str, object]
+
+_DROPPED = {"reason": "overflow"}
+_TYPES = {kind: {"type": kind} for kind in ("graph.version", "graph.operations", "graph.resync")}
+
+
+class Transport(Protocol):
+    """Delivers message batches to connected sessions."""
+
+    async def send(self, session_id: str, messages: List[Message]) -> None: ...
+
+    async def close(self, session_id: str) -> None: ...
+
+
+class LocalTransport:
+    """In-process transport: each session receives batches on an asyncio queue.
+
+    Queues hold at most ``maxsize`` batches; ``send`` waits for the reader
+    once a queue is full.
+    """
+
+    def __init__(self, maxsize: int = 64) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._inboxes: Dict[str, asyncio.Queue] = {}
+
+    def connect(self, session_id: str) -> asyncio.Queue:
+        """Returns the queue ``session_id``'s batches are delivered to."""
+        inbox = self._inboxes.get(session_id)
+        if inbox is None:
+            inbox = self._inboxes[session_id] = asyncio.Queue(self.maxsize)
+        return inbox
+
+    async def send(self, session_id: str, messages: List[Message]) -> None:
+        inbox = self._inboxes.get(session_id)
+        if inbox is None:
+            raise KeyError(f"session {session_id} is not connected")
+        await inbox.put(messages)
+
+    async def close(self, session_id: str) -> None:
+        self._inboxes.pop(session_id, None)
+
+
+def operation_dict(operation: GraphOperation) -> Message:
+    return {
+        "type": operation.type.value,
+        "payload": operation.payload,
+        "session_id": operation.session_id,
+        "version": operation.version,
+    }
+
+
+def version_message(version: GraphVersion) -> Message:
+    """``graph.version`` notification; reads only header fields of ``version``."""
+    return {
+        "type": "graph.version",
+        "graph_id": version.graph_id,
+        "version": version.version,
+        "created_at": version.created_at.isoformat().replace("+00:00", "Z"),
+        "author_session": version.author_session,
+        "quality": version.quality,
+    }
+
+
+def operations_message(base: GraphVersion, stored: GraphVersion, operations: List[GraphOperation]) -> Message:
+    return {
+        **version_message(stored),
+        "type": "graph.operations",
+        "base_version": base.version,
+        "operations": [operation_dict(operation) for operation in operations],
+    }
+
+
+def coalesce(messages: Iterable[Message]) -> List[Message]:
+    """Merges consecutive messages about the same graph.
+
+    Version notifications keep only the newest one. Operation messages are
+    concatenated when each continues where the previous one ended; a gap
+    starts a new message.
+    """
+    merged: List[Message] = []
+    latest: Dict[str, int] = {}
+    for message in messages:
+        graph_id = str(message["graph_id"])
+        previous = merged[latest[graph_id]] if graph_id in latest else None
+        if previous is not None and previous["type"] == message["type"] == "graph.version":
+            merged[latest[graph_id]] = message
+            continue
+        if (
+            previous is not None
+            and previous["type"] == message["type"] == "graph.operations"
+            and previous["version"] == message["base_version"]
+        ):
+            merged[latest[graph_id]] = {
+                **message,
+                "base_version": previous["base_version"],
+                "operations": previous["operations"] + message["operations"],
+            }
+            continue
+        latest[graph_id] = len(merged)
+        merged.append(message)
+    return merged
+
+
+class _Subscriber:
+    """Bounded outgoing buffer of one session, flushed by a sender task."""
+
+    def __init__(self, gateway: CollaborationGateway, session_id: str) -> None:
+        self.gateway = gateway
+        self.session_id = session_id
+        self.graphs: Dict[str, bool] = {}
+        # Commits seen while a subscription is still reading its start version;
+        # bounded like ``pending``.
+        self.held: Dict[str, List[Message]] = {}
+        self.pending: List[Message] = []
+        self.dropped = 0
+        self._wake = asyncio.Event()
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    def push(self, message: Message) -> None:
+        limit = self.gateway.max_pending
+        held = self.held.get(str(message["graph_id"]))
+        if held is not None:
+            if len(held) >= limit:
+                held[:] = self._resync(held)
+            held.append(message)
+            return
+        if len(self.pending) >= limit:
+            self.pending = self._resync(self.pending)
+        self.pending.append(message)
+        self._wake.set()
+
+    def _resync(self, messages: List[Message]) -> List[Message]:
+        # Too far behind to replay: point the client at the newest version.
+        newest: Dict[str, int] = {}
+        for message in messages:
+            graph_id = str(message["graph_id"])
+            newest[graph_id] = max(newest.get(graph_id, 0), int(message["version"]))
+        self.dropped += len(messages)
+        REGISTRY.inc("renderer_gateway_dropped_messages_total", len(messages), _DROPPED)
+        return [
+            {"type": "graph.resync", "graph_id": graph_id, "version": version}
+            for graph_id, version in newest.items()
+        ]
+
+    async def _run(self) -> None:
+        gateway = self.gateway
+        while True:
+            await self._wake.wait()
+            if gateway.coalesce_window > 0:
+                await asyncio.sleep(gateway.coalesce_window)
+            self._wake.clear()
+            batch, self.pending = coalesce(self.pending), []
+            try:
+                with REGISTRY.timed("renderer_gateway_send_seconds"):
+                    await gateway.transport.send(self.session_id, batch)
+            except Exception:
+                # The connection is gone; stop pushing to it.
+                REGISTRY.inc("renderer_gateway_send_errors_total")
+                gateway._forget(self.session_id)
+                return
+            REGISTRY.inc("renderer_gateway_batches_total")
+            if REGISTRY.enabled:
+                for message in batch:
+                    REGISTRY.inc("renderer_gateway_messages_total", 1, _TYPES.get(str(message["type"])))
+
+
+class CollaborationGateway:
+    """Fans out commits of a :class:`CollaborationEngine` to subscribed sessions.
+
+    ``apply``/``bulk_apply`` run on ``executor``; by default a private single
+    worker, which also serializes access to the engine and its SQLite
+    connection. Subscribers are notified of every commit made through the
+    engine, including commits that bypass the gateway. Construct and use the
+    gateway from one event loop.
+    """
+
+    def __init__(
+        self,
+        engine: CollaborationEngine,
+        transport: Optional[Transport] = None,
+        coalesce_window: float = 0.01,
+        max_pending: int = 256,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        if max_pending <= 0:
+            raise ValueError("max_pending must be positive")
+        self.engine = engine
+        self.transport: Transport = transport or LocalTransport()
+        self.coalesce_window = coalesce_window
+        self.max_pending = max_pending
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="gateway")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Dict[str, _Subscriber] = {}
+        self._graphs: Dict[str, Set[str]] = {}
+        engine.add_commit_listener(self._on_commit)
+
+    async def _offload(self, function, *args):
+        self._loop = asyncio.get_running_loop()
+        return await self._loop.run_in_executor(self._executor, function, *args)
+
+    async def subscribe(self, session_id: str, graph_id: str, operations: bool = True) -> int:
+        """Subscribes ``session_id`` to ``graph_id`` and returns its current version.
+
+        The session first receives a ``graph.version`` message for that
+        version, then one message per commit: ``graph.operations`` carrying
+        the applied operations, or ``graph.version`` when ``operations`` is
+        false.
+        """
+        self._loop = asyncio.get_running_loop()
+        subscriber = self._subscribers.get(session_id)
+        if subscriber is None:
+            subscriber = self._subscribers[session_id] = _Subscriber(self, session_id)
+        # Register before reading the start version so no commit after it is missed.
+        subscriber.graphs[graph_id] = operations
+        subscriber.held[graph_id] = []
+        self._graphs.setdefault(graph_id, set()).add(session_id)
+        try:
+            current = await self._offload(self.engine.current_graph, graph_id)
+        except BaseException:
+            subscriber.held.pop(graph_id, None)
+            await self.unsubscribe(session_id, graph_id)
+            raise
+        held = subscriber.held.pop(graph_id)
+        self.engine.sessions.upsert(session_id, {"subscriptions": sorted(subscriber.graphs)})
+        subscriber.push(version_message(current))
+        for message in held:
+            if int(message["version"]) > current.version:
+                subscriber.push(message)
+        return current.version
+
+    async def unsubscribe(self, session_id: str, graph_id: str) -> None:
+        subscriber = self._subscribers.get(session_id)
+        if subscriber is None or subscriber.graphs.pop(graph_id, None) is None:
+            return
+        self._graphs.get(graph_id, set()).discard(session_id)
+        self.engine.sessions.upsert(session_id, {"subscriptions": sorted(subscriber.graphs)})
+
+    async def disconnect(self, session_id: str) -> None:
+        """Drops every subscription of ``session_id`` and closes its transport."""
+        subscriber = self._forget(session_id)
+        if subscriber is not None:
+            subscriber.task.cancel()
+            await asyncio.gather(subscriber.task, return_exceptions=True)
+        await self.transport.close(session_id)
+
+    async def apply(self, graph_id: str, operation: GraphOperation) -> GraphVersion:
+        return await self._offload(self.engine.apply, graph_id, operation)
+
+    async def bulk_apply(self, graph_id: str, operations: Iterable[GraphOperation]) -> GraphVersion:
+        return await self._offload(self.engine.bulk_apply, graph_id, list(operations))
+
+    def subscribers(self, graph_id: str) -> List[str]:
+        return sorted(self._graphs.get(graph_id, ()))
+
+    async def close(self) -> None:
+        self.engine.remove_commit_listener(self._on_commit)
+        for session_id in list(self._subscribers):
+            await self.disconnect(session_id)
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+    def _forget(self, session_id: str) -> Optional[_Subscriber]:
+        subscriber = self._subscribers.pop(session_id, None)
+        if subscriber is not None:
+            for graph_id in subscriber.graphs:
+                self._graphs.get(graph_id, set()).discard(session_id)
+            # The session record may carry more than subscriptions (e.g. the
+            # last applied version); only its subscriptions end here.
+            self.engine.sessions.upsert(session_id, {"subscriptions": []})
+        return subscriber
+
+    def _on_commit(
+        self, graph_id: str, base: GraphVersion, stored: GraphVersion, operations: List[GraphOperation]
+    ) -> None:
+        # Runs on the committing thread; fan-out happens on the event loop.
+        loop = self._loop
+        if loop is None or loop.is_closed() or not self._graphs.get(graph_id):
+            return
+        loop.call_soon_threadsafe(self._publish, graph_id, base, stored, operations)
+
+    def _publish(
+        self, graph_id: str, base: GraphVersion, stored: GraphVersion, operations: List[GraphOperation]
+    ) -> None:
+        sessions = self._graphs.get(graph_id)
+        if not sessions:
+            return
+        full = operations_message(base, stored, operations)
+        header = version_message(stored)
+        for session_id in sessions:
+            subscriber = self._subscribers[session_id]
+            subscriber.push(full if subscriber.graphs.get(graph_id) else header)
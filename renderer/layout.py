@@ -0,0 +1,623 @@
+"""Graph layout engines used by the exporters."""
+
+from __future__ import annotations
+
+import math
+from bisect import bisect_left, insort
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from .models import Edge, Node, edge_columns, node_columns
+
+Point = Tuple[float, float]
+
+MIN_WIDTH = 800.0
+MIN_HEIGHT = 600.0
+MARGIN = 60.0
+
+
+@dataclass
+class Layout:
+    """Node positions together with the canvas size they were laid out on."""
+
+    positions: Dict[str, Point] = field(default_factory=dict)
+    width: float = MIN_WIDTH
+    height: float = MIN_HEIGHT
+
+    def center(self) -> Point:
+        return (self.width / 2, self.height / 2)
+
+
+def _fit(
+    positions: Dict[str, Point],
+    previous: Optional[Layout] = None,
+) -> Layout:
+    """Translates positions into a canvas that grows with the graph.
+
+    Without a previous layout the drawing is moved flush to the margin and
+    centred on the minimum canvas. When warm-starting, coordinates are only
+    shifted if they fall outside the margin so unchanged nodes keep their
+    place between versions.
+    """
+    if not positions:
+        return Layout({}, MIN_WIDTH, MIN_HEIGHT)
+    xs = np.fromiter((point[0] for point in positions.values()), dtype=np.float64, count=len(positions))
+    ys = np.fromiter((point[1] for point in positions.values()), dtype=np.float64, count=len(positions))
+    min_x, max_x, min_y, max_y = xs.min(), xs.max(), ys.min(), ys.max()
+    if previous is None:
+        span_x, span_y = max_x - min_x, max_y - min_y
+        shift_x = MARGIN - min_x + max(0.0, (MIN_WIDTH - 2 * MARGIN - span_x) / 2)
+        shift_y = MARGIN - min_y + max(0.0, (MIN_HEIGHT - 2 * MARGIN - span_y) / 2)
+    else:
+        shift_x = max(0.0, MARGIN - min_x)
+        shift_y = max(0.0, MARGIN - min_y)
+    xs = np.round(xs + shift_x, 2)
+    ys = np.round(ys + shift_y, 2)
+    width = max(MIN_WIDTH, float(xs.max()) + MARGIN)
+    height = max(MIN_HEIGHT, float(ys.max()) + MARGIN)
+    fitted = {node_id: (float(x), float(y)) for node_id, x, y in zip(positions, xs, ys)}
+    return Layout(fitted, width, height)
+
+
+class LayoutEngine:
+    """Base class for layout strategies."""
+
+    name = "base"
+
+    def compute(
+        self,
+        nodes: Sequence[Node],
+        edges: Sequence[Edge],
+        previous: Optional[Layout] = None,
+    ) -> Layout:
+        raise NotImplementedError
+
+
+class CircularLayout(LayoutEngine):
+    """Places nodes evenly on a circle whose radius grows with the node count."""
+
+    name = "circular"
+
+    def __init__(self, spacing: float = 90.0) -> None:
+        self.spacing = spacing
+
+    def compute(
+        self,
+        nodes: Sequence[Node],
+        edges: Sequence[Edge],
+        previous: Optional[Layout] = None,
+    ) -> Layout:
+        count = max(1, len(nodes))
+        radius = max(min(MIN_WIDTH, MIN_HEIGHT) * 0.35, count * self.spacing / (2 * math.pi))
+        positions: Dict[str, Point] = {}
+        for index, node_id in enumerate(node_columns(nodes).ids):
+            angle = (2 * math.pi * index) / count if count > 1 else 0
+            positions[node_id] = (radius * math.cos(angle), radius * math.sin(angle))
+        return _fit(positions)
+
+
+class LayeredLayout(LayoutEngine):
+    """Sugiyama-style layout that flows left to right, like ``graph LR``.
+
+    Cycles are broken by reversing DFS back edges, nodes are assigned to
+    layers by longest path, long edges are routed through virtual nodes and
+    in-layer order is refined with alternating barycenter sweeps. At most
+    ``virtual_factor`` virtual nodes per real node are created. Layers
+    taller than ``max_layer_size`` (by default about the square root of the
+    element count) wrap into several adjacent columns so wide graphs keep a
+    bounded aspect ratio.
+
+    With a previous layout, nodes it already placed keep their coordinates
+    and new nodes are slotted into their layer's column next to their
+    neighbours, so consecutive versions stay stable.
+    """
+
+    name = "layered"
+
+    def __init__(
+        self,
+        layer_spacing: float = 180.0,
+        node_spacing: float = 110.0,
+        sweeps: int = 4,
+        max_layer_size: Optional[int] = None,
+        virtual_factor: int = 4,
+    ) -> None:
+        self.layer_spacing = layer_spacing
+        self.node_spacing = node_spacing
+        self.sweeps = sweeps
+        self.virtual_factor = virtual_factor
+        self.max_layer_size = max_layer_size
+
+    def compute(
+        self,
+        nodes: Sequence[Node],
+        edges: Sequence[Edge],
+        previous: Optional[Layout] = None,
+    ) -> Layout:
+        node_ids = list(node_columns(nodes).ids)
+        if not node_ids:
+            return _fit({})
+        known = set(node_ids)
+        pairs = _simple_pairs(edges, known)
+        pairs = _break_cycles(node_ids, pairs)
+        rank = _longest_path_ranks(node_ids, pairs)
+        if previous is not None and any(node_id in previous.positions for node_id in node_ids):
+            return _fit(self._warm_positions(node_ids, rank, pairs, previous), previous)
+
+        # Route edges spanning several layers through virtual nodes, shortest
+        # spans first; past the budget, long edges link their endpoints
+        # directly so deep graphs do not grow by O(edges * depth) members.
+        layer_members: Dict[int, List[str]] = defaultdict(list)
+        for node_id in node_ids:
+            layer_members[rank[node_id]].append(node_id)
+        down: Dict[str, List[str]] = defaultdict(list)
+        up: Dict[str, List[str]] = defaultdict(list)
+        budget = self.virtual_factor * len(node_ids)
+        for source, target in sorted(pairs, key=lambda pair: rank[pair[1]] - rank[pair[0]]):
+            chain = [source]
+            span = rank[target] - rank[source] - 1
+            if span <= budget:
+                budget -= span
+                for layer in range(rank[source] + 1, rank[target]):
+                    virtual = f"\0{source}\0{target}\0{layer}"
+                    layer_members[layer].append(virtual)
+                    chain.append(virtual)
+            chain.append(target)
+            for upper, lower in zip(chain, chain[1:]):
+                down[upper].append(lower)
+                up[lower].append(upper)
+
+        layers = [layer_members[index] for index in range(max(layer_members) + 1)]
+        order = {member: index for members in layers for index, member in enumerate(members)}
+
+        for sweep in range(self.sweeps):
+            if sweep % 2 == 0:
+                sequence, neighbours = layers[1:], up
+            else:
+                sequence, neighbours = layers[-2::-1], down
+            for members in sequence:
+                barycenter = {}
+                for member in members:
+                    linked = neighbours.get(member)
+                    if linked:
+                        barycenter[member] = sum(order[other] for other in linked) / len(linked)
+                    else:
+                        barycenter[member] = float(order[member])
+                members.sort(key=lambda member: (barycenter[member], order[member]))
+                for index, member in enumerate(members):
+                    order[member] = index
+
+        wrap = self.max_layer_size or max(50, math.ceil(math.sqrt(len(order))))
+        tallest = min(wrap, max(len(members) for members in layers))
+        positions: Dict[str, Point] = {}
+        x = 0.0
+        for members in layers:
+            for index, member in enumerate(members):
+                column, row = divmod(index, wrap)
+                in_column = min(wrap, len(members) - column * wrap)
+                if member in known:
+                    positions[member] = (
+                        x + column * self.node_spacing,
+                        (tallest - in_column) * self.node_spacing / 2 + row * self.node_spacing,
+                    )
+            x += (math.ceil(len(members) / wrap) - 1) * self.node_spacing + self.layer_spacing
+        return _fit(positions)
+
+    def _warm_positions(
+        self,
+        node_ids: List[str],
+        rank: Dict[str, int],
+        pairs: List[Tuple[str, str]],
+        previous: Layout,
+    ) -> Dict[str, Point]:
+        seeded = previous.positions
+        positions: Dict[str, Point] = {node_id: seeded[node_id] for node_id in node_ids if node_id in seeded}
+        fresh = sorted((node_id for node_id in node_ids if node_id not in positions), key=lambda node_id: rank[node_id])
+        if not fresh:
+            return positions
+
+        # Each layer's column is where its carried-over nodes start; layers
+        # without any continue one layer spacing from their neighbours.
+        depth = max(rank.values()) + 1
+        columns: List[Optional[float]] = [None] * depth
+        for node_id, (x, _) in positions.items():
+            layer = rank[node_id]
+            columns[layer] = x if columns[layer] is None else min(columns[layer], x)
+        for layer in range(1, depth):
+            if columns[layer] is None and columns[layer - 1] is not None:
+                columns[layer] = columns[layer - 1] + self.layer_spacing
+        for layer in range(depth - 2, -1, -1):
+            if columns[layer] is None:
+                columns[layer] = columns[layer + 1] - self.layer_spacing
+
+        neighbours: Dict[str, List[str]] = defaultdict(list)
+        for source, target in pairs:
+            neighbours[source].append(target)
+            neighbours[target].append(source)
+        occupied: Dict[float, List[float]] = defaultdict(list)
+        for x, y in positions.values():
+            occupied[x].append(y)
+        for ys in occupied.values():
+            ys.sort()
+
+        for node_id in fresh:
+            x = columns[rank[node_id]]
+            linked = [positions[other][1] for other in neighbours[node_id] if other in positions]
+            column = occupied[x]
+            y = sum(linked) / len(linked) if linked else (column[-1] + self.node_spacing if column else MARGIN)
+            # Slide down past carried-over nodes instead of moving them.
+            slot = bisect_left(column, y - self.node_spacing + 1e-9)
+            while slot < len(column) and column[slot] < y + self.node_spacing:
+                y = column[slot] + self.node_spacing
+                slot += 1
+            insort(column, y)
+            positions[node_id] = (x, y)
+        return positions
+
+
+class ForceDirectedLayout(LayoutEngine):
+    """Fruchterman-Reingold layout with Barnes-Hut repulsion.
+
+    Repulsive forces are approximated with a quadtree built from Morton codes
+    and traversed for all bodies at once, so every iteration costs
+    O(n log n) vectorized NumPy work. With a previous layout, known nodes keep
+    their positions (only direct neighbours of new nodes may settle), new
+    nodes start next to their placed neighbours and the simulation runs for
+    ``warm_iterations`` steps. Cold layouts of more than ``large_graph``
+    nodes run proportionally fewer iterations (at least ``min_iterations``)
+    so the total work stays roughly that of a ``large_graph`` layout.
+    """
+
+    name = "force"
+
+    def __init__(
+        self,
+        ideal_length: float = 120.0,
+        iterations: int = 80,
+        warm_iterations: int = 20,
+        theta: float = 0.8,
+        gravity: float = 2.0,
+        seed: int = 0,
+        large_graph: int = 5000,
+        min_iterations: int = 15,
+    ) -> None:
+        self.ideal_length = ideal_length
+        self.iterations = iterations
+        self.warm_iterations = warm_iterations
+        self.theta = theta
+        self.gravity = gravity
+        self.seed = seed
+        self.large_graph = large_graph
+        self.min_iterations = min_iterations
+
+    def compute(
+        self,
+        nodes: Sequence[Node],
+        edges: Sequence[Edge],
+        previous: Optional[Layout] = None,
+    ) -> Layout:
+        node_ids = list(node_columns(nodes).ids)
+        count = len(node_ids)
+        if count == 0:
+            return _fit({})
+        index = {node_id: position for position, node_id in enumerate(node_ids)}
+        pairs = _simple_pairs(edges, set(index))
+        sources = np.array([index[source] for source, _ in pairs], dtype=np.int64)
+        targets = np.array([index[target] for _, target in pairs], dtype=np.int64)
+
+        k = self.ideal_length
+        rng = np.random.default_rng(self.seed)
+        warm = previous is not None and any(node_id in previous.positions for node_id in node_ids)
+        if warm:
+            positions, placed = self._warm_positions(node_ids, index, sources, targets, previous, rng)
+            iterations = self.warm_iterations
+            # Nodes carried over from the previous version stay pinned unless
+            # they neighbour a new node; new nodes travel to their place.
+            temperature = np.where(placed, 0.0, k)
+            if sources.size:
+                fresh = ~placed
+                touched = np.zeros(count, dtype=bool)
+                touched[sources[fresh[targets]]] = True
+                touched[targets[fresh[sources]]] = True
+                temperature[touched & placed] = k / 10
+            if not temperature.any():
+                iterations = 0
+        else:
+            side = k * math.sqrt(count)
+            positions = rng.uniform(0.0, side, size=(count, 2))
+            iterations = self.iterations
+            if count > self.large_graph:
+                iterations = max(self.min_iterations, self.iterations * self.large_graph // count)
+            temperature = np.full(count, side / 10)
+        if count == 1:
+            return _fit({node_ids[0]: (float(positions[0, 0]), float(positions[0, 1]))}, previous if warm else None)
+
+        cooling = (k / 50 / max(float(temperature.max()), k / 50)) ** (1.0 / max(1, iterations))
+        for _ in range(iterations):
+            displacement = barnes_hut_repulsion(positions, k * k, self.theta)
+            if sources.size:
+                delta = positions[targets] - positions[sources]
+                distance = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), 1e-6)
+                pull = delta * (distance / k)[:, None]
+                for axis in range(2):
+                    displacement[:, axis] += np.bincount(sources, pull[:, axis], minlength=count)
+                    displacement[:, axis] -= np.bincount(targets, pull[:, axis], minlength=count)
+            displacement += self.gravity * (positions.mean(axis=0) - positions)
+            length = np.maximum(np.hypot(displacement[:, 0], displacement[:, 1]), 1e-9)
+            step = np.minimum(length, temperature)
+            positions += displacement * (step / length)[:, None]
+            temperature *= cooling
+
+        raw = {node_id: (float(positions[i, 0]), float(positions[i, 1])) for i, node_id in enumerate(node_ids)}
+        return _fit(raw, previous if warm else None)
+
+    def _warm_positions(
+        self,
+        node_ids: List[str],
+        index: Dict[str, int],
+        sources: np.ndarray,
+        targets: np.ndarray,
+        previous: Layout,
+        rng: np.random.Generator,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        count = len(node_ids)
+        positions = np.zeros((count, 2), dtype=np.float64)
+        placed = np.zeros(count, dtype=bool)
+        for node_id, position in index.items():
+            point = previous.positions.get(node_id)
+            if point is not None:
+                positions[position] = point
+                placed[position] = True
+        fallback = positions[placed].mean(axis=0)
+        missing = np.nonzero(~placed)[0]
+        if missing.size:
+            total = np.zeros((count, 2))
+            degree = np.zeros(count)
+            for a, b in ((sources, targets), (targets, sources)):
+                known = placed[b]
+                np.add.at(total, a[known], positions[b[known]])
+                np.add.at(degree, a[known], 1.0)
+            anchor = np.where(
+                (degree[missing] > 0)[:, None],
+                total[missing] / np.maximum(degree[missing], 1.0)[:, None],
+                fallback,
+            )
+            jitter = rng.normal(0.0, self.ideal_length / 2, size=(missing.size, 2))
+            positions[missing] = anchor + jitter
+        return positions, placed
+
+
+class AutoLayout(LayoutEngine):
+    """Uses the layered layout for DAGs and the force layout otherwise.
+
+    Graphs with more than ``force_limit`` nodes always use the layered
+    layout, which breaks cycles itself and costs far less than the force
+    simulation at that size.
+    """
+
+    name = "auto"
+
+    def __init__(
+        self,
+        layered: Optional[LayeredLayout] = None,
+        force: Optional[ForceDirectedLayout] = None,
+        force_limit: int = 5000,
+    ) -> None:
+        self.layered = layered or LayeredLayout()
+        self.force = force or ForceDirectedLayout()
+        self.force_limit = force_limit
+
+    def compute(
+        self,
+        nodes: Sequence[Node],
+        edges: Sequence[Edge],
+        previous: Optional[Layout] = None,
+    ) -> Layout:
+        known = set(node_columns(nodes).ids)
+        pairs = _simple_pairs(edges, known)
+        if pairs and (len(known) > self.force_limit or _is_acyclic(known, pairs)):
+            return self.layered.compute(nodes, edges, previous)
+        return self.force.compute(nodes, edges, previous)
+
+
+LAYOUT_ENGINES = {
+    "auto": AutoLayout,
+    "circular": CircularLayout,
+    "layered": LayeredLayout,
+    "force": ForceDirectedLayout,
+}
+
+
+def get_layout_engine(layout: Union[str, LayoutEngine]) -> LayoutEngine:
+    if isinstance(layout, LayoutEngine):
+        return layout
+    try:
+        return LAYOUT_ENGINES[layout]()
+    except KeyError:
+        raise ValueError(f"unknown layout {layout!r}") from None
+
+
+def barnes_hut_repulsion(positions: np.ndarray, strength: float, theta: float = 0.8, max_depth: int = 16) -> np.ndarray:
+    """Approximates the pairwise ``strength / distance`` repulsion on each body.
+
+    Bodies are sorted along a Morton curve; each quadtree level is then the
+    set of distinct code prefixes, with masses and centres of mass obtained by
+    segmented reductions. The traversal keeps a frontier of (body, cell)
+    pairs and either accepts a cell as a point mass or replaces it by its
+    children, one level at a time for every body simultaneously.
+    """
+    count = len(positions)
+    force = np.zeros_like(positions)
+    if count < 2:
+        return force
+    lower = positions.min(axis=0)
+    span = float((positions.max(axis=0) - lower).max()) or 1.0
+    cells_per_side = 1 << max_depth
+    grid = np.minimum(((positions - lower) / span * cells_per_side).astype(np.uint64), cells_per_side - 1)
+    codes = _interleave(grid[:, 0]) | (_interleave(grid[:, 1]) << np.uint64(1))
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    sorted_positions = positions[order]
+
+    level_codes: List[np.ndarray] = []
+    level_mass: List[np.ndarray] = []
+    level_center: List[np.ndarray] = []
+    body_cell: List[np.ndarray] = []
+    for level in range(max_depth + 1):
+        prefixes = sorted_codes >> np.uint64(2 * (max_depth - level))
+        starts = np.concatenate(([0], np.nonzero(np.diff(prefixes))[0] + 1))
+        mass = np.diff(np.append(starts, count))
+        center = np.add.reduceat(sorted_positions, starts, axis=0) / mass[:, None]
+        cell_of_sorted = np.repeat(np.arange(len(starts)), mass)
+        cell_of_body = np.empty(count, dtype=np.int64)
+        cell_of_body[order] = cell_of_sorted
+        level_codes.append(prefixes[starts])
+        level_mass.append(mass)
+        level_center.append(center)
+        body_cell.append(cell_of_body)
+
+    bodies = np.arange(count)
+    cells = np.zeros(count, dtype=np.int64)
+    for level in range(max_depth + 1):
+        if bodies.size == 0:
+            break
+        mass = level_mass[level][cells]
+        delta = positions[bodies] - level_center[level][cells]
+        distance_sq = (delta * delta).sum(axis=1)
+        own = body_cell[level][bodies] == cells
+        size = span / (1 << level)
+        far = size * size < theta * theta * distance_sq
+        leaf = (mass == 1) | (level == max_depth)
+        accept = (far & ~own) | leaf
+        weight = np.where(own, mass - 1, mass).astype(np.float64)
+        distance_sq = np.maximum(distance_sq, 1e-6)
+        use = accept & (weight > 0)
+        if use.any():
+            scale = strength * weight[use] / distance_sq[use]
+            for axis in range(2):
+                force[:, axis] += np.bincount(bodies[use], delta[use, axis] * scale, minlength=count)
+        expand = ~accept
+        if not expand.any() or level == max_depth:
+            break
+        parents = level_codes[level][cells[expand]] << np.uint64(2)
+        child_codes = level_codes[level + 1]
+        first = np.searchsorted(child_codes, parents)
+        last = np.searchsorted(child_codes, parents + np.uint64(4))
+        counts = last - first
+        bodies = np.repeat(bodies[expand], counts)
+        offsets = np.cumsum(counts) - counts
+        cells = np.arange(int(counts.sum())) + np.repeat(first - offsets, counts)
+    return force
+
+
+def _interleave(values: np.ndarray) -> np.ndarray:
+    values = values & np.uint64(0xFFFF)
+    values = (values | (values << np.uint64(8))) & np.uint64(0x00FF00FF)
+    values = (values | (values << np.uint64(4))) & np.uint64(0x0F0F0F0F)
+    values = (values | (values << np.uint64(2))) & np.uint64(0x33333333)
+    values = (values | (values << np.uint64(1))) & np.uint64(0x55555555)
+    return values
+
+
+def _simple_pairs(edges: Iterable[Edge], known: Set[str]) -> List[Tuple[str, str]]:
+    """Returns distinct directed endpoint pairs, skipping self loops and dangling edges."""
+    seen: Set[Tuple[str, str]] = set()
+    pairs: List[Tuple[str, str]] = []
+    columns = edge_columns(edges)
+    for pair in zip(columns.sources, columns.targets):
+        source, target = pair
+        if source == target or pair in seen:
+            continue
+        if source in known and target in known:
+            seen.add(pair)
+            pairs.append(pair)
+    return pairs
+
+
+def _is_acyclic(node_ids: Iterable[str], pairs: List[Tuple[str, str]]) -> bool:
+    indegree: Dict[str, int] = {node_id: 0 for node_id in node_ids}
+    outgoing: Dict[str, List[str]] = defaultdict(list)
+    for source, target in pairs:
+        outgoing[source].append(target)
+        indegree[target] += 1
+    queue = deque(node_id for node_id, degree in indegree.items() if degree == 0)
+    visited = 0
+    while queue:
+        node_id = queue.popleft()
+        visited += 1
+        for target in outgoing[node_id]:
+            indegree[target] -= 1
+            if indegree[target] == 0:
+                queue.append(target)
+    return visited == len(indegree)
+
+
+def _break_cycles(node_ids: List[str], pairs: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Reverses DFS back edges (iteratively) so the result is acyclic."""
+    outgoing: Dict[str, List[str]] = defaultdict(list)
+    for source, target in pairs:
+        outgoing[source].append(target)
+    state: Dict[str, int] = {}
+    back: Set[Tuple[str, str]] = set()
+    for root in node_ids:
+        if root in state:
+            continue
+        state[root] = 1
+        stack = [(root, iter(outgoing[root]))]
+        while stack:
+            node_id, children = stack[-1]
+            advanced = False
+            for child in children:
+                child_state = state.get(child, 0)
+                if child_state == 0:
+                    state[child] = 1
+                    stack.append((child, iter(outgoing[child])))
+                    advanced = True
+                    break
+                if child_state == 1:
+                    back.add((node_id, child))
+            if not advanced:
+                state[node_id] = 2
+                stack.pop()
+    result: List[Tuple[str, str]] = []
+    seen: Set[Tuple[str, str]] = set()
+    for pair in pairs:
+        oriented = (pair[1], pair[0]) if pair in back else pair
+        if oriented not in seen:
+            seen.add(oriented)
+            result.append(oriented)
+    return result
+
+
+def _longest_path_ranks(node_ids: List[str], pairs: List[Tuple[str, str]]) -> Dict[str, int]:
+    rank = {node_id: 0 for node_id in node_ids}
+    indegree = {node_id: 0 for node_id in node_ids}
+    outgoing: Dict[str, List[str]] = defaultdict(list)
+    for source, target in pairs:
+        outgoing[source].append(target)
+        indegree[target] += 1
+    queue = deque(node_id for node_id in node_ids if indegree[node_id] == 0)
+    while queue:
+        node_id = queue.popleft()
+        for target in outgoing[node_id]:
+            rank[target] = max(rank[target], rank[node_id] + 1)
+            indegree[target] -= 1
+            if indegree[target] == 0:
+                queue.append(target)
+    return rank
+
+
+__all__ = [
+    "AutoLayout",
+    "CircularLayout",
+    "ForceDirectedLayout",
+    "LAYOUT_ENGINES",
+    "LayeredLayout",
+    "Layout",
+    "LayoutEngine",
+    "barnes_hut_repulsion",
+    "get_layout_engine",
+]
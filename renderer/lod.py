@@ -0,0 +1,444 @@
+"""Level-of-detail scenes and spatial indexing for very large SVG exports."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from html import escape
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .layout import Layout
+from .models import Edge, EdgeView, GraphVersion, Node, NodeView, edge_columns, node_columns
+
+BBox = Tuple[float, float, float, float]
+
+NODE_RADIUS = 30.0
+# Circle plus the trust caption underneath it.
+_NODE_EXTENT = (NODE_RADIUS + 2, NODE_RADIUS + 2, NODE_RADIUS + 2, NODE_RADIUS + 16)
+_EDGE_PAD = 18.0
+
+
+def _endpoint_indices(
+    nodes: Sequence[Node], edges: Sequence[Edge]
+) -> Tuple[np.ndarray, np.ndarray]:
+    if isinstance(nodes, NodeView) and isinstance(edges, EdgeView) and nodes.frame is edges.frame:
+        sources = edges.frame.edge_source_array()
+        targets = edges.frame.edge_target_array()
+        keep = (sources >= 0) & (targets >= 0)
+        return sources[keep], targets[keep]
+    index = {node_id: position for position, node_id in enumerate(node_columns(nodes).ids)}
+    columns = edge_columns(edges)
+    pairs = [
+        (index[source], index[target])
+        for source, target in zip(columns.sources, columns.targets)
+        if source in index and target in index
+    ]
+    array = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+    return array[:, 0], array[:, 1]
+
+
+def cluster_components(nodes: Sequence[Node], edges: Sequence[Edge]) -> np.ndarray:
+    """Labels every node with the index of its (weakly) connected component."""
+    parent = list(range(len(nodes)))
+
+    def find(item: int) -> int:
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    sources, targets = _endpoint_indices(nodes, edges)
+    for source, target in zip(sources.tolist(), targets.tolist()):
+        root_a, root_b = find(source), find(target)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+    roots = np.array([find(item) for item in range(len(nodes))], dtype=np.int64)
+    return np.unique(roots, return_inverse=True)[1].reshape(-1)
+
+
+def cluster_communities(
+    nodes: Sequence[Node],
+    edges: Sequence[Edge],
+    iterations: int = 30,
+    seed: int = 0,
+) -> np.ndarray:
+    """Labels nodes with communities found by vectorized label propagation.
+
+    Every round a random half of the nodes adopts the label most common
+    among its neighbours; the current label wins ties, otherwise the
+    smallest label does. Updating half the nodes at a time avoids the
+    label swapping of fully synchronous propagation, and the fixed seed
+    keeps the result deterministic.
+    """
+    count = len(nodes)
+    labels = np.arange(count, dtype=np.int64)
+    sources, targets = _endpoint_indices(nodes, edges)
+    keep = sources != targets
+    sources, targets = sources[keep], targets[keep]
+    if count == 0 or sources.size == 0:
+        return labels
+    voters = np.concatenate([sources, targets])
+    neighbours = np.concatenate([targets, sources])
+    rng = np.random.default_rng(seed)
+    for _ in range(iterations):
+        keys = voters * count + labels[neighbours]
+        unique, votes = np.unique(keys, return_counts=True)
+        owner = unique // count
+        label = unique % count
+        own = label == labels[owner]
+        # Highest vote first, the current label winning ties, then the smallest label.
+        order = np.lexsort((label, ~own, -votes, owner))
+        first = np.ones(order.size, dtype=bool)
+        first[1:] = owner[order][1:] != owner[order][:-1]
+        chosen = order[first]
+        changing = ~own[chosen]
+        if not changing.any():
+            break
+        active = changing & (rng.random(chosen.size) < 0.5)
+        updated = labels.copy()
+        updated[owner[chosen[active]]] = label[chosen[active]]
+        labels = updated
+    return np.unique(labels, return_inverse=True)[1].reshape(-1)
+
+
+def coarsen_clusters(clusters: np.ndarray, positions: np.ndarray, max_clusters: int) -> np.ndarray:
+    """Merges clusters whose centroids share a grid cell until at most ``max_clusters`` remain.
+
+    The cell starts at roughly ``span / sqrt(max_clusters)`` and grows until
+    the bound holds, so summary levels of huge, loosely clustered graphs
+    (trees, isolated nodes) stay bounded in size.
+    """
+    if clusters.size == 0 or int(clusters.max()) + 1 <= max_clusters:
+        return clusters
+    cluster_count = int(clusters.max()) + 1
+    sizes = np.bincount(clusters, minlength=cluster_count)
+    centroid = np.stack(
+        [np.bincount(clusters, positions[:, axis], minlength=cluster_count) / sizes for axis in range(2)],
+        axis=1,
+    )
+    lower = centroid.min(axis=0)
+    cell = max(float((centroid.max(axis=0) - lower).max()), 1.0) / math.sqrt(max_clusters)
+    while True:
+        grid = np.floor((centroid - lower) / cell).astype(np.int64)
+        merged = np.unique(grid[:, 0] * (int(grid[:, 1].max()) + 1) + grid[:, 1], return_inverse=True)[1].reshape(-1)
+        if int(merged.max()) + 1 <= max_clusters:
+            return merged[clusters]
+        cell *= 1.5
+
+
+class GridIndex:
+    """Uniform-grid spatial index over axis-aligned bounding boxes.
+
+    Each box is registered in every grid cell it overlaps (boxes covering
+    more than ``max_cells`` cells are kept in a small overflow list instead),
+    so a query only inspects the cells under the viewport and then filters
+    the candidates exactly.
+    """
+
+    def __init__(self, boxes: np.ndarray, cell_size: float = 512.0, max_cells: int = 64) -> None:
+        self.boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        self.cell_size = float(cell_size)
+        count = len(self.boxes)
+        if count == 0:
+            self._keys = np.zeros(0, dtype=np.int64)
+            self._members = np.zeros(0, dtype=np.int64)
+            self._overflow = np.zeros(0, dtype=np.int64)
+            self._columns = 1
+            self._rows = 1
+            return
+        first = np.floor(self.boxes[:, :2] / self.cell_size).astype(np.int64)
+        last = np.floor(self.boxes[:, 2:] / self.cell_size).astype(np.int64)
+        self._origin = first.min(axis=0)
+        first -= self._origin
+        last -= self._origin
+        self._columns = int(last[:, 0].max()) + 1
+        self._rows = int(last[:, 1].max()) + 1
+        span = last - first + 1
+        cells = span[:, 0] * span[:, 1]
+        small = cells <= max_cells
+        self._overflow = np.nonzero(~small)[0]
+        members = np.nonzero(small)[0]
+        counts = cells[members]
+        owner = np.repeat(members, counts)
+        offset = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+        width = span[owner, 0]
+        column = first[owner, 0] + offset % width
+        row = first[owner, 1] + offset // width
+        keys = row * self._columns + column
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self._members = owner[order]
+
+    def query(self, bbox: BBox) -> np.ndarray:
+        """Returns the sorted indices of boxes intersecting ``bbox``."""
+        if len(self.boxes) == 0:
+            return np.zeros(0, dtype=np.int64)
+        x0, y0, x1, y1 = bbox
+        c0 = max(0, int(math.floor(x0 / self.cell_size)) - int(self._origin[0]))
+        c1 = min(self._columns - 1, int(math.floor(x1 / self.cell_size)) - int(self._origin[0]))
+        r0 = max(0, int(math.floor(y0 / self.cell_size)) - int(self._origin[1]))
+        r1 = min(self._rows - 1, int(math.floor(y1 / self.cell_size)) - int(self._origin[1]))
+        chunks = [self._overflow]
+        if c0 <= c1 and r0 <= r1:
+            rows = np.arange(r0, r1 + 1, dtype=np.int64)
+            lows = np.searchsorted(self._keys, rows * self._columns + c0, side="left")
+            highs = np.searchsorted(self._keys, rows * self._columns + c1, side="right")
+            chunks.extend(self._members[low:high] for low, high in zip(lows, highs) if high > low)
+        candidates = np.unique(np.concatenate(chunks))
+        boxes = self.boxes[candidates]
+        hit = (boxes[:, 0] <= x1) & (boxes[:, 2] >= x0) & (boxes[:, 1] <= y1) & (boxes[:, 3] >= y0)
+        return candidates[hit]
+
+
+@dataclass
+class LodLevel:
+    """One level of detail: SVG fragments, their bounds and a spatial index.
+
+    Edge fragments precede node fragments so that index order is paint order.
+    """
+
+    name: str
+    element_ids: List[str]
+    markup: List[str]
+    boxes: np.ndarray
+    index: GridIndex = field(repr=False)
+
+    def query(self, bbox: BBox) -> List[str]:
+        return [self.markup[position] for position in self.index.query(bbox)]
+
+    def __len__(self) -> int:
+        return len(self.markup)
+
+
+@dataclass
+class LodScene:
+    """Levels of detail for one graph version, coarsest first.
+
+    Levels are ``components`` (connected components collapsed into summary
+    nodes), ``communities`` (label-propagation communities collapsed) and
+    ``full``. Both summary levels hold at most ``max_clusters`` summary
+    nodes, clusters sharing a grid cell being merged past that (see
+    :func:`coarsen_clusters`), and ``2 * max_clusters`` merged edges.
+    :meth:`level_for_zoom` picks the level whose node circles would still be
+    legible at the requested zoom factor.
+    """
+
+    graph_id: str
+    version: int
+    width: float
+    height: float
+    levels: Dict[str, LodLevel]
+    zoom_thresholds: Tuple[float, float] = (0.05, 0.2)
+
+    @classmethod
+    def build(
+        cls,
+        version: GraphVersion,
+        layout: Layout,
+        edge_elements: Mapping[str, str],
+        node_elements: Mapping[str, str],
+        cell_size: float = 512.0,
+        zoom_thresholds: Tuple[float, float] = (0.05, 0.2),
+        max_clusters: int = 2000,
+    ) -> "LodScene":
+        nodes = version.nodes if isinstance(version.nodes, NodeView) else list(version.nodes)
+        edges = version.edges if isinstance(version.edges, EdgeView) else list(version.edges)
+        default = layout.center()
+        positions = np.array(
+            [layout.positions.get(node_id, default) for node_id in node_columns(nodes).ids], dtype=np.float64
+        ).reshape(-1, 2)
+        node_markup = list(node_elements.values())
+        # svg_elements skips edges with unplaced endpoints; mirror that here so
+        # fragments and geometry line up.
+        edge_cols = edge_columns(edges)
+        drawn_edges = [
+            (source, target)
+            for source, target in zip(edge_cols.sources, edge_cols.targets)
+            if source in layout.positions and target in layout.positions
+        ]
+        edge_markup = list(edge_elements.values())
+
+        node_boxes = _node_boxes(positions, np.full(len(nodes), NODE_RADIUS))
+        edge_boxes = _edge_boxes(
+            np.array(
+                [(*layout.positions[source], *layout.positions[target]) for source, target in drawn_edges],
+                dtype=np.float64,
+            ).reshape(-1, 4)
+        )
+        full = _level(
+            "full",
+            list(edge_elements) + list(node_elements),
+            edge_markup + node_markup,
+            np.concatenate([edge_boxes, node_boxes]),
+            cell_size,
+        )
+        components = coarsen_clusters(cluster_components(nodes, edges), positions, max_clusters)
+        communities = coarsen_clusters(cluster_communities(nodes, edges), positions, max_clusters)
+        levels = {
+            name: _collapsed_level(name, clusters, nodes, edges, positions, node_elements, cell_size, 2 * max_clusters)
+            for name, clusters in (("components", components), ("communities", communities))
+        }
+        levels["full"] = full
+        return cls(
+            graph_id=version.graph_id,
+            version=version.version,
+            width=layout.width,
+            height=layout.height,
+            levels=levels,
+            zoom_thresholds=zoom_thresholds,
+        )
+
+    def level_for_zoom(self, zoom: float) -> LodLevel:
+        coarse, medium = self.zoom_thresholds
+        if zoom < coarse:
+            return self.levels["components"]
+        if zoom < medium:
+            return self.levels["communities"]
+        return self.levels["full"]
+
+    def tile_grid(self, zoom: float, tile_size: int = 512) -> Tuple[int, int]:
+        """Number of tile columns and rows covering the canvas at ``zoom``."""
+        span = tile_size / zoom
+        return max(1, math.ceil(self.width / span)), max(1, math.ceil(self.height / span))
+
+    def tile_bbox(self, zoom: float, column: int, row: int, tile_size: int = 512) -> BBox:
+        span = tile_size / zoom
+        return (column * span, row * span, (column + 1) * span, (row + 1) * span)
+
+
+def _node_boxes(positions: np.ndarray, radius: np.ndarray) -> np.ndarray:
+    left, top, right, bottom = _NODE_EXTENT
+    grow = (radius - NODE_RADIUS)
+    return np.stack(
+        [
+            positions[:, 0] - left - grow,
+            positions[:, 1] - top - grow,
+            positions[:, 0] + right + grow,
+            positions[:, 1] + bottom + grow,
+        ],
+        axis=1,
+    )
+
+
+def _edge_boxes(segments: np.ndarray) -> np.ndarray:
+    return np.stack(
+        [
+            np.minimum(segments[:, 0], segments[:, 2]) - _EDGE_PAD,
+            np.minimum(segments[:, 1], segments[:, 3]) - _EDGE_PAD,
+            np.maximum(segments[:, 0], segments[:, 2]) + _EDGE_PAD,
+            np.maximum(segments[:, 1], segments[:, 3]) + _EDGE_PAD,
+        ],
+        axis=1,
+    )
+
+
+def _level(name: str, element_ids: List[str], markup: List[str], boxes: np.ndarray, cell_size: float) -> LodLevel:
+    boxes = boxes.reshape(-1, 4)
+    return LodLevel(name, element_ids, markup, boxes, GridIndex(boxes, cell_size))
+
+
+def _collapsed_level(
+    name: str,
+    clusters: np.ndarray,
+    nodes: Sequence[Node],
+    edges: Sequence[Edge],
+    positions: np.ndarray,
+    node_elements: Mapping[str, str],
+    cell_size: float,
+    max_edges: Optional[int] = None,
+) -> LodLevel:
+    """Replaces every multi-node cluster by one summary node.
+
+    Summary nodes sit at the members' centroid, grow with the square root of
+    the member count and are labelled after their best-connected member.
+    Edges between clusters are merged and drawn thicker with multiplicity;
+    only the ``max_edges`` heaviest merged edges are kept.
+    """
+    count = len(nodes)
+    if count == 0:
+        return _level(name, [], [], np.zeros((0, 4)), cell_size)
+    cluster_count = int(clusters.max()) + 1
+    sizes = np.bincount(clusters, minlength=cluster_count)
+    centroid = np.stack(
+        [np.bincount(clusters, positions[:, axis], minlength=cluster_count) / sizes for axis in range(2)],
+        axis=1,
+    )
+    sources, targets = _endpoint_indices(nodes, edges)
+    degree = np.bincount(np.concatenate([sources, targets]), minlength=count) if sources.size else np.zeros(count, dtype=np.int64)
+    columns = node_columns(nodes)
+    trust = np.bincount(clusters, np.asarray(columns.trust, dtype=np.float64), minlength=cluster_count) / sizes
+    ambiguous = np.bincount(clusters, np.asarray(columns.ambiguous, dtype=np.float64), minlength=cluster_count) > 0
+    # Representative: highest degree, then first in node order.
+    order = np.lexsort((np.arange(count), -degree, clusters))
+    first = np.ones(count, dtype=bool)
+    first[1:] = clusters[order][1:] != clusters[order][:-1]
+    representative = np.empty(cluster_count, dtype=np.int64)
+    representative[clusters[order[first]]] = order[first]
+    radius = np.where(sizes > 1, NODE_RADIUS * np.sqrt(sizes), NODE_RADIUS)
+    radius = np.minimum(radius, NODE_RADIUS * 20)
+
+    edge_ids: List[str] = []
+    edge_markup: List[str] = []
+    edge_segments: List[Tuple[float, float, float, float]] = []
+    if sources.size:
+        a, b = clusters[sources], clusters[targets]
+        inter = a != b
+        pairs, multiplicity = np.unique(np.stack([a[inter], b[inter]], axis=1), axis=0, return_counts=True)
+        if max_edges is not None and len(pairs) > max_edges:
+            heaviest = np.sort(np.argsort(-multiplicity, kind="stable")[:max_edges])
+            pairs, multiplicity = pairs[heaviest], multiplicity[heaviest]
+        for (source, target), weight in zip(pairs.tolist(), multiplicity.tolist()):
+            sx, sy = centroid[source]
+            tx, ty = centroid[target]
+            width = round(min(2 + math.log2(weight), 12), 2)
+            element_id = f"{name}-edge-{source}-{target}"
+            edge_ids.append(element_id)
+            edge_segments.append((sx, sy, tx, ty))
+            edge_markup.append(
+                f'<g id="{element_id}"><line x1="{sx:.2f}" y1="{sy:.2f}" x2="{tx:.2f}" y2="{ty:.2f}" '
+                f'stroke="#555" stroke-width="{width}" marker-end="url(#arrow)" /></g>'
+            )
+
+    element_ids = list(node_elements)
+    node_markup = list(node_elements.values())
+    node_ids: List[str] = []
+    markup: List[str] = []
+    for cluster in range(cluster_count):
+        member = int(representative[cluster])
+        if sizes[cluster] == 1:
+            node_ids.append(element_ids[member])
+            markup.append(node_markup[member])
+            continue
+        x, y = centroid[cluster]
+        r = radius[cluster]
+        stroke = "#ff9800" if ambiguous[cluster] else "#1976d2"
+        dash = "4 2" if ambiguous[cluster] else ""
+        element_id = f"{name}-{cluster}"
+        label = escape(f"{columns.labels[member]} (+{int(sizes[cluster]) - 1})")
+        node_ids.append(element_id)
+        markup.append(
+            f'<g id="{element_id}" class="cluster">'
+            f'<circle cx="{x:.2f}" cy="{y:.2f}" r="{r:.2f}" fill="#e3f2fd" stroke="{stroke}" stroke-width="2" stroke-dasharray="{dash}" />'
+            f'<text x="{x:.2f}" y="{y:.2f}" font-size="12" text-anchor="middle" dominant-baseline="middle">{label}</text>'
+            f'<text x="{x:.2f}" y="{y + r + 12:.2f}" font-size="10" text-anchor="middle" fill="#555">trust: {trust[cluster]:.2f}</text>'
+            "</g>"
+        )
+    boxes = np.concatenate(
+        [
+            _edge_boxes(np.array(edge_segments, dtype=np.float64).reshape(-1, 4)),
+            _node_boxes(centroid, radius),
+        ]
+    )
+    return _level(name, edge_ids + node_ids, edge_markup + markup, boxes, cell_size)
+
+
+__all__ = [
+    "GridIndex",
+    "LodLevel",
+    "LodScene",
+    "cluster_communities",
+    "cluster_components",
+    "coarsen_clusters",
+]
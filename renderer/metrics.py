@@ -0,0 +1,420 @@
+"""Lightweight metrics for the renderer hot paths.
+
+The package-wide :data:`REGISTRY` is disabled by default. While disabled,
+``inc``/``observe`` return immediately and ``timed`` hands out one shared
+no-op context manager, so instrumented code pays a method call and a flag
+check. Enable it with ``REGISTRY.enable()`` and read the results with
+``snapshot()`` or ``to_prometheus()``.
+
+``enable_profiling`` attaches a sampling profiler to timed operations: a
+background thread samples the stack of every operation running longer than
+the threshold and reports the aggregated stacks as :class:`SlowOperation`.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import traceback
+from bisect import bisect_left
+from collections import Counter as _StackCounter
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Mapping, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _label_key(labels: Optional[Mapping[str, object]]) -> LabelKey:
+    if not labels:
+        return ()
+    return tuple(sorted((str(key), str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter, one value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str = "") -> None:
+        self.name = name
+        self.help = help
+        self.values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, labels: Optional[Mapping[str, object]] = None) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def value(self, labels: Optional[Mapping[str, object]] = None) -> float:
+        return self.values.get(_label_key(labels), 0.0)
+
+
+@dataclass
+class _Series:
+    counts: List[int]
+    total: float = 0.0
+    count: int = 0
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str = "", buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.series: Dict[LabelKey, _Series] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: Optional[Mapping[str, object]] = None) -> None:
+        key = _label_key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = _Series([0] * (len(self.buckets) + 1))
+            series.counts[index] += 1
+            series.total += value
+            series.count += 1
+
+    def quantile(self, fraction: float, labels: Optional[Mapping[str, object]] = None) -> float:
+        """Estimates a quantile by linear interpolation inside its bucket."""
+        series = self.series.get(_label_key(labels))
+        if series is None or series.count == 0:
+            return 0.0
+        rank = fraction * series.count
+        seen = 0
+        lower = 0.0
+        for index, bucket_count in enumerate(series.counts):
+            upper = self.buckets[index] if index < len(self.buckets) else lower
+            if bucket_count and seen + bucket_count >= rank:
+                return lower + (upper - lower) * ((rank - seen) / bucket_count)
+            seen += bucket_count
+            lower = upper
+        return lower
+
+
+@dataclass
+class SlowOperation:
+    """A timed operation that exceeded the profiling threshold."""
+
+    name: str
+    labels: Dict[str, str]
+    duration: float
+    thread_id: int
+    samples: Dict[str, int] = field(default_factory=dict)
+
+    def top_stacks(self, limit: int = 5) -> List[Tuple[str, int]]:
+        return sorted(self.samples.items(), key=lambda item: -item[1])[:limit]
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "name": self.name,
+            "labels": self.labels,
+            "duration": self.duration,
+            "thread_id": self.thread_id,
+            "samples": self.samples,
+        }
+
+
+class _ActiveOperation:
+    __slots__ = ("name", "labels", "started", "thread_id", "samples")
+
+    def __init__(self, name: str, labels: LabelKey, thread_id: int) -> None:
+        self.name = name
+        self.labels = labels
+        self.started = time.perf_counter()
+        self.thread_id = thread_id
+        self.samples: _StackCounter = _StackCounter()
+
+
+class SamplingProfiler:
+    """Samples the stacks of long-running timed operations from a daemon thread."""
+
+    def __init__(
+        self,
+        threshold: float,
+        interval: float,
+        callback: Optional[Callable[[SlowOperation], None]] = None,
+        keep: int = 50,
+        max_depth: int = 25,
+    ) -> None:
+        self.threshold = threshold
+        self.interval = interval
+        self.callback = callback
+        self.max_depth = max_depth
+        self.slow: Deque[SlowOperation] = deque(maxlen=keep)
+        self._active: Dict[int, _ActiveOperation] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-profiler", daemon=True)
+        self._thread.start()
+
+    def begin(self, name: str, labels: LabelKey) -> _ActiveOperation:
+        operation = _ActiveOperation(name, labels, threading.get_ident())
+        with self._lock:
+            self._active[id(operation)] = operation
+        return operation
+
+    def end(self, operation: _ActiveOperation, duration: float) -> None:
+        # Samples are only recorded for active operations (under the lock),
+        # so once popped, ``operation.samples`` can be copied safely.
+        with self._lock:
+            self._active.pop(id(operation), None)
+        if duration < self.threshold:
+            return
+        slow = SlowOperation(
+            name=operation.name,
+            labels=dict(operation.labels),
+            duration=duration,
+            thread_id=operation.thread_id,
+            samples=dict(operation.samples),
+        )
+        self.slow.append(slow)
+        if self.callback is not None:
+            self.callback(slow)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            with self._lock:
+                due = [op for op in self._active.values() if now - op.started >= self.threshold]
+            if not due:
+                continue
+            frames = sys._current_frames()
+            sampled: List[Tuple[_ActiveOperation, str]] = []
+            for operation in due:
+                frame = frames.get(operation.thread_id)
+                if frame is None:
+                    continue
+                stack = traceback.extract_stack(frame, limit=self.max_depth)
+                signature = ";".join(
+                    f"{entry.name} ({entry.filename.rsplit('/', 1)[-1]}:{entry.lineno})" for entry in stack
+                )
+                sampled.append((operation, signature))
+            with self._lock:
+                for operation, signature in sampled:
+                    # Skip operations that ended while their stack was read.
+                    if self._active.get(id(operation)) is operation:
+                        operation.samples[signature] += 1
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "labels", "started", "operation")
+
+    def __init__(self, registry: "MetricsRegistry", name: str, labels: Optional[Mapping[str, object]]) -> None:
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.operation: Optional[_ActiveOperation] = None
+
+    def __enter__(self) -> "_Timer":
+        profiler = self.registry.profiler
+        if profiler is not None:
+            self.operation = profiler.begin(self.name, _label_key(self.labels))
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        duration = time.perf_counter() - self.started
+        self.registry.histogram(self.name).observe(duration, self.labels)
+        profiler = self.registry.profiler
+        if self.operation is not None and profiler is not None:
+            profiler.end(self.operation, duration)
+
+
+class MetricsRegistry:
+    """Named counters and histograms with dict and Prometheus export."""
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.profiler: Optional[SamplingProfiler] = None
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+        if self.profiler is not None:
+            self.profiler.slow.clear()
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        return self._get_or_create(name, Counter, lambda: Counter(name, help))
+
+    def histogram(self, name: str, help: str = "", buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(name, Histogram, lambda: Histogram(name, help, buckets))
+
+    def _get_or_create(self, name: str, kind: type, factory: Callable[[], object]):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = factory()
+        if not isinstance(metric, kind):
+            raise ValueError(f"metric {name} is already registered as a {metric.kind}")
+        return metric
+
+    def inc(self, name: str, amount: float = 1.0, labels: Optional[Mapping[str, object]] = None) -> None:
+        if not self.enabled:
+            return
+        self.counter(name).inc(amount, labels)
+
+    def observe(self, name: str, value: float, labels: Optional[Mapping[str, object]] = None) -> None:
+        if not self.enabled:
+            return
+        self.histogram(name).observe(value, labels)
+
+    def timed(self, name: str, labels: Optional[Mapping[str, object]] = None):
+        """Context manager recording the block's wall time into histogram ``name``."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def enable_profiling(
+        self,
+        threshold: float = 0.1,
+        interval: float = 0.005,
+        callback: Optional[Callable[[SlowOperation], None]] = None,
+        keep: int = 50,
+    ) -> SamplingProfiler:
+        """Samples stacks of timed operations slower than ``threshold`` seconds."""
+        self.disable_profiling()
+        self.profiler = SamplingProfiler(threshold, interval, callback, keep)
+        return self.profiler
+
+    def disable_profiling(self) -> None:
+        profiler, self.profiler = self.profiler, None
+        if profiler is not None:
+            profiler.stop()
+
+    def slow_operations(self) -> List[SlowOperation]:
+        return list(self.profiler.slow) if self.profiler is not None else []
+
+    def snapshot(self) -> Dict[str, object]:
+        counters: Dict[str, object] = {}
+        histograms: Dict[str, object] = {}
+        for name, metric in sorted(self._metrics.items()):
+            if isinstance(metric, Counter):
+                counters[name] = {_format_labels(key): value for key, value in sorted(metric.values.items())}
+            elif isinstance(metric, Histogram):
+                histograms[name] = {
+                    _format_labels(key): {
+                        "count": series.count,
+                        "sum": series.total,
+                        "p50": metric.quantile(0.5, dict(key)),
+                        "p90": metric.quantile(0.9, dict(key)),
+                        "p99": metric.quantile(0.99, dict(key)),
+                        "buckets": dict(
+                            zip([*map(_format_value, metric.buckets), "+Inf"], _cumulative(series.counts))
+                        ),
+                    }
+                    for key, series in sorted(metric.series.items())
+                }
+        return {
+            "counters": counters,
+            "histograms": histograms,
+            "slow_operations": [operation.to_dict() for operation in self.slow_operations()],
+        }
+
+    def to_prometheus(self) -> str:
+        lines: List[str] = []
+        for name, metric in sorted(self._metrics.items()):
+            if metric.help:
+                lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            if isinstance(metric, Counter):
+                for key, value in sorted(metric.values.items()):
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+                continue
+            for key, series in sorted(metric.series.items()):
+                bounds = [*metric.buckets, float("inf")]
+                for bound, cumulative in zip(bounds, _cumulative(series.counts)):
+                    lines.append(f"{name}_bucket{_format_labels(key, (('le', _format_value(bound)),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(key)} {_format_value(series.total)}")
+                lines.append(f"{name}_count{_format_labels(key)} {series.count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _cumulative(counts: List[int]) -> List[int]:
+    running = 0
+    result = []
+    for count in counts:
+        running += count
+        result.append(running)
+    return result
+
+
+REGISTRY = MetricsRegistry()
+
+__all__ = [
+    "Counter",
+    "DEFAULT_BUCKETS",
+    "Histogram",
+    "MetricsRegistry",
+    "REGISTRY",
+    "SamplingProfiler",
+    "SlowOperation",
+]
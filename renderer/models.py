@@ -2,9 +2,17 @@
 
 from __future__ import annotations
 
+import json
+import struct
+import sys
+from array import array
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, overload
+
+import numpy as np
+
+from .persistent import PersistentSortedMap, SortedValues
 
 
 @dataclass(frozen=True)
@@ -47,40 +55,571 @@ class Edge:
 
 @dataclass
 class GraphVersion:
-    """A captured version of a graph, including change metadata."""
+    """A captured version of a graph, including change metadata.
+
+    ``nodes`` and ``edges`` are plain lists or read-only sequence views:
+    lazy views over a :class:`GraphFrame` (``frame`` is then set) or the
+    sorted values of persistent maps that share unchanged elements with
+    earlier versions (see :meth:`from_maps`). Versions loaded from
+    :class:`~renderer.storage.GraphPersistence` read them on first access.
+    """
 
     graph_id: str
     version: int
-    nodes: List[Node] = field(default_factory=list)
-    edges: List[Edge] = field(default_factory=list)
+    nodes: Sequence[Node] = field(default_factory=list)
+    edges: Sequence[Edge] = field(default_factory=list)
     created_at: datetime = field(default_factory=lambda: datetime.now(UTC))
     author_session: Optional[str] = None
     quality: Dict[str, object] = field(default_factory=dict)
+    frame: Optional["GraphFrame"] = field(default=None, repr=False, compare=False)
 
-    def to_dict(self) -> Dict[str, object]:
-        return {
+    @staticmethod
+    def from_frame(
+        graph_id: str,
+        version: int,
+        frame: "GraphFrame",
+        created_at: Optional[datetime] = None,
+        author_session: Optional[str] = None,
+        quality: Optional[Dict[str, object]] = None,
+    ) -> "GraphVersion":
+        return GraphVersion(
+            graph_id=graph_id,
+            version=version,
+            nodes=frame.nodes,
+            edges=frame.edges,
+            created_at=created_at or datetime.now(UTC),
+            author_session=author_session,
+            quality=quality or {},
+            frame=frame,
+        )
+
+    @staticmethod
+    def from_maps(
+        graph_id: str,
+        version: int,
+        nodes: PersistentSortedMap[str, Node],
+        edges: PersistentSortedMap[str, Edge],
+        created_at: Optional[datetime] = None,
+        author_session: Optional[str] = None,
+        quality: Optional[Dict[str, object]] = None,
+    ) -> "GraphVersion":
+        return GraphVersion(
+            graph_id=graph_id,
+            version=version,
+            nodes=nodes.values(),
+            edges=edges.values(),
+            created_at=created_at or datetime.now(UTC),
+            author_session=author_session,
+            quality=quality or {},
+        )
+
+    def node_map(self) -> PersistentSortedMap[str, Node]:
+        """Nodes keyed by id; shared rather than rebuilt for map-backed versions."""
+        if isinstance(self.nodes, SortedValues):
+            return self.nodes.map
+        return PersistentSortedMap((node.id, node) for node in self.nodes)
+
+    def edge_map(self) -> PersistentSortedMap[str, Edge]:
+        if isinstance(self.edges, SortedValues):
+            return self.edges.map
+        return PersistentSortedMap((edge.id, edge) for edge in self.edges)
+
+    def to_frame(self) -> "GraphFrame":
+        if self.frame is not None:
+            return self.frame
+        return GraphFrame.from_elements(self.nodes, self.edges)
+
+    def to_dict(self, columnar: bool = False) -> Dict[str, object]:
+        payload: Dict[str, object] = {
             "graph_id": self.graph_id,
             "version": self.version,
-            "nodes": [node.to_dict() for node in self.nodes],
-            "edges": [edge.to_dict() for edge in self.edges],
-            "created_at": self.created_at.isoformat().replace("+00:00", "Z"),
-            "author_session": self.author_session,
-            "quality": self.quality,
         }
+        if columnar:
+            payload["frame"] = self.to_frame().to_columns()
+        else:
+            payload["nodes"] = [node.to_dict() for node in self.nodes]
+            payload["edges"] = [edge.to_dict() for edge in self.edges]
+        payload.update(
+            {
+                "created_at": self.created_at.isoformat().replace("+00:00", "Z"),
+                "author_session": self.author_session,
+                "quality": self.quality,
+            }
+        )
+        return payload
 
     @staticmethod
     def from_dict(payload: Dict[str, object]) -> "GraphVersion":
+        created_at = datetime.fromisoformat(payload["created_at"].replace("Z", "+00:00"))
+        if "frame" in payload:
+            return GraphVersion.from_frame(
+                str(payload["graph_id"]),
+                int(payload["version"]),
+                GraphFrame.from_columns(payload["frame"]),
+                created_at=created_at,
+                author_session=payload.get("author_session"),
+                quality=payload.get("quality", {}),
+            )
         return GraphVersion(
             graph_id=str(payload["graph_id"]),
             version=int(payload["version"]),
             nodes=[Node(**node) for node in payload.get("nodes", [])],
             edges=[Edge(**edge) for edge in payload.get("edges", [])],
-            created_at=datetime.fromisoformat(payload["created_at"].replace("Z", "+00:00")),
+            created_at=created_at,
             author_session=payload.get("author_session"),
             quality=payload.get("quality", {}),
         )
 
 
+_NO_LABEL = -1
+
+
+class _StringTable:
+    """Interned, de-duplicated strings addressed by integer code."""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self, values: Optional[List[str]] = None) -> None:
+        self.values: List[str] = [sys.intern(value) for value in values or []]
+        self._codes: Dict[str, int] = {value: code for code, value in enumerate(self.values)}
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            value = sys.intern(value)
+            self.values.append(value)
+            self._codes[value] = code
+        return code
+
+
+class GraphFrame:
+    """Columnar, compact representation of a graph snapshot.
+
+    Node and edge ids are interned strings, labels are codes into a shared
+    de-duplicated label table, trust and weight are ``array('d')`` columns,
+    the ambiguous flags form a bitmap and edge endpoints are integer indices
+    into the node columns. Endpoints that do not name a node of the frame
+    are stored as ``-1 - k`` where ``k`` indexes ``external_ids``. Edges
+    without a label (``None``) use the label code ``-1``.
+
+    ``nodes`` and ``edges`` are read-only sequence views that build
+    :class:`Node`/:class:`Edge` objects only when an element is accessed;
+    the ``*_array`` helpers expose the numeric columns to NumPy without
+    copying.
+    """
+
+    __slots__ = (
+        "node_ids",
+        "labels",
+        "node_labels",
+        "trust",
+        "ambiguous",
+        "edge_ids",
+        "edge_sources",
+        "edge_targets",
+        "edge_labels",
+        "weights",
+        "external_ids",
+        "_node_index",
+    )
+
+    def __init__(
+        self,
+        node_ids: List[str],
+        labels: List[str],
+        node_labels: array,
+        trust: array,
+        ambiguous: bytearray,
+        edge_ids: List[str],
+        edge_sources: array,
+        edge_targets: array,
+        edge_labels: array,
+        weights: array,
+        external_ids: Optional[List[str]] = None,
+    ) -> None:
+        self.node_ids = node_ids
+        self.labels = labels
+        self.node_labels = node_labels
+        self.trust = trust
+        self.ambiguous = ambiguous
+        self.edge_ids = edge_ids
+        self.edge_sources = edge_sources
+        self.edge_targets = edge_targets
+        self.edge_labels = edge_labels
+        self.weights = weights
+        self.external_ids = external_ids or []
+        self._node_index: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def from_elements(cls, nodes: Iterable[Node], edges: Iterable[Edge]) -> "GraphFrame":
+        if isinstance(nodes, NodeView) and isinstance(edges, EdgeView) and nodes.frame is edges.frame:
+            return nodes.frame
+        labels = _StringTable()
+        node_ids: List[str] = []
+        node_labels = array("q")
+        trust = array("d")
+        flags: List[bool] = []
+        for node in nodes:
+            node_ids.append(sys.intern(node.id))
+            node_labels.append(labels.code(node.label))
+            trust.append(node.trust)
+            flags.append(bool(node.ambiguous))
+        index = {node_id: position for position, node_id in enumerate(node_ids)}
+        external = _StringTable()
+
+        def endpoint(node_id: str) -> int:
+            position = index.get(node_id)
+            return position if position is not None else -1 - external.code(node_id)
+
+        edge_ids: List[str] = []
+        edge_sources = array("q")
+        edge_targets = array("q")
+        edge_labels = array("q")
+        weights = array("d")
+        for edge in edges:
+            edge_ids.append(sys.intern(edge.id))
+            edge_sources.append(endpoint(edge.source))
+            edge_targets.append(endpoint(edge.target))
+            edge_labels.append(_NO_LABEL if edge.label is None else labels.code(edge.label))
+            weights.append(edge.weight)
+        frame = cls(
+            node_ids,
+            labels.values,
+            node_labels,
+            trust,
+            _pack_bits(flags),
+            edge_ids,
+            edge_sources,
+            edge_targets,
+            edge_labels,
+            weights,
+            external.values,
+        )
+        frame._node_index = index
+        return frame
+
+    @property
+    def nodes(self) -> "NodeView":
+        return NodeView(self)
+
+    @property
+    def edges(self) -> "EdgeView":
+        return EdgeView(self)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.edge_ids)
+
+    def node_index(self) -> Dict[str, int]:
+        if self._node_index is None:
+            self._node_index = {node_id: position for position, node_id in enumerate(self.node_ids)}
+        return self._node_index
+
+    def endpoint_id(self, code: int) -> str:
+        return self.node_ids[code] if code >= 0 else self.external_ids[-1 - code]
+
+    def edge_label(self, code: int) -> Optional[str]:
+        return None if code == _NO_LABEL else self.labels[code]
+
+    def edge_source_array(self) -> np.ndarray:
+        """Read-only ``int64`` view of the source endpoint codes."""
+        return np.frombuffer(self.edge_sources, dtype=np.int64)
+
+    def edge_target_array(self) -> np.ndarray:
+        return np.frombuffer(self.edge_targets, dtype=np.int64)
+
+    def trust_array(self) -> np.ndarray:
+        return np.frombuffer(self.trust, dtype=np.float64)
+
+    def weight_array(self) -> np.ndarray:
+        return np.frombuffer(self.weights, dtype=np.float64)
+
+    def ambiguous_array(self) -> np.ndarray:
+        """Ambiguous flags unpacked to one ``bool`` per node (a copy)."""
+        bits = np.unpackbits(np.frombuffer(bytes(self.ambiguous), dtype=np.uint8), bitorder="little")
+        return bits[: self.node_count].astype(bool)
+
+    def is_ambiguous(self, position: int) -> bool:
+        return bool((self.ambiguous[position >> 3] >> (position & 7)) & 1)
+
+    def ambiguous_flags(self) -> List[bool]:
+        return _unpack_bits(self.ambiguous, self.node_count)
+
+    def node(self, position: int) -> Node:
+        return Node(
+            id=self.node_ids[position],
+            label=self.labels[self.node_labels[position]],
+            trust=self.trust[position],
+            ambiguous=self.is_ambiguous(position),
+        )
+
+    def edge(self, position: int) -> Edge:
+        return Edge(
+            id=self.edge_ids[position],
+            source=self.endpoint_id(self.edge_sources[position]),
+            target=self.endpoint_id(self.edge_targets[position]),
+            label=self.edge_label(self.edge_labels[position]),
+            weight=self.weights[position],
+        )
+
+    def node_columns(self) -> "NodeColumns":
+        labels = self.labels
+        return NodeColumns(
+            self.node_ids,
+            [labels[code] for code in self.node_labels],
+            self.trust,
+            self.ambiguous_flags(),
+        )
+
+    def edge_columns(self) -> "EdgeColumns":
+        return EdgeColumns(
+            self.edge_ids,
+            [self.endpoint_id(code) for code in self.edge_sources],
+            [self.endpoint_id(code) for code in self.edge_targets],
+            [self.edge_label(code) for code in self.edge_labels],
+            self.weights,
+        )
+
+    def to_columns(self) -> Dict[str, object]:
+        """JSON-friendly columns; lists only, no per-element dicts."""
+        return {
+            "node_ids": self.node_ids,
+            "labels": self.labels,
+            "node_labels": self.node_labels.tolist(),
+            "trust": self.trust.tolist(),
+            "ambiguous": [index for index, flag in enumerate(self.ambiguous_flags()) if flag],
+            "edge_ids": self.edge_ids,
+            "edge_sources": self.edge_sources.tolist(),
+            "edge_targets": self.edge_targets.tolist(),
+            "edge_labels": self.edge_labels.tolist(),
+            "weights": self.weights.tolist(),
+            "external_ids": self.external_ids,
+        }
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, object]) -> "GraphFrame":
+        node_ids = [sys.intern(str(value)) for value in columns["node_ids"]]
+        flags = [False] * len(node_ids)
+        for index in columns.get("ambiguous", []):
+            flags[int(index)] = True
+        return cls(
+            node_ids,
+            [sys.intern(str(value)) for value in columns["labels"]],
+            array("q", columns["node_labels"]),
+            array("d", columns["trust"]),
+            _pack_bits(flags),
+            [sys.intern(str(value)) for value in columns["edge_ids"]],
+            array("q", columns["edge_sources"]),
+            array("q", columns["edge_targets"]),
+            array("q", columns["edge_labels"]),
+            array("d", columns["weights"]),
+            [str(value) for value in columns.get("external_ids", [])],
+        )
+
+    def to_bytes(self) -> bytes:
+        """Compact binary encoding: a JSON string table plus raw columns."""
+        strings = json.dumps(
+            [self.node_ids, self.labels, self.edge_ids, self.external_ids],
+            separators=(",", ":"),
+            ensure_ascii=False,
+        ).encode("utf-8")
+        columns = [
+            self.node_labels,
+            self.trust,
+            self.edge_sources,
+            self.edge_targets,
+            self.edge_labels,
+            self.weights,
+        ]
+        parts = [
+            _FRAME_HEADER.pack(_FRAME_MAGIC, len(strings), len(self.ambiguous)),
+            strings,
+            bytes(self.ambiguous),
+        ]
+        for column in columns:
+            if sys.byteorder != "little":
+                column = array(column.typecode, column)
+                column.byteswap()
+            parts.append(column.tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> "GraphFrame":
+        magic, strings_length, bitmap_length = _FRAME_HEADER.unpack_from(payload)
+        if magic != _FRAME_MAGIC:
+            raise ValueError("not a graph frame payload")
+        offset = _FRAME_HEADER.size
+        node_ids, labels, edge_ids, external_ids = json.loads(payload[offset : offset + strings_length])
+        offset += strings_length
+        ambiguous = bytearray(payload[offset : offset + bitmap_length])
+        offset += bitmap_length
+        node_count, edge_count = len(node_ids), len(edge_ids)
+        columns: List[array] = []
+        for typecode, length in (
+            ("q", node_count),
+            ("d", node_count),
+            ("q", edge_count),
+            ("q", edge_count),
+            ("q", edge_count),
+            ("d", edge_count),
+        ):
+            column = array(typecode)
+            size = length * column.itemsize
+            column.frombytes(payload[offset : offset + size])
+            if sys.byteorder != "little":
+                column.byteswap()
+            offset += size
+            columns.append(column)
+        return cls(
+            [sys.intern(value) for value in node_ids],
+            [sys.intern(value) for value in labels],
+            columns[0],
+            columns[1],
+            ambiguous,
+            [sys.intern(value) for value in edge_ids],
+            columns[2],
+            columns[3],
+            columns[4],
+            columns[5],
+            external_ids,
+        )
+
+
+_FRAME_MAGIC = b"GFR1"
+_FRAME_HEADER = struct.Struct("<4sQQ")
+
+
+def _pack_bits(flags: Sequence[bool]) -> bytearray:
+    bitmap = bytearray((len(flags) + 7) // 8)
+    for position, flag in enumerate(flags):
+        if flag:
+            bitmap[position >> 3] |= 1 << (position & 7)
+    return bitmap
+
+
+def _unpack_bits(bitmap: bytearray, count: int) -> List[bool]:
+    return [bool((bitmap[position >> 3] >> (position & 7)) & 1) for position in range(count)]
+
+
+class NodeView(Sequence[Node]):
+    """Lazy, read-only sequence of the nodes stored in a :class:`GraphFrame`."""
+
+    __slots__ = ("frame",)
+
+    def __init__(self, frame: GraphFrame) -> None:
+        self.frame = frame
+
+    def __len__(self) -> int:
+        return self.frame.node_count
+
+    @overload
+    def __getitem__(self, position: int) -> Node: ...
+
+    @overload
+    def __getitem__(self, position: slice) -> List[Node]: ...
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self.frame.node(index) for index in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("node index out of range")
+        return self.frame.node(position)
+
+    def __iter__(self) -> Iterator[Node]:
+        frame = self.frame
+        return (frame.node(position) for position in range(frame.node_count))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (NodeView, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+
+class EdgeView(Sequence[Edge]):
+    """Lazy, read-only sequence of the edges stored in a :class:`GraphFrame`."""
+
+    __slots__ = ("frame",)
+
+    def __init__(self, frame: GraphFrame) -> None:
+        self.frame = frame
+
+    def __len__(self) -> int:
+        return self.frame.edge_count
+
+    @overload
+    def __getitem__(self, position: int) -> Edge: ...
+
+    @overload
+    def __getitem__(self, position: slice) -> List[Edge]: ...
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self.frame.edge(index) for index in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("edge index out of range")
+        return self.frame.edge(position)
+
+    def __iter__(self) -> Iterator[Edge]:
+        frame = self.frame
+        return (frame.edge(position) for position in range(frame.edge_count))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (EdgeView, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+
+class NodeColumns(NamedTuple):
+    ids: Sequence[str]
+    labels: Sequence[str]
+    trust: Sequence[float]
+    ambiguous: Sequence[bool]
+
+
+class EdgeColumns(NamedTuple):
+    ids: Sequence[str]
+    sources: Sequence[str]
+    targets: Sequence[str]
+    labels: Sequence[str]
+    weights: Sequence[float]
+
+
+def node_columns(nodes: Iterable[Node]) -> NodeColumns:
+    """Column-wise access to nodes, without materializing frame-backed nodes."""
+    if isinstance(nodes, NodeView):
+        return nodes.frame.node_columns()
+    nodes_list = list(nodes)
+    return NodeColumns(
+        [node.id for node in nodes_list],
+        [node.label for node in nodes_list],
+        [node.trust for node in nodes_list],
+        [node.ambiguous for node in nodes_list],
+    )
+
+
+def edge_columns(edges: Iterable[Edge]) -> EdgeColumns:
+    """Column-wise access to edges, without materializing frame-backed edges."""
+    if isinstance(edges, EdgeView):
+        return edges.frame.edge_columns()
+    edges_list = list(edges)
+    return EdgeColumns(
+        [edge.id for edge in edges_list],
+        [edge.source for edge in edges_list],
+        [edge.target for edge in edges_list],
+        [edge.label for edge in edges_list],
+        [edge.weight for edge in edges_list],
+    )
+
+
 def index_nodes(nodes: Iterable[Node]) -> Dict[str, Node]:
     return {node.id: node for node in nodes}
 
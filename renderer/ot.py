@@ -2,15 +2,23 @@
 
 from __future__ import annotations
 
+import logging
+import threading
+from collections import deque
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Callable, Deque, Dict, FrozenSet, Iterable, List, MutableMapping, Optional, Sequence, Tuple
 
-from .models import Edge, GraphVersion, Node, index_edges, index_nodes
+from .metrics import REGISTRY
+from .models import Edge, GraphFrame, GraphVersion, Node, index_edges, index_nodes
+from .persistent import MapEvolver, PersistentSortedMap
 from .quality import QualityAnalyzer
 from .storage import GraphPersistence, InMemorySessionStore
 
 
+logger = logging.getLogger(__name__)
+
+
 class OperationType(str, Enum):
     ADD_NODE = "add_node"
     UPDATE_NODE = "update_node"
@@ -35,11 +43,61 @@ class OperationConflict(Exception):
     pass
 
 
+CommitListener = Callable[[str, GraphVersion, GraphVersion, List[GraphOperation]], None]
+
+
+Incidence = PersistentSortedMap[str, FrozenSet[str]]
+
+# Label sets are built once so disabled metrics cost no allocations.
+_APPLY = {"method": "apply"}
+_BULK_APPLY = {"method": "bulk_apply"}
+_STAGES = {
+    stage: {"stage": stage} for stage in ("load", "transform", "quality", "save", "notify")
+}
+
+
+class _SharedEdges(MapEvolver[str, Edge]):
+    """Edge evolver that also maintains a persistent node -> edge ids index."""
+
+    def __init__(self, edges: PersistentSortedMap[str, Edge], incidence: Incidence) -> None:
+        super().__init__(edges)
+        self.incidence = incidence
+
+    def _link(self, node_id: str, edge_id: str, present: bool) -> None:
+        current = self.incidence.get(node_id, frozenset())
+        updated = current | {edge_id} if present else current - {edge_id}
+        self.incidence = self.incidence.set(node_id, updated) if updated else self.incidence.remove(node_id)
+
+    def __setitem__(self, edge_id: str, edge: Edge) -> None:
+        if edge_id in self:
+            del self[edge_id]
+        super().__setitem__(edge_id, edge)
+        self._link(edge.source, edge_id, True)
+        self._link(edge.target, edge_id, True)
+
+    def __delitem__(self, edge_id: str) -> None:
+        edge = self[edge_id]
+        super().__delitem__(edge_id)
+        self._link(edge.source, edge_id, False)
+        self._link(edge.target, edge_id, False)
+
+    def incident(self, node_id: str) -> List[str]:
+        return sorted(self.incidence.get(node_id, ()))
+
+
+def _build_incidence(edges: Iterable[Edge]) -> Incidence:
+    linked: Dict[str, set] = {}
+    for edge in edges:
+        linked.setdefault(edge.source, set()).add(edge.id)
+        linked.setdefault(edge.target, set()).add(edge.id)
+    return PersistentSortedMap((node_id, frozenset(edge_ids)) for node_id, edge_ids in linked.items())
+
+
 def _apply_operation(
-    nodes: Dict[str, Node],
-    edges: Dict[str, Edge],
+    nodes: MutableMapping[str, Node],
+    edges: MutableMapping[str, Edge],
     operation: GraphOperation,
-) -> Tuple[Dict[str, Node], Dict[str, Edge]]:
+) -> Tuple[MutableMapping[str, Node], MutableMapping[str, Edge]]:
     op = operation
     data = op.payload
     if op.type == OperationType.ADD_NODE:
@@ -56,9 +114,16 @@ def _apply_operation(
         node_id = str(data["id"])
         nodes.pop(node_id, None)
         # remove edges connected to node
-        for edge_id, edge in list(edges.items()):
-            if edge.source == node_id or edge.target == node_id:
-                edges.pop(edge_id, None)
+        if isinstance(edges, _SharedEdges):
+            connected = edges.incident(node_id)
+        else:
+            connected = [
+                edge_id
+                for edge_id, edge in edges.items()
+                if edge.source == node_id or edge.target == node_id
+            ]
+        for edge_id in connected:
+            edges.pop(edge_id, None)
     elif op.type == OperationType.ADD_EDGE:
         edge = Edge(**data)
         if edge.source not in nodes or edge.target not in nodes:
@@ -83,83 +148,234 @@ def _apply_operation(
 
 
 class CollaborationEngine:
-    """Coordinates OT operations, persistence and quality checks."""
+    """Coordinates OT operations, persistence and quality checks.
+
+    With ``history_size > 0`` the engine keeps that many recent versions per
+    graph in memory, backed by persistent maps: each committed version
+    shares every unchanged node and edge with its parent, and producing the
+    next version costs O(log n) per operation instead of a full copy. Only
+    snapshot construction is incremental: every commit still runs a full
+    quality evaluation and writes the whole version, so ``apply`` remains
+    O(n) overall.
+
+    ``apply``, ``bulk_apply`` and ``current_graph`` are serialized by an
+    engine lock, so the engine can be driven from several threads (e.g. an
+    executor). Commit listeners run while the lock is held, in commit order.
+    """
 
     def __init__(
         self,
         persistence: GraphPersistence,
         sessions: Optional[InMemorySessionStore] = None,
         quality_analyzer: Optional[QualityAnalyzer] = None,
+        history_size: int = 0,
     ) -> None:
         self.persistence = persistence
         self.sessions = sessions or InMemorySessionStore()
         self.quality = quality_analyzer or QualityAnalyzer()
+        self.history_size = history_size
+        self._listeners: List[CommitListener] = []
+        self._recent: Dict[str, Deque[Tuple[GraphVersion, Incidence]]] = {}
+        # Reentrant so commit listeners may read the engine they observe.
+        self._lock = threading.RLock()
+
+    def add_commit_listener(self, listener: CommitListener) -> None:
+        """Registers ``listener(graph_id, base, stored, operations)``.
+
+        Listeners run synchronously after every committed ``apply`` or
+        ``bulk_apply``, e.g. to compute ``ExportService.patch(base, stored)``.
+        Exceptions they raise are logged and counted, not propagated.
+        """
+        self._listeners.append(listener)
+
+    def remove_commit_listener(self, listener: CommitListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
 
     def current_graph(self, graph_id: str) -> GraphVersion:
+        with self._lock:
+            return self._current_graph(graph_id)
+
+    def _current_graph(self, graph_id: str) -> GraphVersion:
+        cached = self._cached_head(graph_id)
+        if cached is not None:
+            return cached[0]
         latest = self.persistence.latest_version(graph_id)
         if latest is None:
-            return self.persistence.save_version(graph_id, [], [], None)
+            latest = self.persistence.save_version(graph_id, [], [], None)
+        if self.history_size > 0:
+            latest = self._remember(latest, _build_incidence(latest.edges))
         return latest
 
+    def recent_versions(self, graph_id: str) -> List[GraphVersion]:
+        """Versions held in memory for ``graph_id``, oldest first."""
+        with self._lock:
+            return [version for version, _ in self._recent.get(graph_id, ())]
+
     def apply(self, graph_id: str, operation: GraphOperation) -> GraphVersion:
-        base = self.current_graph(graph_id)
-        if operation.version != base.version:
-            raise OperationConflict(
-                f"version mismatch (expected {base.version}, got {operation.version})"
-            )
+        with REGISTRY.timed("renderer_ot_apply_seconds", _APPLY), self._lock:
+            with REGISTRY.timed("renderer_ot_stage_seconds", _STAGES["load"]):
+                base = self._current_graph(graph_id)
+            if operation.version != base.version:
+                REGISTRY.inc("renderer_ot_conflicts_total")
+                raise OperationConflict(
+                    f"version mismatch (expected {base.version}, got {operation.version})"
+                )
 
-        nodes = index_nodes(base.nodes)
-        edges = index_edges(base.edges)
-        nodes, edges = _apply_operation(nodes, edges, operation)
+            with REGISTRY.timed("renderer_ot_stage_seconds", _STAGES["transform"]):
+                nodes, edges = self._working_copy(base)
+                nodes, edges = self._transform(nodes, edges, operation)
 
-        nodes_list = sorted(nodes.values(), key=lambda node: node.id)
-        edges_list = sorted(edges.values(), key=lambda edge: edge.id)
-        quality = self.quality.evaluate(nodes_list, edges_list)
-        stored = self.persistence.save_version(
-            graph_id,
-            nodes_list,
-            edges_list,
-            author_session=operation.session_id,
-            quality=quality.to_dict(),
-        )
-        self.sessions.upsert(operation.session_id, {"graph_id": graph_id, "version": stored.version})
+            stored = self._commit(graph_id, nodes, edges, operation.session_id)
+            self.sessions.upsert(operation.session_id, {"graph_id": graph_id, "version": stored.version})
+            self._notify(graph_id, base, stored, [operation])
         return stored
 
     def bulk_apply(self, graph_id: str, operations: Iterable[GraphOperation]) -> GraphVersion:
-        latest = self.current_graph(graph_id)
-        nodes = index_nodes(latest.nodes)
-        edges = index_edges(latest.edges)
-        version = latest.version
-        author_session: Optional[str] = None
-        for op in operations:
-            if op.version != version:
-                raise OperationConflict(
-                    f"operation version mismatch: expected {version} got {op.version}"
-                )
-            nodes, edges = _apply_operation(nodes, edges, op)
-            version += 1
-            author_session = op.session_id
-        nodes_list = sorted(nodes.values(), key=lambda node: node.id)
-        edges_list = sorted(edges.values(), key=lambda edge: edge.id)
-        quality = self.quality.evaluate(nodes_list, edges_list)
-        stored = self.persistence.save_version(
-            graph_id,
-            nodes_list,
-            edges_list,
-            author_session=author_session,
-            quality=quality.to_dict(),
-        )
+        with REGISTRY.timed("renderer_ot_apply_seconds", _BULK_APPLY), self._lock:
+            with REGISTRY.timed("renderer_ot_stage_seconds", _STAGES["load"]):
+                latest = self._current_graph(graph_id)
+            with REGISTRY.timed("renderer_ot_stage_seconds", _STAGES["transform"]):
+                nodes, edges = self._working_copy(latest)
+                version = latest.version
+                author_session: Optional[str] = None
+                applied: List[GraphOperation] = []
+                for op in operations:
+                    if op.version != version:
+                        REGISTRY.inc("renderer_ot_conflicts_total")
+                        raise OperationConflict(
+                            f"operation version mismatch: expected {version} got {op.version}"
+                        )
+                    nodes, edges = self._transform(nodes, edges, op)
+                    version += 1
+                    author_session = op.session_id
+                    applied.append(op)
+            stored = self._commit(graph_id, nodes, edges, author_session)
+            self._notify(graph_id, latest, stored, applied)
         return stored
 
+    @staticmethod
+    def _transform(
+        nodes: MutableMapping[str, Node],
+        edges: MutableMapping[str, Edge],
+        operation: GraphOperation,
+    ) -> Tuple[MutableMapping[str, Node], MutableMapping[str, Edge]]:
+        try:
+            result = _apply_operation(nodes, edges, operation)
+        except OperationConflict:
+            REGISTRY.inc("renderer_ot_conflicts_total")
+            raise
+        REGISTRY.inc("renderer_ot_operations_total", 1, {"type": operation.type.value} if REGISTRY.enabled else None)
+        return result
+
     def active_sessions(self) -> List[Dict[str, object]]:
         return [
             {"session_id": session_id, **payload}
             for session_id, payload in self.sessions.all()
         ]
 
+    def _cached_head(self, graph_id: str) -> Optional[Tuple[GraphVersion, Incidence]]:
+        recent = self._recent.get(graph_id)
+        if not recent:
+            return None
+        head = recent[-1]
+        # Another engine may have committed to the same store meanwhile.
+        if self.persistence.latest_version_number(graph_id) != head[0].version:
+            recent.clear()
+            return None
+        return head
+
+    def _remember(self, version: GraphVersion, incidence: Incidence) -> GraphVersion:
+        shared = GraphVersion.from_maps(
+            version.graph_id,
+            version.version,
+            version.node_map(),
+            version.edge_map(),
+            created_at=version.created_at,
+            author_session=version.author_session,
+            quality=version.quality,
+        )
+        recent = self._recent.setdefault(version.graph_id, deque(maxlen=self.history_size))
+        recent.append((shared, incidence))
+        return shared
+
+    def _working_copy(
+        self, base: GraphVersion
+    ) -> Tuple[MutableMapping[str, Node], MutableMapping[str, Edge]]:
+        cached = self._cached_head(base.graph_id) if self.history_size > 0 else None
+        if cached is not None and cached[0] is base:
+            return MapEvolver(base.node_map()), _SharedEdges(base.edge_map(), cached[1])
+        return index_nodes(base.nodes), index_edges(base.edges)
+
+    def _commit(
+        self,
+        graph_id: str,
+        nodes: MutableMapping[str, Node],
+        edges: MutableMapping[str, Edge],
+        author_session: Optional[str],
+    ) -> GraphVersion:
+        with REGISTRY.timed("renderer_ot_stage_seconds", _STAGES["quality"]):
+            nodes_list, edges_list = self._snapshot(nodes, edges)
+            quality = self.quality.evaluate(nodes_list, edges_list)
+        with REGISTRY.timed("renderer_ot_stage_seconds", _STAGES["save"]):
+            stored = self.persistence.save_version(
+                graph_id,
+                nodes_list,
+                edges_list,
+                author_session=author_session,
+                quality=quality.to_dict(),
+            )
+        if isinstance(edges, _SharedEdges):
+            stored = self._remember(
+                GraphVersion.from_maps(
+                    graph_id,
+                    stored.version,
+                    nodes.persistent(),
+                    edges.persistent(),
+                    created_at=stored.created_at,
+                    author_session=stored.author_session,
+                    quality=stored.quality,
+                ),
+                edges.incidence,
+            )
+        return stored
+
+    def _snapshot(
+        self, nodes: MutableMapping[str, Node], edges: MutableMapping[str, Edge]
+    ) -> Tuple[Sequence[Node], Sequence[Edge]]:
+        """Sorted element sequences; frame-backed when persistence is columnar."""
+        if isinstance(nodes, MapEvolver) and not getattr(self.persistence, "columnar", False):
+            return nodes.persistent().values(), edges.persistent().values()
+        nodes_list = sorted(nodes.values(), key=lambda node: node.id)
+        edges_list = sorted(edges.values(), key=lambda edge: edge.id)
+        if getattr(self.persistence, "columnar", False):
+            frame = GraphFrame.from_elements(nodes_list, edges_list)
+            return frame.nodes, frame.edges
+        return nodes_list, edges_list
+
+    def _notify(
+        self,
+        graph_id: str,
+        base: GraphVersion,
+        stored: GraphVersion,
+        operations: List[GraphOperation],
+    ) -> None:
+        if not self._listeners:
+            return
+        with REGISTRY.timed("renderer_ot_stage_seconds", _STAGES["notify"]):
+            for listener in list(self._listeners):
+                # The version is already committed: a failing listener must
+                # neither fail the operation nor starve the listeners after it.
+                try:
+                    listener(graph_id, base, stored, operations)
+                except Exception:
+                    REGISTRY.inc("renderer_ot_listener_errors_total")
+                    logger.exception("commit listener %r failed for graph %s v%s", listener, graph_id, stored.version)
+
 
 __all__ = [
     "CollaborationEngine",
+    "CommitListener",
     "GraphOperation",
     "OperationType",
     "OperationConflict",
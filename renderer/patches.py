@@ -0,0 +1,111 @@
+"""Incremental patches between the exports of two graph versions."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Dict, List, Mapping, Sequence
+
+
+@dataclass
+class ExportPatch:
+    """Operations that turn the exports of ``base_version`` into ``version``.
+
+    ``svg`` and ``markdown`` hold keyed operations (``add``, ``update``,
+    ``remove``; SVG may also start with ``resize``), grouped under a
+    ``parent`` of ``"nodes"`` or ``"edges"``. ``mermaid`` holds line
+    operations against the base document, ordered from the end of the
+    document so they can be applied one after another.
+    """
+
+    graph_id: str
+    base_version: int
+    version: int
+    svg: List[Dict[str, object]] = field(default_factory=list)
+    mermaid: List[Dict[str, object]] = field(default_factory=list)
+    markdown: List[Dict[str, object]] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.svg or self.mermaid or self.markdown)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "graph_id": self.graph_id,
+            "base_version": self.base_version,
+            "version": self.version,
+            "svg": self.svg,
+            "mermaid": self.mermaid,
+            "markdown": self.markdown,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), separators=(",", ":"))
+
+
+def diff_keyed(
+    base: Mapping[str, str],
+    target: Mapping[str, str],
+    parent: str,
+) -> List[Dict[str, object]]:
+    """Diffs two id-to-markup mappings.
+
+    Added entries carry their ``index`` in the target ordering so clients
+    can insert them in place.
+    """
+    ops: List[Dict[str, object]] = []
+    for key in base:
+        if key not in target:
+            ops.append({"op": "remove", "parent": parent, "id": key})
+    for index, (key, markup) in enumerate(target.items()):
+        previous = base.get(key)
+        if previous is None:
+            ops.append({"op": "add", "parent": parent, "id": key, "index": index, "markup": markup})
+        elif previous != markup:
+            ops.append({"op": "update", "parent": parent, "id": key, "markup": markup})
+    return ops
+
+
+def apply_keyed(
+    base: Mapping[str, str],
+    ops: Sequence[Mapping[str, object]],
+    parent: str,
+) -> Dict[str, str]:
+    """Reference client for :func:`diff_keyed` operations."""
+    items = [(key, markup) for key, markup in base.items()]
+    removed = {op["id"] for op in ops if op["op"] == "remove" and op["parent"] == parent}
+    updates = {op["id"]: op["markup"] for op in ops if op["op"] == "update" and op["parent"] == parent}
+    items = [(key, updates.get(key, markup)) for key, markup in items if key not in removed]
+    for op in ops:
+        if op["op"] == "add" and op["parent"] == parent:
+            items.insert(int(op["index"]), (str(op["id"]), str(op["markup"])))
+    return dict(items)
+
+
+def diff_lines(base: Sequence[str], target: Sequence[str]) -> List[Dict[str, object]]:
+    """Line-level diff expressed as ``replace`` operations on base indices.
+
+    Each operation swaps ``base[start:end]`` for ``lines`` (pure inserts have
+    ``start == end``, deletions an empty ``lines``). Operations are ordered
+    from the bottom of the document up.
+    """
+    matcher = SequenceMatcher(None, base, target, autojunk=False)
+    ops = [
+        {"op": "replace", "start": i1, "end": i2, "lines": list(target[j1:j2])}
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+    ops.reverse()
+    return ops
+
+
+def apply_lines(base: Sequence[str], ops: Sequence[Mapping[str, object]]) -> List[str]:
+    """Reference client for :func:`diff_lines` operations."""
+    lines = list(base)
+    for op in ops:
+        lines[int(op["start"]) : int(op["end"])] = list(op["lines"])
+    return lines
+
+
+__all__ = ["ExportPatch", "apply_keyed", "apply_lines", "diff_keyed", "diff_lines"]
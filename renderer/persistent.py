@@ -0,0 +1,273 @@
+"""Persistent (immutable, structurally shared) sorted maps.
+
+``PersistentSortedMap`` is a path-copying AVL tree: ``set`` and ``remove``
+return a new map in O(log n) that shares every untouched subtree with the
+original, so consecutive graph versions only pay for what changed.
+"""
+
+from __future__ import annotations
+
+from typing import (
+    Any,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    overload,
+)
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class _Tree:
+    __slots__ = ("key", "value", "left", "right", "height", "size")
+
+    def __init__(self, key: Any, value: Any, left: Optional["_Tree"], right: Optional["_Tree"]) -> None:
+        self.key = key
+        self.value = value
+        self.left = left
+        self.right = right
+        left_height = left.height if left is not None else 0
+        right_height = right.height if right is not None else 0
+        self.height = 1 + (left_height if left_height > right_height else right_height)
+        self.size = 1 + (left.size if left is not None else 0) + (right.size if right is not None else 0)
+
+
+def _height(tree: Optional[_Tree]) -> int:
+    return tree.height if tree is not None else 0
+
+
+def _balance(key: Any, value: Any, left: Optional[_Tree], right: Optional[_Tree]) -> _Tree:
+    left_height, right_height = _height(left), _height(right)
+    if left_height > right_height + 1:
+        if _height(left.left) >= _height(left.right):
+            return _Tree(left.key, left.value, left.left, _Tree(key, value, left.right, right))
+        pivot = left.right
+        return _Tree(
+            pivot.key,
+            pivot.value,
+            _Tree(left.key, left.value, left.left, pivot.left),
+            _Tree(key, value, pivot.right, right),
+        )
+    if right_height > left_height + 1:
+        if _height(right.right) >= _height(right.left):
+            return _Tree(right.key, right.value, _Tree(key, value, left, right.left), right.right)
+        pivot = right.left
+        return _Tree(
+            pivot.key,
+            pivot.value,
+            _Tree(key, value, left, pivot.left),
+            _Tree(right.key, right.value, pivot.right, right.right),
+        )
+    return _Tree(key, value, left, right)
+
+
+def _insert(tree: Optional[_Tree], key: Any, value: Any) -> _Tree:
+    if tree is None:
+        return _Tree(key, value, None, None)
+    if key < tree.key:
+        left = _insert(tree.left, key, value)
+        return tree if left is tree.left else _balance(tree.key, tree.value, left, tree.right)
+    if tree.key < key:
+        right = _insert(tree.right, key, value)
+        return tree if right is tree.right else _balance(tree.key, tree.value, tree.left, right)
+    if tree.value is value:
+        return tree
+    return _Tree(key, value, tree.left, tree.right)
+
+
+def _pop_min(tree: _Tree) -> Tuple[Any, Any, Optional[_Tree]]:
+    if tree.left is None:
+        return tree.key, tree.value, tree.right
+    key, value, left = _pop_min(tree.left)
+    return key, value, _balance(tree.key, tree.value, left, tree.right)
+
+
+def _delete(tree: Optional[_Tree], key: Any) -> Optional[_Tree]:
+    if tree is None:
+        return None
+    if key < tree.key:
+        left = _delete(tree.left, key)
+        return tree if left is tree.left else _balance(tree.key, tree.value, left, tree.right)
+    if tree.key < key:
+        right = _delete(tree.right, key)
+        return tree if right is tree.right else _balance(tree.key, tree.value, tree.left, right)
+    if tree.left is None:
+        return tree.right
+    if tree.right is None:
+        return tree.left
+    successor_key, successor_value, right = _pop_min(tree.right)
+    return _balance(successor_key, successor_value, tree.left, right)
+
+
+def _build(items: Sequence[Tuple[Any, Any]], low: int, high: int) -> Optional[_Tree]:
+    if low >= high:
+        return None
+    middle = (low + high) // 2
+    key, value = items[middle]
+    return _Tree(key, value, _build(items, low, middle), _build(items, middle + 1, high))
+
+
+def _walk(tree: Optional[_Tree]) -> Iterator[_Tree]:
+    stack: List[_Tree] = []
+    while stack or tree is not None:
+        while tree is not None:
+            stack.append(tree)
+            tree = tree.left
+        tree = stack.pop()
+        yield tree
+        tree = tree.right
+
+
+class PersistentSortedMap(Mapping[K, V]):
+    """Immutable mapping iterated in sorted key order.
+
+    Lookups, ``set`` and ``remove`` are O(log n); ``values()`` is a
+    sequence view that supports O(log n) positional access.
+    """
+
+    __slots__ = ("_root",)
+
+    def __init__(self, items: Iterable[Tuple[K, V]] = ()) -> None:
+        ordered = sorted(dict(items).items())
+        self._root: Optional[_Tree] = _build(ordered, 0, len(ordered))
+
+    @classmethod
+    def _from_root(cls, root: Optional[_Tree]) -> "PersistentSortedMap[K, V]":
+        instance = cls.__new__(cls)
+        instance._root = root
+        return instance
+
+    def __getitem__(self, key: K) -> V:
+        tree = self._root
+        while tree is not None:
+            if key < tree.key:
+                tree = tree.left
+            elif tree.key < key:
+                tree = tree.right
+            else:
+                return tree.value
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return self._root.size if self._root is not None else 0
+
+    def __iter__(self) -> Iterator[K]:
+        return (tree.key for tree in _walk(self._root))
+
+    def __repr__(self) -> str:
+        return f"PersistentSortedMap({dict(self.items())!r})"
+
+    def items(self) -> Iterator[Tuple[K, V]]:  # type: ignore[override]
+        return ((tree.key, tree.value) for tree in _walk(self._root))
+
+    def values(self) -> "SortedValues[V]":  # type: ignore[override]
+        return SortedValues(self)
+
+    def set(self, key: K, value: V) -> "PersistentSortedMap[K, V]":
+        root = _insert(self._root, key, value)
+        return self if root is self._root else PersistentSortedMap._from_root(root)
+
+    def remove(self, key: K) -> "PersistentSortedMap[K, V]":
+        root = _delete(self._root, key)
+        return self if root is self._root else PersistentSortedMap._from_root(root)
+
+    def at(self, position: int) -> Tuple[K, V]:
+        """Returns the ``position``-th item in key order."""
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("map index out of range")
+        tree = self._root
+        while True:
+            left_size = tree.left.size if tree.left is not None else 0
+            if position < left_size:
+                tree = tree.left
+            elif position == left_size:
+                return tree.key, tree.value
+            else:
+                position -= left_size + 1
+                tree = tree.right
+
+    def evolver(self) -> "MapEvolver[K, V]":
+        return MapEvolver(self)
+
+
+class SortedValues(Sequence[V]):
+    """Read-only sequence of a map's values in key order."""
+
+    __slots__ = ("map",)
+
+    def __init__(self, mapping: PersistentSortedMap[Any, V]) -> None:
+        self.map = mapping
+
+    def __len__(self) -> int:
+        return len(self.map)
+
+    @overload
+    def __getitem__(self, position: int) -> V: ...
+
+    @overload
+    def __getitem__(self, position: slice) -> List[V]: ...
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return list(self)[position]
+        return self.map.at(position)[1]
+
+    def __iter__(self) -> Iterator[V]:
+        return (tree.value for tree in _walk(self.map._root))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (SortedValues, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+
+class MapEvolver(MutableMapping[K, V], Generic[K, V]):
+    """Mutable facade over a persistent map.
+
+    Every mutation path-copies in O(log n); ``persistent()`` returns the
+    current map while earlier maps stay untouched.
+    """
+
+    def __init__(self, mapping: PersistentSortedMap[K, V]) -> None:
+        self._map = mapping
+
+    def __getitem__(self, key: K) -> V:
+        return self._map[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._map
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self._map = self._map.set(key, value)
+
+    def __delitem__(self, key: K) -> None:
+        if key not in self._map:
+            raise KeyError(key)
+        self._map = self._map.remove(key)
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self._map)
+
+    def __len__(self) -> int:
+        return len(self._map)
+
+    def persistent(self) -> PersistentSortedMap[K, V]:
+        return self._map
+
+
+__all__ = ["MapEvolver", "PersistentSortedMap", "SortedValues"]
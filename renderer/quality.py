@@ -3,9 +3,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Set
+from typing import Dict, Iterable, Iterator, List, Set
 
-from .models import Edge, Node
+import numpy as np
+
+from .metrics import REGISTRY
+from .models import Edge, EdgeView, GraphFrame, Node, NodeView
 
 
 @dataclass
@@ -24,10 +27,25 @@ class QualityReport:
         }
 
 
+_OBJECTS = {"input": "objects"}
+_FRAME = {"input": "frame"}
+
+
 class QualityAnalyzer:
     """Calculates quality metrics for a graph snapshot."""
 
     def evaluate(self, nodes: Iterable[Node], edges: Iterable[Edge]) -> QualityReport:
+        if isinstance(nodes, NodeView) and isinstance(edges, EdgeView) and nodes.frame is edges.frame:
+            return self.evaluate_frame(nodes.frame)
+        with REGISTRY.timed("renderer_quality_evaluate_seconds", _OBJECTS):
+            return self._evaluate_objects(nodes, edges)
+
+    def evaluate_frame(self, frame: GraphFrame) -> QualityReport:
+        """Evaluates a columnar snapshot without building Node/Edge objects."""
+        with REGISTRY.timed("renderer_quality_evaluate_seconds", _FRAME):
+            return self._evaluate_frame(frame)
+
+    def _evaluate_objects(self, nodes: Iterable[Node], edges: Iterable[Edge]) -> QualityReport:
         node_index = {node.id: node for node in nodes}
         adjacency: Dict[str, Set[str]] = {node_id: set() for node_id in node_index}
         reverse: Dict[str, Set[str]] = {node_id: set() for node_id in node_index}
@@ -57,28 +75,98 @@ class QualityAnalyzer:
             trust_summary=trust_summary,
         )
 
+    def _evaluate_frame(self, frame: GraphFrame) -> QualityReport:
+        count = frame.node_count
+        node_ids = frame.node_ids
+        sources = frame.edge_source_array()
+        targets = frame.edge_target_array()
+        keep = (sources >= 0) & (targets >= 0)
+        sources, targets = sources[keep], targets[keep]
+        degree = np.bincount(sources, minlength=count) + np.bincount(targets, minlength=count)
+        flags = frame.ambiguous_array()
+        trust = frame.trust_array()
+        trust_summary = {
+            "count": float(count),
+            "min": float(trust.min()) if count else 0.0,
+            "max": float(trust.max()) if count else 0.0,
+            "avg": float(trust.mean()) if count else 0.0,
+        }
+        return QualityReport(
+            ambiguous_nodes=sorted(node_ids[index] for index in np.flatnonzero(flags)),
+            isolated_nodes=sorted(node_ids[index] for index in np.flatnonzero(degree == 0)),
+            cycles=self._detect_cycles_indexed(node_ids, sources, targets),
+            trust_summary=trust_summary,
+        )
+
+    def _detect_cycles_indexed(
+        self, node_ids: List[str], sources: np.ndarray, targets: np.ndarray
+    ) -> List[List[str]]:
+        """Iterative DFS over a CSR adjacency; reports each back edge as a cycle."""
+        count = len(node_ids)
+        pairs = np.stack([sources, targets], axis=1)
+        if pairs.size:
+            pairs = np.unique(pairs, axis=0)
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pairs[:, 0], minlength=count), out=offsets[1:])
+        indptr = offsets.tolist()
+        indices = pairs[:, 1].tolist()
+        visited = bytearray(count)
+        on_path = bytearray(count)
+        depth = [0] * count
+        result: List[List[str]] = []
+        for root in range(count):
+            if visited[root]:
+                continue
+            visited[root] = on_path[root] = 1
+            path = [root]
+            cursors = [indptr[root]]
+            while path:
+                current = path[-1]
+                cursor = cursors[-1]
+                if cursor == indptr[current + 1]:
+                    on_path[current] = 0
+                    path.pop()
+                    cursors.pop()
+                    continue
+                cursors[-1] = cursor + 1
+                neighbour = indices[cursor]
+                if not visited[neighbour]:
+                    visited[neighbour] = on_path[neighbour] = 1
+                    depth[neighbour] = len(path)
+                    path.append(neighbour)
+                    cursors.append(indptr[neighbour])
+                elif on_path[neighbour]:
+                    cycle = path[depth[neighbour] :] + [neighbour]
+                    result.append([node_ids[index] for index in cycle])
+        return result
+
     def _detect_cycles(self, adjacency: Dict[str, Set[str]]) -> List[List[str]]:
+        # Iterative so long chains do not hit the recursion limit.
         visited: Set[str] = set()
-        stack: Set[str] = set()
+        depth: Dict[str, int] = {}
         order: List[str] = []
+        pending: List[Iterator[str]] = []
         result: List[List[str]] = []
 
-        def dfs(node_id: str) -> None:
-            visited.add(node_id)
-            stack.add(node_id)
-            order.append(node_id)
-            for neighbour in adjacency[node_id]:
-                if neighbour not in visited:
-                    dfs(neighbour)
-                elif neighbour in stack:
-                    cycle = order[order.index(neighbour) :] + [neighbour]
-                    result.append(cycle)
-            stack.remove(node_id)
-            order.pop()
-
-        for node_id in adjacency:
-            if node_id not in visited:
-                dfs(node_id)
+        for root in adjacency:
+            if root in visited:
+                continue
+            visited.add(root)
+            depth[root] = 0
+            order.append(root)
+            pending.append(iter(adjacency[root]))
+            while pending:
+                neighbour = next(pending[-1], None)
+                if neighbour is None:
+                    pending.pop()
+                    del depth[order.pop()]
+                elif neighbour not in visited:
+                    visited.add(neighbour)
+                    depth[neighbour] = len(order)
+                    order.append(neighbour)
+                    pending.append(iter(adjacency[neighbour]))
+                elif neighbour in depth:
+                    result.append(order[depth[neighbour] :] + [neighbour])
         return result
 
 
@@ -0,0 +1,473 @@
+"""Dependency-light PNG rasterizer for graph versions."""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import BinaryIO, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .models import Edge, Node, edge_columns, node_columns
+
+Color = Tuple[int, int, int]
+
+BACKGROUND: Color = (255, 255, 255)
+NODE_FILL: Color = (0xE3, 0xF2, 0xFD)
+NODE_STROKE: Color = (0x19, 0x76, 0xD2)
+AMBIGUOUS_STROKE: Color = (0xFF, 0x98, 0x00)
+EDGE_STROKE: Color = (0x55, 0x55, 0x55)
+ARROW_FILL: Color = (0x33, 0x33, 0x33)
+LABEL_COLOR: Color = (0x00, 0x00, 0x00)
+EDGE_LABEL_COLOR: Color = (0x33, 0x33, 0x33)
+TRUST_COLOR: Color = (0x55, 0x55, 0x55)
+
+NODE_RADIUS = 30.0
+STROKE_WIDTH = 2.0
+ARROW_LENGTH = 18.0
+ARROW_HALF_WIDTH = 6.0
+DASH_PATTERN = (4.0, 2.0)
+
+# Classic 5x7 font covering printable ASCII (0x20-0x7E). Each glyph is five
+# column bytes; bit 0 is the top row.
+_FONT_5X7 = bytes.fromhex(
+    "0000000000" "00005f0000" "0007000700" "147f147f14" "242a7f2a12"
+    "2313086462" "3649552250" "0005030000" "001c224100" "0041221c00"
+    "082a1c2a08" "08083e0808" "0050300000" "0808080808" "0060600000"
+    "2010080402" "3e5149453e" "00427f4000" "4261514946" "2141454b31"
+    "1814127f10" "2745454539" "3c4a494930" "0171090503" "3649494936"
+    "064949291e" "0036360000" "0056360000" "0008142241" "1414141414"
+    "4122140800" "0201510906" "324979413e" "7e1111117e" "7f49494936"
+    "3e41414122" "7f4141221c" "7f49494941" "7f09090901" "3e4149497a"
+    "7f0808087f" "00417f4100" "2040413f01" "7f08142241" "7f40404040"
+    "7f020c027f" "7f0408107f" "3e4141413e" "7f09090906" "3e4151215e"
+    "7f09192946" "4649494931" "01017f0101" "3f4040403f" "1f2040201f"
+    "3f4038403f" "6314081463" "0708700807" "6151494543" "007f414100"
+    "0204081020" "0041417f00" "0402010204" "4040404040" "0001020400"
+    "2054545478" "7f48444438" "3844444420" "384444487f" "3854545418"
+    "087e090102" "0c5252523e" "7f08040478" "00447d4000" "2040443d00"
+    "7f10284400" "00417f4000" "7c04180478" "7c08040478" "3844444438"
+    "7c14141408" "081414187c" "7c08040408" "4854545420" "043f444020"
+    "3c4040207c" "1c2040201c" "3c4030403c" "4428102844" "0c5050503c"
+    "4464544c44" "0008364100" "00007f0000" "0041360800" "0804080402"
+)
+_GLYPH_WIDTH = 5
+_GLYPH_HEIGHT = 7
+_GLYPH_ADVANCE = _GLYPH_WIDTH + 1
+_MIN_FONT_PIXELS = 6.0
+
+
+def _build_glyphs() -> np.ndarray:
+    columns = np.frombuffer(_FONT_5X7, dtype=np.uint8).reshape(-1, _GLYPH_WIDTH)
+    rows = np.arange(_GLYPH_HEIGHT, dtype=np.uint8)
+    # (glyph, row, column) boolean masks
+    return ((columns[:, None, :] >> rows[None, :, None]) & 1).astype(bool)
+
+
+_GLYPHS = _build_glyphs()
+_FALLBACK_GLYPH = ord("?") - 0x20
+
+
+def text_mask(text: str, pixel_scale: int) -> np.ndarray:
+    """Returns a boolean bitmap for ``text`` using the built-in 5x7 font."""
+    if not text:
+        return np.zeros((0, 0), dtype=bool)
+    indices = [
+        ord(char) - 0x20 if 0x20 <= ord(char) <= 0x7E else _FALLBACK_GLYPH
+        for char in text
+    ]
+    glyphs = _GLYPHS[indices]
+    spaced = np.zeros((len(indices), _GLYPH_HEIGHT, _GLYPH_ADVANCE), dtype=bool)
+    spaced[:, :, :_GLYPH_WIDTH] = glyphs
+    mask = spaced.transpose(1, 0, 2).reshape(_GLYPH_HEIGHT, -1)[:, :-1]
+    if pixel_scale > 1:
+        mask = mask.repeat(pixel_scale, axis=0).repeat(pixel_scale, axis=1)
+    return mask
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(data))
+        + kind
+        + data
+        + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+    )
+
+
+def _expand_spans(
+    owners: np.ndarray, rows: np.ndarray, lo: np.ndarray, hi: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Turns half-open ``[lo, hi)`` pixel spans into flat pixel coordinates."""
+    counts = np.maximum(hi - lo, 0)
+    total = int(counts.sum())
+    starts = np.cumsum(counts) - counts
+    columns = np.arange(total, dtype=np.int64) + np.repeat(lo - starts, counts)
+    return np.repeat(owners, counts), np.repeat(rows, counts), columns
+
+
+def _expand_rows(owners: np.ndarray, first: np.ndarray, last: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Lists every row in ``[first, last)`` for each owner."""
+    owner_rows, _, rows = _expand_spans(owners, owners, first, last)
+    return owner_rows, rows
+
+
+class _Band:
+    """A horizontal strip of the output image held as an RGBA buffer."""
+
+    def __init__(self, width: int, top: int, height: int) -> None:
+        self.width = width
+        self.top = top
+        self.height = height
+        self.pixels = np.empty((height, width, 4), dtype=np.uint8)
+        self.pixels[:, :, :3] = BACKGROUND
+        self.pixels[:, :, 3] = 255
+
+    def layer(self) -> np.ndarray:
+        return np.zeros((self.height, self.width), dtype=np.float32)
+
+    def row_range(self, top: np.ndarray, bottom: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Clips image-space vertical extents to band-local row ranges."""
+        first = np.clip(np.floor(top).astype(np.int64) - self.top, 0, self.height)
+        last = np.clip(np.ceil(bottom).astype(np.int64) + 1 - self.top, 0, self.height)
+        return first, last
+
+    def column_range(self, left: np.ndarray, right: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        lo = np.clip(np.floor(left).astype(np.int64), 0, self.width)
+        hi = np.clip(np.ceil(right).astype(np.int64) + 1, 0, self.width)
+        return lo, hi
+
+    def composite(self, coverage: np.ndarray, color: Color) -> None:
+        touched = np.nonzero(coverage.any(axis=1))[0]
+        if touched.size == 0:
+            return
+        top, bottom = int(touched[0]), int(touched[-1]) + 1
+        alpha = coverage[top:bottom, :, None]
+        region = self.pixels[top:bottom, :, :3]
+        blended = region * (1.0 - alpha) + np.asarray(color, dtype=np.float32) * alpha
+        region[...] = np.rint(blended).astype(np.uint8)
+
+
+class _Scene:
+    """Scaled geometry for one render, stored as flat NumPy arrays."""
+
+    def __init__(
+        self,
+        nodes: Sequence[Node],
+        edges: Sequence[Edge],
+        positions: Mapping[str, Tuple[float, float]],
+        scale: float,
+        fallback: Tuple[float, float],
+    ) -> None:
+        self.radius = NODE_RADIUS * scale
+        self.half_stroke = max(0.5, STROKE_WIDTH * scale / 2)
+        self.dash = DASH_PATTERN[0] * scale
+        self.dash_period = (DASH_PATTERN[0] + DASH_PATTERN[1]) * scale
+
+        node_cols = node_columns(nodes)
+        edge_cols = edge_columns(edges)
+        self.node_xy = np.array(
+            [positions.get(node_id, fallback) for node_id in node_cols.ids], dtype=np.float64
+        ).reshape(-1, 2) * scale
+        self.ambiguous = np.array(node_cols.ambiguous, dtype=bool)
+        drawable = [
+            (source, target, label)
+            for source, target, label in zip(edge_cols.sources, edge_cols.targets, edge_cols.labels)
+            if source in positions and target in positions
+        ]
+        edge_xy = np.array(
+            [(*positions[source], *positions[target]) for source, target, _ in drawable],
+            dtype=np.float64,
+        ).reshape(-1, 4) * scale
+        self.lines, self.arrows = self._edge_geometry(
+            edge_xy, self.radius, ARROW_LENGTH * scale, ARROW_HALF_WIDTH * scale
+        )
+
+        font_pixels = 12.0 * scale
+        self.edge_texts: List[Tuple[str, float, float, int]] = []
+        self.label_texts: List[Tuple[str, float, float, int]] = []
+        self.trust_texts: List[Tuple[str, float, float, int]] = []
+        if font_pixels >= _MIN_FONT_PIXELS:
+            label_scale = max(1, int(round(font_pixels / 10.0)))
+            small_scale = max(1, int(round(scale)))
+            for index, (_, _, label) in enumerate(drawable):
+                if label:
+                    sx, sy, tx, ty = edge_xy[index]
+                    self.edge_texts.append(
+                        (label, (sx + tx) / 2, (sy + ty) / 2 - 5 * scale, label_scale)
+                    )
+            for index, (label, trust) in enumerate(zip(node_cols.labels, node_cols.trust)):
+                x, y = self.node_xy[index]
+                self.label_texts.append((label, x, y, label_scale))
+                self.trust_texts.append(
+                    (f"trust: {trust:.2f}", x, y + self.radius + 12 * scale, small_scale)
+                )
+        self.edge_text_boxes = _text_boxes(self.edge_texts, centered=False)
+        self.label_text_boxes = _text_boxes(self.label_texts, centered=True)
+        self.trust_text_boxes = _text_boxes(self.trust_texts, centered=False)
+
+    @staticmethod
+    def _edge_geometry(
+        edge_xy: np.ndarray,
+        radius: float,
+        arrow_length: float,
+        arrow_half: float,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        start = edge_xy[:, :2]
+        end = edge_xy[:, 2:]
+        delta = end - start
+        length = np.hypot(delta[:, 0], delta[:, 1])
+        keep = length > 0
+        start, end, delta, length = start[keep], end[keep], delta[keep], length[keep]
+        direction = delta / length[:, None]
+        # Stop the line at the target outline so the arrowhead stays visible.
+        trim = np.minimum(radius, length / 2)[:, None]
+        tip = end - direction * trim
+        tail = start + direction * trim
+        head = np.minimum(arrow_length, length - 2 * trim[:, 0])[:, None]
+        base = tip - direction * head
+        normal = np.stack([-direction[:, 1], direction[:, 0]], axis=1)
+        lines = np.concatenate([tail, base], axis=1)
+        arrows = np.stack([tip, base + normal * arrow_half, base - normal * arrow_half], axis=1)
+        return lines, arrows
+
+
+def _text_boxes(texts: List[Tuple[str, float, float, int]], centered: bool) -> np.ndarray:
+    boxes = np.zeros((len(texts), 4), dtype=np.float64)
+    for index, (text, x, y, pixel_scale) in enumerate(texts):
+        width = (len(text) * _GLYPH_ADVANCE - 1) * pixel_scale
+        height = _GLYPH_HEIGHT * pixel_scale
+        left = round(x - width / 2)
+        top = round(y - height / 2 if centered else y - height)
+        boxes[index] = (left, top, left + width, top + height)
+    return boxes
+
+
+class PngRasterizer:
+    """Draws a positioned graph into RGBA scanline bands and encodes a PNG.
+
+    The image is produced ``band_height`` rows at a time and each band is
+    compressed before the next one is drawn, so peak memory is bounded by
+    the band buffers plus the per-element geometry arrays, independently of
+    the output height. Within a band every primitive class (edges,
+    arrowheads, node fills, outlines, labels) is rasterized in one
+    vectorized pass over its pixel spans and composited as a single layer.
+    """
+
+    def __init__(
+        self,
+        width: float,
+        height: float,
+        scale: float = 1.0,
+        band_height: int = 256,
+    ) -> None:
+        if scale <= 0:
+            raise ValueError("scale must be positive")
+        if band_height <= 0:
+            raise ValueError("band_height must be positive")
+        self.scale = float(scale)
+        self.width = max(1, int(round(width * self.scale)))
+        self.height = max(1, int(round(height * self.scale)))
+        self.band_height = band_height
+
+    def render(
+        self,
+        nodes: Sequence[Node],
+        edges: Sequence[Edge],
+        positions: Mapping[str, Tuple[float, float]],
+        stream: BinaryIO,
+        default_position: Optional[Tuple[float, float]] = None,
+    ) -> None:
+        fallback = default_position or (self.width / self.scale / 2, self.height / self.scale / 2)
+        scene = _Scene(nodes, edges, positions, self.scale, fallback)
+
+        stream.write(b"\x89PNG\r\n\x1a\n")
+        stream.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 6, 0, 0, 0)))
+        compressor = zlib.compressobj(6)
+        filter_column = np.zeros((self.band_height, 1), dtype=np.uint8)
+        for top in range(0, self.height, self.band_height):
+            band = _Band(self.width, top, min(self.band_height, self.height - top))
+            self._paint(band, scene)
+            rows = band.pixels.reshape(band.height, -1)
+            scanlines = np.concatenate([filter_column[: band.height], rows], axis=1)
+            data = compressor.compress(scanlines.tobytes())
+            if data:
+                stream.write(_chunk(b"IDAT", data))
+        stream.write(_chunk(b"IDAT", compressor.flush()))
+        stream.write(_chunk(b"IEND", b""))
+
+    def _paint(self, band: _Band, scene: _Scene) -> None:
+        band.composite(self._segments(band, scene.lines, scene.half_stroke), EDGE_STROKE)
+        band.composite(self._triangles(band, scene.arrows), ARROW_FILL)
+        band.composite(self._texts(band, scene.edge_texts, scene.edge_text_boxes), EDGE_LABEL_COLOR)
+        fill, solid, dashed = self._circles(band, scene)
+        band.composite(fill, NODE_FILL)
+        band.composite(solid, NODE_STROKE)
+        band.composite(dashed, AMBIGUOUS_STROKE)
+        band.composite(self._texts(band, scene.label_texts, scene.label_text_boxes), LABEL_COLOR)
+        band.composite(self._texts(band, scene.trust_texts, scene.trust_text_boxes), TRUST_COLOR)
+
+    def _segments(self, band: _Band, lines: np.ndarray, half_width: float) -> np.ndarray:
+        layer = band.layer()
+        pad = half_width + 1.0
+        first, last = band.row_range(
+            np.minimum(lines[:, 1], lines[:, 3]) - pad,
+            np.maximum(lines[:, 1], lines[:, 3]) + pad,
+        )
+        active = np.nonzero(last > first)[0]
+        if active.size == 0:
+            return layer
+        owners, rows = _expand_rows(active, first[active], last[active])
+        x0, y0, x1, y1 = (lines[owners, column] for column in range(4))
+        dx, dy = x1 - x0, y1 - y0
+        length = np.hypot(dx, dy)
+        y = rows + band.top + 0.5
+        # Horizontal extent of the stroke on each row, clamped to the segment box.
+        steep = np.abs(dy) > 1e-9
+        safe_dy = np.where(steep, dy, 1.0)
+        center = x0 + (y - y0) * dx / safe_dy
+        reach = pad * length / np.abs(safe_dy)
+        left = np.maximum(np.where(steep, center - reach, -np.inf), np.minimum(x0, x1) - pad)
+        right = np.minimum(np.where(steep, center + reach, np.inf), np.maximum(x0, x1) + pad)
+        lo, hi = band.column_range(left, right)
+        owners, rows, columns = _expand_spans(owners, rows, lo, hi)
+        px = columns + 0.5
+        py = rows + band.top + 0.5
+        sx, sy = lines[owners, 0], lines[owners, 1]
+        ex, ey = lines[owners, 2] - sx, lines[owners, 3] - sy
+        length_sq = np.maximum(ex * ex + ey * ey, 1e-12)
+        t = np.clip(((px - sx) * ex + (py - sy) * ey) / length_sq, 0.0, 1.0)
+        distance = np.hypot(px - (sx + t * ex), py - (sy + t * ey))
+        coverage = np.clip(half_width + 0.5 - distance, 0.0, 1.0).astype(np.float32)
+        np.maximum.at(layer, (rows, columns), coverage)
+        return layer
+
+    def _triangles(self, band: _Band, points: np.ndarray) -> np.ndarray:
+        layer = band.layer()
+        first, last = band.row_range(points[:, :, 1].min(axis=1) - 1, points[:, :, 1].max(axis=1) + 1)
+        active = np.nonzero(last > first)[0]
+        if active.size == 0:
+            return layer
+        owners, rows = _expand_rows(active, first[active], last[active])
+        lo, hi = band.column_range(points[owners, :, 0].min(axis=1) - 1, points[owners, :, 0].max(axis=1) + 1)
+        owners, rows, columns = _expand_spans(owners, rows, lo, hi)
+        px = columns + 0.5
+        py = rows + band.top + 0.5
+        corners = points[owners]
+        u = corners[:, 1] - corners[:, 0]
+        v = corners[:, 2] - corners[:, 0]
+        area = u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0]
+        sign = np.where(area >= 0, 1.0, -1.0)
+        inside = np.full(px.shape, np.inf)
+        for index in range(3):
+            a = corners[:, index]
+            b = corners[:, (index + 1) % 3]
+            edge_length = np.hypot(b[:, 0] - a[:, 0], b[:, 1] - a[:, 1])
+            edge_length = np.where(edge_length > 0, edge_length, 1.0)
+            signed = sign * ((b[:, 0] - a[:, 0]) * (py - a[:, 1]) - (b[:, 1] - a[:, 1]) * (px - a[:, 0]))
+            inside = np.minimum(inside, signed / edge_length)
+        np.maximum.at(layer, (rows, columns), np.clip(inside + 0.5, 0.0, 1.0).astype(np.float32))
+        return layer
+
+    def _circles(self, band: _Band, scene: _Scene) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        fill, solid, dashed = band.layer(), band.layer(), band.layer()
+        centers = scene.node_xy
+        radius = scene.radius
+        half_stroke = scene.half_stroke
+        reach = radius + half_stroke + 1.0
+        first, last = band.row_range(centers[:, 1] - reach, centers[:, 1] + reach)
+        active = np.nonzero(last > first)[0]
+        if active.size == 0:
+            return fill, solid, dashed
+        owners, rows = _expand_rows(active, first[active], last[active])
+        cx, cy = centers[owners, 0], centers[owners, 1]
+        offset = np.abs(rows + band.top + 0.5 - cy)
+        chord = np.sqrt(np.maximum(reach * reach - np.minimum(offset, reach) ** 2, 0.0)) + 1.0
+        lo, hi = band.column_range(cx - chord, cx + chord)
+        owners, rows, columns = _expand_spans(owners, rows, lo, hi)
+        dx = columns + 0.5 - centers[owners, 0]
+        dy = rows + band.top + 0.5 - centers[owners, 1]
+        distance = np.hypot(dx, dy)
+        np.maximum.at(fill, (rows, columns), np.clip(radius - distance + 0.5, 0.0, 1.0).astype(np.float32))
+        ring = np.clip(half_stroke + 0.5 - np.abs(distance - radius), 0.0, 1.0).astype(np.float32)
+        ambiguous = scene.ambiguous[owners]
+        np.maximum.at(solid, (rows[~ambiguous], columns[~ambiguous]), ring[~ambiguous])
+        arc = (np.arctan2(dy[ambiguous], dx[ambiguous]) % (2 * np.pi)) * radius
+        dash_ring = np.where(arc % scene.dash_period < scene.dash, ring[ambiguous], 0.0).astype(np.float32)
+        np.maximum.at(dashed, (rows[ambiguous], columns[ambiguous]), dash_ring)
+        return fill, solid, dashed
+
+    def _texts(
+        self,
+        band: _Band,
+        texts: List[Tuple[str, float, float, int]],
+        boxes: np.ndarray,
+    ) -> np.ndarray:
+        layer = band.layer()
+        if not texts:
+            return layer
+        bottom = band.top + band.height
+        visible = (boxes[:, 1] < bottom) & (boxes[:, 3] > band.top) & (boxes[:, 2] > 0) & (boxes[:, 0] < band.width)
+        for index in np.nonzero(visible)[0]:
+            label, _, _, pixel_scale = texts[index]
+            mask = text_mask(label, pixel_scale)
+            if mask.size == 0:
+                continue
+            left, top = int(boxes[index, 0]), int(boxes[index, 1]) - band.top
+            src_top, src_left = max(0, -top), max(0, -left)
+            dst_top, dst_left = max(0, top), max(0, left)
+            rows = min(mask.shape[0] - src_top, band.height - dst_top)
+            cols = min(mask.shape[1] - src_left, band.width - dst_left)
+            if rows <= 0 or cols <= 0:
+                continue
+            target = layer[dst_top : dst_top + rows, dst_left : dst_left + cols]
+            np.maximum(target, mask[src_top : src_top + rows, src_left : src_left + cols], out=target)
+        return layer
+
+
+def encode_png(pixels: np.ndarray) -> bytes:
+    """Encodes an ``(height, width, 4)`` uint8 RGBA array as PNG bytes."""
+    height, width, channels = pixels.shape
+    if channels != 4:
+        raise ValueError("expected an RGBA array")
+    raw = np.concatenate(
+        [np.zeros((height, 1), dtype=np.uint8), pixels.astype(np.uint8).reshape(height, -1)],
+        axis=1,
+    )
+    return b"".join(
+        [
+            b"\x89PNG\r\n\x1a\n",
+            _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)),
+            _chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)),
+            _chunk(b"IEND", b""),
+        ]
+    )
+
+
+def decode_png(data: bytes) -> np.ndarray:
+    """Decodes PNGs written by this module back into an RGBA array."""
+    if not data.startswith(b"\x89PNG\r\n\x1a\n"):
+        raise ValueError("not a PNG stream")
+    offset = 8
+    width = height = 0
+    compressed: List[bytes] = []
+    while offset < len(data):
+        (length,) = struct.unpack(">I", data[offset : offset + 4])
+        kind = data[offset + 4 : offset + 8]
+        body = data[offset + 8 : offset + 8 + length]
+        offset += 12 + length
+        if kind == b"IHDR":
+            width, height, depth, color_type = struct.unpack(">IIBB", body[:10])
+            if depth != 8 or color_type != 6:
+                raise ValueError("only 8-bit RGBA PNGs are supported")
+        elif kind == b"IDAT":
+            compressed.append(body)
+        elif kind == b"IEND":
+            break
+    raw = np.frombuffer(zlib.decompress(b"".join(compressed)), dtype=np.uint8)
+    rows = raw.reshape(height, width * 4 + 1)
+    if rows[:, 0].any():
+        raise ValueError("only unfiltered scanlines are supported")
+    return rows[:, 1:].reshape(height, width, 4).copy()
+
+
+__all__ = ["PngRasterizer", "encode_png", "decode_png", "text_mask"]
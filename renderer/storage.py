@@ -3,20 +3,101 @@
 from __future__ import annotations
 
 import json
+import re
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
-from dataclasses import asdict
 from datetime import UTC, datetime
-from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar, overload
 
-from .models import Edge, GraphVersion, Node
+from .metrics import REGISTRY
+from .models import Edge, EdgeView, GraphFrame, GraphVersion, Node, NodeView, edge_columns, node_columns
+
+T = TypeVar("T", Node, Edge)
+
+_QUERY_PATTERN = re.compile(r"^\s*(\w+)\b.*?\b(?:FROM|INTO)\s+(\w+)", re.IGNORECASE | re.DOTALL)
+
+
+@lru_cache(maxsize=256)
+def _query_label(sql: str) -> Tuple[str, str]:
+    """``(statement, table)`` for metrics, e.g. ``("select", "graph_nodes")``."""
+    match = _QUERY_PATTERN.match(sql)
+    if match is None:
+        return sql.split(None, 1)[0].lower() if sql.strip() else "", ""
+    return match.group(1).lower(), match.group(2)
+
+
+class _InstrumentedCursor:
+    """Cursor proxy recording per-query timings and row counts."""
+
+    def __init__(self, cursor: sqlite3.Cursor) -> None:
+        self._cursor = cursor
+        self._table = ""
+
+    def _run(self, method: str, sql: str, params: Any) -> "_InstrumentedCursor":
+        statement, self._table = _query_label(sql)
+        started = time.perf_counter()
+        getattr(self._cursor, method)(sql, params)
+        REGISTRY.observe(
+            "renderer_storage_query_seconds",
+            time.perf_counter() - started,
+            {"statement": statement, "table": self._table},
+        )
+        if statement == "insert":
+            written = len(params) if method == "executemany" else 1
+            REGISTRY.inc("renderer_storage_rows_written_total", written, {"table": self._table})
+        return self
+
+    def execute(self, sql: str, params: Any = ()) -> "_InstrumentedCursor":
+        return self._run("execute", sql, params)
+
+    def executemany(self, sql: str, params: Any) -> "_InstrumentedCursor":
+        return self._run("executemany", sql, list(params))
+
+    def fetchone(self) -> Optional[sqlite3.Row]:
+        row = self._cursor.fetchone()
+        if row is not None:
+            REGISTRY.inc("renderer_storage_rows_read_total", 1, {"table": self._table})
+        return row
+
+    def fetchall(self) -> List[sqlite3.Row]:
+        rows = self._cursor.fetchall()
+        REGISTRY.inc("renderer_storage_rows_read_total", len(rows), {"table": self._table})
+        return rows
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+
+# Version metadata plus whether the elements live in a frame blob; the join
+# only touches the primary key of graph_frames, never the payload.
+_HEADER_QUERY = """
+    SELECT v.version, v.author_session, v.created_at, v.quality_json, f.version IS NOT NULL AS has_frame
+    FROM graph_versions AS v
+    LEFT JOIN graph_frames AS f ON f.graph_id = v.graph_id AND f.version = v.version
+"""
 
 
 class GraphPersistence:
-    """Persists graphs and their version history."""
+    """Persists graphs and their version history.
+
+    With ``columnar=True`` each version is stored as a single
+    :class:`GraphFrame` blob instead of one JSON row per element, and loaded
+    back as a frame-backed :class:`GraphVersion`. Both layouts can be read
+    regardless of the flag.
 
-    def __init__(self, path: str = ":memory:") -> None:
+    Loaded versions are lazy: only the header is read up front, and nodes
+    and edges are decoded on first access, ``page_size`` rows per query.
+    """
+
+    def __init__(self, path: str = ":memory:", columnar: bool = False, page_size: int = 5000) -> None:
+        if page_size <= 0:
+            raise ValueError("page_size must be positive")
         self._path = path
+        self.columnar = columnar
+        self.page_size = page_size
         self._conn = sqlite3.connect(
             path,
             detect_types=sqlite3.PARSE_DECLTYPES,
@@ -30,8 +111,9 @@ class GraphPersistence:
     def _cursor(self) -> Iterator[sqlite3.Cursor]:
         cursor = self._conn.cursor()
         try:
-            yield cursor
-            self._conn.commit()
+            yield _InstrumentedCursor(cursor) if REGISTRY.enabled else cursor
+            with REGISTRY.timed("renderer_storage_commit_seconds"):
+                self._conn.commit()
         finally:
             cursor.close()
 
@@ -71,6 +153,14 @@ class GraphPersistence:
                     PRIMARY KEY (graph_id, version, edge_id),
                     FOREIGN KEY (graph_id, version) REFERENCES graph_versions(graph_id, version)
                 );
+
+                CREATE TABLE IF NOT EXISTS graph_frames (
+                    graph_id TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    payload BLOB NOT NULL,
+                    PRIMARY KEY (graph_id, version),
+                    FOREIGN KEY (graph_id, version) REFERENCES graph_versions(graph_id, version)
+                );
                 """
             )
 
@@ -81,58 +171,98 @@ class GraphPersistence:
                 (graph_id, datetime.now(UTC).isoformat().replace("+00:00", "Z")),
             )
 
-    def latest_version(self, graph_id: str) -> Optional[GraphVersion]:
+    def latest_version_number(self, graph_id: str) -> Optional[int]:
         with self._cursor() as cur:
             cur.execute(
-                "SELECT version FROM graph_versions WHERE graph_id = ? ORDER BY version DESC LIMIT 1",
+                "SELECT MAX(version) AS version FROM graph_versions WHERE graph_id = ?",
                 (graph_id,),
             )
             row = cur.fetchone()
-            if not row:
-                return None
-            return self.load_version(graph_id, int(row["version"]))
+        return None if row is None or row["version"] is None else int(row["version"])
 
-    def load_version(self, graph_id: str, version: int) -> GraphVersion:
+    def latest_version(self, graph_id: str) -> Optional[GraphVersion]:
         with self._cursor() as cur:
             cur.execute(
-                """
-                SELECT author_session, created_at, quality_json
-                FROM graph_versions
-                WHERE graph_id = ? AND version = ?
-                """,
-                (graph_id, version),
+                _HEADER_QUERY + " WHERE v.graph_id = ? ORDER BY v.version DESC LIMIT 1",
+                (graph_id,),
             )
             header = cur.fetchone()
-            if header is None:
-                raise KeyError(f"graph {graph_id} version {version} does not exist")
+        return None if header is None else _LazyGraphVersion._from_header(self, graph_id, header)
+
+    def load_version(self, graph_id: str, version: int) -> GraphVersion:
+        """Loads the header of ``version``; nodes and edges are read on first access.
 
+        The elements are fetched from this store when ``nodes``, ``edges`` or
+        ``frame`` is first used, so that must happen before the version is
+        pruned or the store is closed.
+        """
+        with self._cursor() as cur:
+            cur.execute(_HEADER_QUERY + " WHERE v.graph_id = ? AND v.version = ?", (graph_id, version))
+            header = cur.fetchone()
+        if header is None:
+            raise KeyError(f"graph {graph_id} version {version} does not exist")
+        return _LazyGraphVersion._from_header(self, graph_id, header)
+
+    def _read_frame(self, graph_id: str, version: int) -> GraphFrame:
+        with self._cursor() as cur:
             cur.execute(
-                """
-                SELECT payload_json FROM graph_nodes
-                WHERE graph_id = ? AND version = ?
-                """,
+                "SELECT payload FROM graph_frames WHERE graph_id = ? AND version = ?",
                 (graph_id, version),
             )
-            nodes = [Node(**json.loads(row["payload_json"])) for row in cur.fetchall()]
+            row = cur.fetchone()
+        if row is None:
+            raise KeyError(f"graph {graph_id} version {version} does not exist")
+        REGISTRY.inc("renderer_storage_bytes_deserialized_total", len(row["payload"]))
+        return GraphFrame.from_bytes(row["payload"])
 
+    def _require_version(self, graph_id: str, version: int) -> None:
+        """Raises ``KeyError`` if ``version`` is gone, e.g. removed by :meth:`prune`."""
+        with self._cursor() as cur:
+            cur.execute("SELECT 1 FROM graph_versions WHERE graph_id = ? AND version = ?", (graph_id, version))
+            found = cur.fetchone() is not None
+        if not found:
+            raise KeyError(f"graph {graph_id} version {version} does not exist")
+
+    def _count_rows(self, table: str, graph_id: str, version: int) -> int:
+        with self._cursor() as cur:
             cur.execute(
-                """
-                SELECT payload_json FROM graph_edges
-                WHERE graph_id = ? AND version = ?
-                """,
+                f"SELECT COUNT(*) AS total FROM {table} WHERE graph_id = ? AND version = ?",
                 (graph_id, version),
             )
-            edges = [Edge(**json.loads(row["payload_json"])) for row in cur.fetchall()]
+            total = int(cur.fetchone()["total"])
+        if not total:
+            self._require_version(graph_id, version)
+        return total
 
-        return GraphVersion(
-            graph_id=graph_id,
-            version=version,
-            nodes=nodes,
-            edges=edges,
-            created_at=datetime.fromisoformat(header["created_at"].replace("Z", "+00:00")),
-            author_session=header["author_session"],
-            quality=json.loads(header["quality_json"]),
-        )
+    def _read_rows(
+        self,
+        table: str,
+        key: str,
+        graph_id: str,
+        version: int,
+        limit: int,
+        after: Optional[str] = None,
+        offset: int = 0,
+    ) -> List[sqlite3.Row]:
+        """One page of ``table`` in key order, starting after key ``after`` or at ``offset``.
+
+        An empty page of a version that no longer exists raises ``KeyError``
+        rather than reading as the end of the elements.
+        """
+        query = f"SELECT {key} AS key, payload_json FROM {table} WHERE graph_id = ? AND version = ?"
+        params: Tuple[Any, ...] = (graph_id, version)
+        if after is not None:
+            query += f" AND {key} > ?"
+            params += (after,)
+        query += f" ORDER BY {key} LIMIT ? OFFSET ?"
+        with self._cursor() as cur:
+            cur.execute(query, params + (limit, 0 if after is not None else offset))
+            rows = cur.fetchall()
+        if not rows:
+            self._require_version(graph_id, version)
+        if REGISTRY.enabled:
+            REGISTRY.inc("renderer_storage_bytes_deserialized_total", sum(len(row["payload_json"]) for row in rows))
+        return rows
 
     def save_version(
         self,
@@ -143,13 +273,18 @@ class GraphPersistence:
         quality: Optional[Dict[str, object]] = None,
     ) -> GraphVersion:
         self.register_graph(graph_id)
-        latest = self.latest_version(graph_id)
-        next_version = 1 if latest is None else latest.version + 1
+        latest = self.latest_version_number(graph_id)
+        next_version = 1 if latest is None else latest + 1
         created_at = datetime.now(UTC).isoformat().replace("+00:00", "Z")
         quality_json = json.dumps(quality or {})
 
-        nodes_list = list(nodes)
-        edges_list = list(edges)
+        frame: Optional[GraphFrame] = None
+        if self.columnar or (isinstance(nodes, NodeView) and isinstance(edges, EdgeView)):
+            frame = GraphFrame.from_elements(nodes, edges)
+            nodes_list, edges_list = frame.nodes, frame.edges
+        else:
+            nodes_list = list(nodes)
+            edges_list = list(edges)
 
         with self._cursor() as cur:
             cur.execute(
@@ -160,26 +295,25 @@ class GraphPersistence:
                 (graph_id, next_version, author_session, created_at, quality_json),
             )
 
-            node_rows = [
-                (graph_id, next_version, node.id, json.dumps(asdict(node)))
-                for node in nodes_list
-            ]
-            if node_rows:
-                cur.executemany(
-                    "INSERT INTO graph_nodes(graph_id, version, node_id, payload_json) VALUES (?, ?, ?, ?)",
-                    node_rows,
-                )
-
-            edge_rows = [
-                (graph_id, next_version, edge.id, json.dumps(asdict(edge)))
-                for edge in edges_list
-            ]
-            if edge_rows:
-                cur.executemany(
-                    "INSERT INTO graph_edges(graph_id, version, edge_id, payload_json) VALUES (?, ?, ?, ?)",
-                    edge_rows,
+            if self.columnar and frame is not None:
+                payload = frame.to_bytes()
+                REGISTRY.inc("renderer_storage_bytes_serialized_total", len(payload))
+                cur.execute(
+                    "INSERT INTO graph_frames(graph_id, version, payload) VALUES (?, ?, ?)",
+                    (graph_id, next_version, payload),
                 )
-
+            else:
+                self._insert_rows(cur, graph_id, next_version, nodes_list, edges_list)
+
+        if frame is not None:
+            return GraphVersion.from_frame(
+                graph_id,
+                next_version,
+                frame,
+                created_at=datetime.fromisoformat(created_at.replace("Z", "+00:00")),
+                author_session=author_session,
+                quality=json.loads(quality_json),
+            )
         return GraphVersion(
             graph_id=graph_id,
             version=next_version,
@@ -190,16 +324,65 @@ class GraphPersistence:
             quality=json.loads(quality_json),
         )
 
+    def _insert_rows(
+        self,
+        cur: sqlite3.Cursor,
+        graph_id: str,
+        version: int,
+        nodes: Iterable[Node],
+        edges: Iterable[Edge],
+    ) -> None:
+        nodes = node_columns(nodes)
+        node_rows = [
+            (
+                graph_id,
+                version,
+                node_id,
+                json.dumps({"id": node_id, "label": label, "trust": trust, "ambiguous": ambiguous}),
+            )
+            for node_id, label, trust, ambiguous in zip(nodes.ids, nodes.labels, nodes.trust, nodes.ambiguous)
+        ]
+        if REGISTRY.enabled:
+            REGISTRY.inc("renderer_storage_bytes_serialized_total", sum(len(row[3]) for row in node_rows))
+        if node_rows:
+            cur.executemany(
+                "INSERT INTO graph_nodes(graph_id, version, node_id, payload_json) VALUES (?, ?, ?, ?)",
+                node_rows,
+            )
+
+        edges = edge_columns(edges)
+        edge_rows = [
+            (
+                graph_id,
+                version,
+                edge_id,
+                json.dumps(
+                    {"id": edge_id, "source": source, "target": target, "label": label, "weight": weight}
+                ),
+            )
+            for edge_id, source, target, label, weight in zip(
+                edges.ids, edges.sources, edges.targets, edges.labels, edges.weights
+            )
+        ]
+        if REGISTRY.enabled:
+            REGISTRY.inc("renderer_storage_bytes_serialized_total", sum(len(row[3]) for row in edge_rows))
+        if edge_rows:
+            cur.executemany(
+                "INSERT INTO graph_edges(graph_id, version, edge_id, payload_json) VALUES (?, ?, ?, ?)",
+                edge_rows,
+            )
+
     def history(self, graph_id: str, limit: Optional[int] = None) -> List[GraphVersion]:
+        """Versions of ``graph_id``, newest first, loaded lazily like :meth:`load_version`."""
         with self._cursor() as cur:
-            query = "SELECT version FROM graph_versions WHERE graph_id = ? ORDER BY version DESC"
+            query = _HEADER_QUERY + " WHERE v.graph_id = ? ORDER BY v.version DESC"
             if limit is not None:
                 query += " LIMIT ?"
                 cur.execute(query, (graph_id, limit))
             else:
                 cur.execute(query, (graph_id,))
-            versions = [int(row["version"]) for row in cur.fetchall()]
-        return [self.load_version(graph_id, version) for version in versions]
+            headers = cur.fetchall()
+        return [_LazyGraphVersion._from_header(self, graph_id, header) for header in headers]
 
     def prune(self, graph_id: str, keep_last: int = 10) -> None:
         with self._cursor() as cur:
@@ -218,6 +401,10 @@ class GraphPersistence:
                     "DELETE FROM graph_edges WHERE graph_id = ? AND version = ?",
                     (graph_id, version),
                 )
+                cur.execute(
+                    "DELETE FROM graph_frames WHERE graph_id = ? AND version = ?",
+                    (graph_id, version),
+                )
                 cur.execute(
                     "DELETE FROM graph_versions WHERE graph_id = ? AND version = ?",
                     (graph_id, version),
@@ -227,6 +414,184 @@ class GraphPersistence:
         self._conn.close()
 
 
+class _PagedRows(Sequence[T]):
+    """Element rows of one stored version, fetched and decoded a page at a time.
+
+    Pages are read in key order and cached. Sequential pages continue from
+    the previous page's last key, so iterating costs one indexed query per
+    page; random access to a page not yet reached falls back to ``OFFSET``.
+    """
+
+    def __init__(
+        self,
+        persistence: GraphPersistence,
+        table: str,
+        key: str,
+        factory: Callable[..., T],
+        graph_id: str,
+        version: int,
+    ) -> None:
+        self._persistence = persistence
+        self._table = table
+        self._key = key
+        self._factory = factory
+        self._graph_id = graph_id
+        self._version = version
+        self._page_size = persistence.page_size
+        self._pages: Dict[int, List[T]] = {}
+        self._last_keys: Dict[int, str] = {}
+        self._length: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _page(self, index: int) -> List[T]:
+        page = self._pages.get(index)
+        if page is not None:
+            return page
+        with self._lock:
+            page = self._pages.get(index)
+            if page is None:
+                rows = self._persistence._read_rows(
+                    self._table,
+                    self._key,
+                    self._graph_id,
+                    self._version,
+                    self._page_size,
+                    after=self._last_keys.get(index - 1),
+                    offset=index * self._page_size,
+                )
+                page = [self._factory(**json.loads(row["payload_json"])) for row in rows]
+                if rows:
+                    self._last_keys[index] = rows[-1]["key"]
+                if len(rows) < self._page_size:
+                    self._length = index * self._page_size + len(rows)
+                self._pages[index] = page
+        return page
+
+    def __len__(self) -> int:
+        if self._length is None:
+            self._length = self._persistence._count_rows(self._table, self._graph_id, self._version)
+        return self._length
+
+    @overload
+    def __getitem__(self, position: int) -> T: ...
+
+    @overload
+    def __getitem__(self, position: slice) -> List[T]: ...
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return list(self)[position]
+        if position < 0:
+            position += len(self)
+        page = self._page(position // self._page_size) if position >= 0 else []
+        offset = position % self._page_size
+        if offset >= len(page):
+            raise IndexError(f"{self._table} index out of range")
+        return page[offset]
+
+    def __iter__(self) -> Iterator[T]:
+        index = 0
+        while True:
+            page = self._page(index)
+            yield from page
+            if len(page) < self._page_size:
+                return
+            index += 1
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (_PagedRows, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+
+class _LazyGraphVersion(GraphVersion):
+    """A stored :class:`GraphVersion` whose elements are loaded on first access.
+
+    Row-stored versions page ``nodes`` and ``edges`` independently; columnar
+    versions read their frame blob once for both. Assigning ``nodes``,
+    ``edges`` or ``frame`` replaces the lazy value. Reading elements of a
+    version pruned since it was loaded raises ``KeyError``.
+
+    The dataclass constructor still works (``dataclasses.replace`` uses it)
+    and yields an eagerly populated instance; pickling materializes the
+    version into a plain :class:`GraphVersion`.
+    """
+
+    _persistence: GraphPersistence
+    _stored_frame = False
+
+    @classmethod
+    def _from_header(cls, persistence: GraphPersistence, graph_id: str, header: sqlite3.Row) -> "_LazyGraphVersion":
+        version = cls(
+            graph_id=graph_id,
+            version=int(header["version"]),
+            created_at=datetime.fromisoformat(header["created_at"].replace("Z", "+00:00")),
+            author_session=header["author_session"],
+            quality=json.loads(header["quality_json"]),
+        )
+        version._persistence = persistence
+        version._stored_frame = bool(header["has_frame"])
+        version._nodes = None
+        version._edges = None
+        return version
+
+    def __reduce__(self) -> Tuple[Callable[..., GraphVersion], Tuple[Any, ...]]:
+        # The store holds a SQLite connection; ship the loaded elements instead.
+        frame = self.frame
+        header = (self.graph_id, self.version)
+        meta = (self.created_at, self.author_session, self.quality)
+        if frame is not None:
+            return GraphVersion.from_frame, (*header, frame, *meta)
+        return GraphVersion, (*header, list(self.nodes), list(self.edges), *meta)
+
+    def _rows(self, table: str, key: str, factory: Callable[..., T]) -> _PagedRows[T]:
+        return _PagedRows(self._persistence, table, key, factory, self.graph_id, self.version)
+
+    @property
+    def frame(self) -> Optional[GraphFrame]:
+        if self._frame is None and self._stored_frame:
+            self._frame = self._persistence._read_frame(self.graph_id, self.version)
+        return self._frame
+
+    @frame.setter
+    def frame(self, value: Optional[GraphFrame]) -> None:
+        self._frame = value
+        self._stored_frame = False
+
+    @property
+    def nodes(self) -> Sequence[Node]:
+        if self._nodes is None:
+            frame = self.frame
+            self._nodes = frame.nodes if frame is not None else self._rows("graph_nodes", "node_id", Node)
+        return self._nodes
+
+    @nodes.setter
+    def nodes(self, value: Sequence[Node]) -> None:
+        self._nodes = value
+
+    @property
+    def edges(self) -> Sequence[Edge]:
+        if self._edges is None:
+            frame = self.frame
+            self._edges = frame.edges if frame is not None else self._rows("graph_edges", "edge_id", Edge)
+        return self._edges
+
+    @edges.setter
+    def edges(self, value: Sequence[Edge]) -> None:
+        self._edges = value
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, GraphVersion):
+            return NotImplemented
+        return (self.graph_id, self.version, self.created_at, self.author_session, self.quality) == (
+            other.graph_id,
+            other.version,
+            other.created_at,
+            other.author_session,
+            other.quality,
+        ) and self.nodes == other.nodes and self.edges == other.edges
+
+
 class InMemorySessionStore:
     """Tracks WebSocket sessions similarly to a Redis structure."""
 
@@ -0,0 +1,65 @@
+import pytest
+
+from dataclasses import replace
+
+from benchmarks import compare, edit_stream, generate, median_result, report, run_suite
+from benchmarks.generators import GENERATORS
+from renderer.ot import CollaborationEngine
+from renderer.storage import GraphPersistence
+
+
+@pytest.mark.parametrize("kind", sorted(GENERATORS))
+def test_generators_are_seeded_and_sized(kind):
+    nodes, edges = generate(kind, 600, seed=3)
+    assert generate(kind, 600, seed=3) == (nodes, edges)
+    assert 400 <= len(nodes) + len(edges) <= 700
+    node_ids = {node.id for node in nodes}
+    assert all(edge.source in node_ids and edge.target in node_ids for edge in edges)
+
+
+def test_edit_stream_applies_without_conflicts():
+    nodes, edges = generate("scale_free", 300, seed=1)
+    persistence = GraphPersistence()
+    base = persistence.save_version("bench", nodes, edges, author_session=None)
+    engine = CollaborationEngine(persistence)
+    for operation in edit_stream(nodes, edges, 150, base.version, seed=1):
+        engine.apply("bench", operation)
+    assert engine.current_graph("bench").version == base.version + 150
+
+
+def test_suite_reports_and_flags_regressions():
+    results = run_suite(kinds=["chain"], sizes=[100], benchmarks=["quality.evaluate"], iterations=3, repeats=2)
+    assert [result.key for result in results] == ["quality.evaluate/chain/100"]
+    assert results[0].iterations == 6
+    payload = report(results)
+    assert payload["results"][0]["peak_memory_bytes"] > 0
+    assert compare(results, payload) == []
+
+    faster = report(results)
+    faster["results"][0]["p50_ms"] = results[0].p50_ms / 10
+    faster["results"][0]["throughput"] = results[0].throughput * 10
+    regressions = compare(
+        results, faster, thresholds={"p99_ms": 1e9, "peak_memory_bytes": 1e9}, noise_floor_ms=0
+    )
+    assert {regression.metric for regression in regressions} == {"p50_ms", "throughput"}
+    # Sub-millisecond timings are jitter: only memory is compared for them.
+    assert compare(results, faster, noise_floor_ms=results[0].p50_ms * 2) == []
+
+    with pytest.raises(ValueError):
+        run_suite(benchmarks=["unknown"])
+
+
+def test_median_result_ignores_one_noisy_run():
+    (result,) = run_suite(kinds=["chain"], sizes=[100], benchmarks=["quality.evaluate"], iterations=1, repeats=1)
+    noisy = replace(result, p50_ms=result.p50_ms * 50, p99_ms=result.p99_ms * 50, throughput=result.throughput / 50)
+    combined = median_result([result, noisy, result])
+    assert (combined.p50_ms, combined.p99_ms, combined.throughput) == (result.p50_ms, result.p99_ms, result.throughput)
+    assert combined.iterations == 3
+
+
+def test_compare_factors_out_host_speed():
+    (result,) = run_suite(kinds=["chain"], sizes=[100], benchmarks=["quality.evaluate"], iterations=1, repeats=1)
+    # Recorded while the host ran twice as fast as it does now.
+    baseline = report([replace(result, p50_ms=result.p50_ms / 2, throughput=result.throughput * 2)], calibration_ms=10.0)
+    assert {regression.metric for regression in compare([result], baseline, noise_floor_ms=0)} >= {"p50_ms"}
+    assert compare([result], baseline, noise_floor_ms=0, calibration_ms=20.0) == []
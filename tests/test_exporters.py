@@ -1,7 +1,11 @@
 import base64
 
+import pytest
+
 from renderer.exporters import ExportService
 from renderer.models import Edge, GraphVersion, Node
+from renderer.raster import decode_png
+from renderer.storage import GraphPersistence
 
 
 def build_version():
@@ -45,3 +49,87 @@ def test_png_generation_and_bundle():
     bundle = exporter.bundle(version)
     assert base64.b64decode(bundle["png_base64"]).startswith(b"\x89PNG")
     assert bundle["metadata"]["graph_id"] == "g1"
+
+
+def test_png_draws_nodes_and_edges():
+    version = build_version()
+    exporter = ExportService()
+    pixels = decode_png(exporter.to_png(version))
+    assert pixels.shape == (600, 800, 4)
+    painted = (pixels[:, :, :3] != 255).any(axis=2)
+    assert painted.sum() > 1000
+    # ambiguous nodes are outlined in orange
+    orange = (pixels[:, :, 0] > 200) & (pixels[:, :, 1] > 120) & (pixels[:, :, 2] < 80)
+    assert orange.any()
+
+
+def test_png_max_dimension_caps_resolution():
+    version = build_version()
+    exporter = ExportService()
+    pixels = decode_png(exporter.to_png(version, scale=4.0, max_dimension=400))
+    assert max(pixels.shape[:2]) == 400
+
+
+def test_bundle_caps_png_size():
+    nodes = [Node(id=f"n{i:03d}", label=str(i)) for i in range(200)]
+    edges = [Edge(id=f"e{i}", source=f"n{i:03d}", target=f"n{i + 1:03d}") for i in range(199)]
+    version = GraphVersion(graph_id="big", version=1, nodes=nodes, edges=edges)
+    exporter = ExportService(max_workers=0)
+    bundle = exporter.bundle(version, formats=["png"], png_max_dimension=300)
+    assert max(decode_png(base64.b64decode(bundle["png_base64"])).shape[:2]) <= 300
+    [archived] = exporter.export_many([version], formats=["png"], max_workers=1, png_max_dimension=300)
+    assert archived["png_base64"] == bundle["png_base64"]
+
+
+def test_bundle_selected_formats_only():
+    version = build_version()
+    exporter = ExportService()
+    bundle = exporter.bundle(version, formats=["mermaid"])
+    assert set(bundle) == {"mermaid", "metadata"}
+    with pytest.raises(ValueError):
+        exporter.bundle(version, formats=["gif"])
+
+
+def test_bundle_shares_layout_between_svg_and_png():
+    version = build_version()
+    exporter = ExportService()
+    calls = []
+    original = exporter.layout_engine.compute
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return original(*args, **kwargs)
+
+    exporter.layout_engine.compute = counting
+    bundle = exporter.bundle(version, formats=["svg", "png"])
+    exporter.close()
+    assert len(calls) == 1
+    assert bundle["svg"].startswith("<svg")
+    assert base64.b64decode(bundle["png_base64"]).startswith(b"\x89PNG")
+
+
+def test_export_many_preserves_order():
+    versions = [
+        GraphVersion(graph_id="g", version=index, nodes=[Node(id=f"n{index}", label="x")])
+        for index in range(1, 6)
+    ]
+    exporter = ExportService()
+    for use_processes in (False, True):
+        bundles = exporter.export_many(
+            versions, formats=["markdown", "svg"], max_workers=2, use_processes=use_processes
+        )
+        assert [b["metadata"]["version"] for b in bundles] == [1, 2, 3, 4, 5]
+        assert all(f"| n{b['metadata']['version']} |" in b["markdown"] for b in bundles)
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_export_many_in_processes_accepts_stored_history(columnar):
+    persistence = GraphPersistence(columnar=columnar)
+    nodes = [Node(id="a", label="A"), Node(id="b", label="B")]
+    for version in range(3):
+        persistence.save_version("g", nodes[: version + 1] if version < 2 else nodes, [], author_session="s")
+    bundles = ExportService().export_many(
+        persistence.history("g"), formats=["markdown"], max_workers=2, use_processes=True
+    )
+    assert [b["metadata"]["version"] for b in bundles] == [3, 2, 1]
+    assert "| b |" in bundles[0]["markdown"] and "| b |" not in bundles[2]["markdown"]
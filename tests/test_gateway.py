@@ -0,0 +1,198 @@
+import asyncio
+import threading
+
+from renderer.gateway import CollaborationGateway, LocalTransport, coalesce
+from renderer.ot import CollaborationEngine, GraphOperation, OperationType
+from renderer.storage import GraphPersistence
+
+
+def add_node(index, version, session_id="writer"):
+    return GraphOperation(
+        type=OperationType.ADD_NODE,
+        payload={"id": f"n{index}", "label": str(index)},
+        session_id=session_id,
+        version=version,
+    )
+
+
+async def drain(inbox):
+    batches = []
+    while not inbox.empty():
+        batches.append(inbox.get_nowait())
+    return batches
+
+
+def test_commits_fan_out_coalesced():
+    async def scenario():
+        engine = CollaborationEngine(GraphPersistence())
+        transport = LocalTransport()
+        gateway = CollaborationGateway(engine, transport, coalesce_window=0.05)
+        editor, viewer = transport.connect("editor"), transport.connect("viewer")
+        start = await gateway.subscribe("editor", "g")
+        assert await gateway.subscribe("viewer", "g", operations=False) == start
+        for offset in range(3):
+            await gateway.apply("g", add_node(offset, start + offset))
+        engine.apply("g", add_node(3, start + 3))  # commits outside the gateway are pushed too
+        await asyncio.sleep(0.2)
+        editor_batches, viewer_batches = await drain(editor), await drain(viewer)
+        await gateway.close()
+        return start, editor_batches, viewer_batches
+
+    start, editor_batches, viewer_batches = asyncio.run(scenario())
+    assert len(editor_batches) < 5
+    messages = coalesce(message for batch in editor_batches for message in batch)
+    assert [message["type"] for message in messages] == ["graph.version", "graph.operations"]
+    assert (messages[1]["base_version"], messages[1]["version"]) == (start, start + 4)
+    assert [op["payload"]["id"] for op in messages[1]["operations"]] == ["n0", "n1", "n2", "n3"]
+    assert viewer_batches[-1][-1]["type"] == "graph.version"
+    assert viewer_batches[-1][-1]["version"] == start + 4
+
+
+class BlockedTransport(LocalTransport):
+    def __init__(self):
+        super().__init__()
+        self.release = asyncio.Event()
+
+    async def send(self, session_id, messages):
+        await self.release.wait()
+        await super().send(session_id, messages)
+
+
+def test_slow_consumers_get_resync_instead_of_unbounded_backlog():
+    async def scenario():
+        engine = CollaborationEngine(GraphPersistence())
+        transport = BlockedTransport()
+        gateway = CollaborationGateway(engine, transport, coalesce_window=0, max_pending=4)
+        inbox = transport.connect("slow")
+        start = await gateway.subscribe("slow", "g")
+        await asyncio.sleep(0.01)  # the first batch is now stuck in send()
+        for offset in range(10):
+            await gateway.apply("g", add_node(offset, start + offset))
+        await asyncio.sleep(0.01)
+        subscriber = gateway._subscribers["slow"]
+        assert len(subscriber.pending) <= 4 and subscriber.dropped > 0
+        transport.release.set()
+        await asyncio.sleep(0.05)
+        batches = await drain(inbox)
+        await gateway.close()
+        return start, [message for batch in batches for message in batch]
+
+    start, messages = asyncio.run(scenario())
+    assert messages[0]["type"] == "graph.version"
+    assert any(message["type"] == "graph.resync" for message in messages)
+    assert messages[-1]["version"] == start + 10
+
+
+def test_local_transport_backpressure_reaches_subscriber_buffer():
+    async def scenario():
+        engine = CollaborationEngine(GraphPersistence())
+        transport = LocalTransport(maxsize=2)
+        gateway = CollaborationGateway(engine, transport, coalesce_window=0, max_pending=4)
+        inbox = transport.connect("idle")  # never read until the end
+        start = await gateway.subscribe("idle", "g")
+        for offset in range(50):
+            await gateway.apply("g", add_node(offset, start + offset))
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+        subscriber = gateway._subscribers["idle"]
+        bounded = (inbox.qsize(), len(subscriber.pending), subscriber.dropped)
+        messages = []
+        while not messages or messages[-1]["version"] != start + 50:
+            messages.extend(await asyncio.wait_for(inbox.get(), 1))
+        await gateway.close()
+        return start, bounded, messages
+
+    start, (queued, pending, dropped), messages = asyncio.run(scenario())
+    assert queued <= 2 and pending <= 4 and dropped > 0
+    assert any(message["type"] == "graph.resync" for message in messages)
+    assert messages[-1]["version"] == start + 50
+
+
+class SlowStartEngine(CollaborationEngine):
+    """Engine whose ``current_graph`` waits until ``release`` is set."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.release = threading.Event()
+        self.release.set()
+
+    def current_graph(self, graph_id):
+        self.release.wait()
+        return super().current_graph(graph_id)
+
+
+def test_commits_held_during_subscribe_are_bounded():
+    async def scenario():
+        engine = SlowStartEngine(GraphPersistence())
+        transport = LocalTransport()
+        gateway = CollaborationGateway(engine, transport, coalesce_window=0, max_pending=4)
+        inbox = transport.connect("late")
+        start = engine.current_graph("g").version
+        engine.release.clear()
+        subscribing = asyncio.create_task(gateway.subscribe("late", "g"))
+        await asyncio.sleep(0.01)  # current_graph is now blocked on the worker
+        for offset in range(10):
+            engine.apply("g", add_node(offset, start + offset))
+        await asyncio.sleep(0.01)
+        subscriber = gateway._subscribers["late"]
+        held = len(subscriber.held["g"])
+        engine.release.set()
+        assert await subscribing == start + 10
+        await asyncio.sleep(0.05)
+        batches = await drain(inbox)
+        await gateway.close()
+        return start, held, subscriber.dropped, [message for batch in batches for message in batch]
+
+    start, held, dropped, messages = asyncio.run(scenario())
+    assert held <= 4 and dropped > 0
+    assert messages[-1]["version"] == start + 10
+
+
+def test_disconnect_keeps_session_state_other_than_subscriptions():
+    async def scenario():
+        engine = CollaborationEngine(GraphPersistence())
+        transport = LocalTransport()
+        gateway = CollaborationGateway(engine, transport)
+        transport.connect("editor")
+        start = await gateway.subscribe("editor", "g")
+        await gateway.subscribe("editor", "h")
+        await gateway.apply("g", add_node(0, start, session_id="editor"))
+        await gateway.disconnect("editor")
+        await gateway.close()
+        return start, engine.sessions.get("editor"), gateway.subscribers("g")
+
+    start, session, subscribers = asyncio.run(scenario())
+    assert session == {"subscriptions": [], "graph_id": "g", "version": start + 1}
+    assert subscribers == []
+
+
+def test_load_thousands_of_subscribers():
+    subscribers, commits = 2000, 20
+
+    async def scenario():
+        engine = CollaborationEngine(GraphPersistence(), history_size=2)
+        transport = LocalTransport()
+        gateway = CollaborationGateway(engine, transport, coalesce_window=0.02)
+        inboxes = {f"s{index}": transport.connect(f"s{index}") for index in range(subscribers)}
+        starts = await asyncio.gather(
+            *(gateway.subscribe(session_id, "g", operations=index % 2 == 0) for index, session_id in enumerate(inboxes))
+        )
+        version = starts[0]
+        for offset in range(commits):
+            await gateway.apply("g", add_node(offset, version, session_id=f"s{offset}"))
+            version += 1
+        await asyncio.sleep(0.2)
+        received = {session_id: await drain(inbox) for session_id, inbox in inboxes.items()}
+        await gateway.close()
+        return starts[0], received
+
+    start, received = asyncio.run(scenario())
+    total_batches = 0
+    for batches in received.values():
+        total_batches += len(batches)
+        messages = coalesce(message for batch in batches for message in batch)
+        assert messages[-1]["version"] == start + commits
+        if messages[-1]["type"] == "graph.operations":
+            assert len(messages[-1]["operations"]) == commits
+    # One transport send per subscriber per window, not per commit.
+    assert total_batches < subscribers * (commits + 1) / 2
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+from renderer.exporters import ExportService
+from renderer.layout import (
+    AutoLayout,
+    ForceDirectedLayout,
+    LayeredLayout,
+    barnes_hut_repulsion,
+    get_layout_engine,
+)
+from renderer.models import Edge, GraphVersion, Node
+
+
+def chain(count):
+    nodes = [Node(id=f"n{i}", label=str(i)) for i in range(count)]
+    edges = [Edge(id=f"e{i}", source=f"n{i}", target=f"n{i + 1}") for i in range(count - 1)]
+    return nodes, edges
+
+
+def test_layered_layout_orders_layers_left_to_right():
+    nodes, edges = chain(4)
+    edges.append(Edge(id="skip", source="n0", target="n3"))
+    layout = LayeredLayout().compute(nodes, edges)
+    xs = [layout.positions[f"n{i}"][0] for i in range(4)]
+    assert xs == sorted(xs) and len(set(xs)) == 4
+    assert set(layout.positions) == {node.id for node in nodes}
+
+
+def test_layered_layout_handles_cycles():
+    nodes, edges = chain(3)
+    edges.append(Edge(id="back", source="n2", target="n0"))
+    layout = LayeredLayout().compute(nodes, edges)
+    assert len(layout.positions) == 3
+
+
+def test_canvas_grows_with_graph():
+    small = ForceDirectedLayout().compute(*chain(3))
+    large = ForceDirectedLayout().compute(*chain(400))
+    assert (small.width, small.height) == (800.0, 600.0)
+    assert large.width > 800 and large.height > 600
+    for x, y in large.positions.values():
+        assert 0 < x < large.width and 0 < y < large.height
+
+
+def test_barnes_hut_matches_direct_sum():
+    positions = np.random.default_rng(3).uniform(0, 500, size=(200, 2))
+    delta = positions[:, None, :] - positions[None, :, :]
+    distance_sq = (delta**2).sum(axis=2)
+    np.fill_diagonal(distance_sq, np.inf)
+    exact = (delta / distance_sq[:, :, None]).sum(axis=1)
+    assert np.allclose(barnes_hut_repulsion(positions, 1.0, theta=0.0), exact)
+    approx = barnes_hut_repulsion(positions, 1.0, theta=0.5)
+    error = np.linalg.norm(approx - exact, axis=1) / np.linalg.norm(exact, axis=1)
+    assert np.median(error) < 0.05
+
+
+def test_force_layout_warm_start_keeps_positions():
+    nodes, edges = chain(30)
+    engine = ForceDirectedLayout()
+    first = engine.compute(nodes, edges)
+    nodes.append(Node(id="extra", label="extra"))
+    edges.append(Edge(id="x", source="n5", target="extra"))
+    second = engine.compute(nodes, edges, previous=first)
+    drift = max(
+        abs(first.positions[node_id][0] - second.positions[node_id][0])
+        + abs(first.positions[node_id][1] - second.positions[node_id][1])
+        for node_id in first.positions
+    )
+    assert drift < 40
+    assert "extra" in second.positions
+
+
+def test_layered_layout_warm_start_keeps_positions():
+    nodes = [Node(id=f"n{i}", label=str(i)) for i in range(40)]
+    edges = [Edge(id=f"e{i}", source=f"n{i // 3}", target=f"n{i}") for i in range(1, 40)]
+    engine = LayeredLayout()
+    first = engine.compute(nodes, edges)
+    nodes.append(Node(id="extra", label="extra"))
+    edges.append(Edge(id="x", source="n2", target="extra"))
+    second = engine.compute(nodes, edges, previous=first)
+    assert all(second.positions[node_id] == point for node_id, point in first.positions.items())
+    assert "extra" in second.positions
+    assert second.positions["extra"][0] > second.positions["n2"][0]
+    assert second.positions["extra"] not in first.positions.values()
+
+
+def test_layered_layout_wraps_wide_layers():
+    nodes = [Node(id="hub", label="hub")] + [Node(id=f"leaf{i}", label=str(i)) for i in range(2000)]
+    edges = [Edge(id=f"e{i}", source="hub", target=f"leaf{i}") for i in range(2000)]
+    layout = LayeredLayout().compute(nodes, edges)
+    assert layout.height < 10_000 and layout.width < 10_000
+    assert len(set(layout.positions.values())) == len(nodes)
+
+
+def test_auto_layout_picks_engine_by_acyclicity():
+    auto = AutoLayout()
+    nodes, edges = chain(3)
+    layered = auto.compute(nodes, edges)
+    assert layered.positions == LayeredLayout().compute(nodes, edges).positions
+    edges.append(Edge(id="back", source="n2", target="n0"))
+    forced = auto.compute(nodes, edges)
+    assert forced.positions == ForceDirectedLayout().compute(nodes, edges).positions
+
+
+def test_exporter_warm_start_reuses_previous_layout():
+    nodes, edges = chain(5)
+    exporter = ExportService(layout="force", warm_start=True)
+    first = exporter.layout(GraphVersion(graph_id="g", version=1, nodes=nodes, edges=edges))
+    assert exporter.layout(GraphVersion(graph_id="g", version=1, nodes=nodes, edges=edges)) is first
+    second = exporter.layout(
+        GraphVersion(graph_id="g", version=2, nodes=nodes + [Node(id="x", label="x")], edges=edges)
+    )
+    assert abs(second.positions["n0"][0] - first.positions["n0"][0]) < 20
+
+
+def test_unknown_layout_rejected():
+    with pytest.raises(ValueError):
+        get_layout_engine("spiral")
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from renderer.exporters import ExportService
+from renderer.lod import GridIndex, LodScene, cluster_communities, cluster_components
+from renderer.models import Edge, GraphVersion, Node
+
+
+def two_cliques():
+    nodes = [Node(id=f"{side}{i}", label=side) for side in "ab" for i in range(5)]
+    edges = [
+        Edge(id=f"{side}{i}-{j}", source=f"{side}{i}", target=f"{side}{j}")
+        for side in "ab"
+        for i in range(5)
+        for j in range(i + 1, 5)
+    ]
+    return nodes, edges
+
+
+def test_grid_index_matches_brute_force():
+    rng = np.random.default_rng(7)
+    corners = rng.uniform(0, 5000, size=(500, 2))
+    sizes = rng.uniform(1, 400, size=(500, 2))
+    boxes = np.concatenate([corners, corners + sizes], axis=1)
+    boxes[0] = (0, 0, 5000, 5000)
+    index = GridIndex(boxes, cell_size=256)
+    for query in [(100, 100, 900, 700), (4000, 0, 6000, 300), (-50, -50, -10, -10)]:
+        x0, y0, x1, y1 = query
+        expected = np.nonzero(
+            (boxes[:, 0] <= x1) & (boxes[:, 2] >= x0) & (boxes[:, 1] <= y1) & (boxes[:, 3] >= y0)
+        )[0]
+        assert index.query(query).tolist() == expected.tolist()
+    # Unbounded viewports are clamped to the grid instead of allocating per row.
+    assert index.query((-1e15, -1e15, 1e15, 1e15)).tolist() == list(range(500))
+
+
+def test_clustering_separates_components_and_communities():
+    nodes, edges = two_cliques()
+    components = cluster_components(nodes, edges)
+    assert len(set(components[:5])) == 1 and components[0] != components[5]
+    edges.append(Edge(id="bridge", source="a0", target="b0"))
+    assert len(set(cluster_components(nodes, edges))) == 1
+    communities = cluster_communities(nodes, edges)
+    assert len(set(communities[:5])) == 1 and len(set(communities[5:])) == 1
+    assert communities[0] != communities[5]
+
+
+def test_viewport_and_tiles_follow_zoom():
+    nodes, edges = two_cliques()
+    version = GraphVersion(graph_id="g", version=1, nodes=nodes, edges=edges)
+    exporter = ExportService(layout="circular")
+    scene = exporter.lod_scene(version)
+    assert len(scene.levels["components"]) == 2
+
+    overview = exporter.to_svg_viewport(version, (0, 0, scene.width, scene.height), zoom=0.01)
+    assert 'data-level="components"' in overview
+    assert overview.count('class="cluster"') == 2
+
+    full = exporter.to_svg_viewport(version, (0, 0, scene.width, scene.height), zoom=1.0)
+    assert full.count('<g id="node-') == 10
+
+    layout = exporter.layout(version)
+    x, y = layout.positions["a0"]
+    detail = exporter.to_svg_viewport(version, (x - 5, y - 5, x + 5, y + 5), zoom=2.0)
+    assert '<g id="node-a0">' in detail
+    assert detail.count('<g id="node-') < 10
+
+    columns, rows = scene.tile_grid(1.0, tile_size=256)
+    tiles = [exporter.to_svg_tile(version, 1.0, c, r, tile_size=256) for c in range(columns) for r in range(rows)]
+    assert any('<g id="node-a0">' in tile for tile in tiles)
+    with pytest.raises(ValueError):
+        exporter.to_svg_tile(version, 1.0, columns, 0, tile_size=256)
+    with pytest.raises(ValueError, match="zoom must be positive"):
+        exporter.to_svg_tile(version, 0, 0, 0)
+
+
+def test_summary_levels_stay_bounded_for_tree_like_graphs():
+    nodes = [Node(id=f"n{i:04d}", label=str(i)) for i in range(3000)]
+    edges = [Edge(id=f"e{i:04d}", source=f"n{(i - 1) // 2:04d}", target=f"n{i:04d}") for i in range(1, 3000)]
+    version = GraphVersion(graph_id="tree", version=1, nodes=nodes, edges=edges)
+    exporter = ExportService(layout="circular")
+    layout = exporter.layout(version)
+    edge_elements, node_elements = exporter.svg_elements(version, layout)
+    scene = LodScene.build(version, layout, edge_elements, node_elements, max_clusters=100)
+    communities = scene.levels["communities"]
+    summary_nodes = [element for element in communities.element_ids if "-edge-" not in element]
+    assert len(summary_nodes) <= 100
+    assert len(communities) <= 300
+    assert len(scene.levels["full"]) == len(nodes) + len(edges)
@@ -0,0 +1,107 @@
+import time
+
+import pytest
+
+from renderer.exporters import ExportService
+from renderer.metrics import REGISTRY, MetricsRegistry, SamplingProfiler
+from renderer.ot import CollaborationEngine, GraphOperation, OperationConflict, OperationType
+from renderer.storage import GraphPersistence
+
+
+@pytest.fixture
+def registry():
+    REGISTRY.reset()
+    REGISTRY.enable()
+    try:
+        yield REGISTRY
+    finally:
+        REGISTRY.disable()
+        REGISTRY.disable_profiling()
+        REGISTRY.reset()
+
+
+def _add_node(engine, node_id, version):
+    return engine.apply(
+        "g",
+        GraphOperation(type=OperationType.ADD_NODE, payload={"id": node_id, "label": node_id}, session_id="s", version=version),
+    )
+
+
+def test_disabled_registry_records_nothing():
+    assert not REGISTRY.enabled
+    assert REGISTRY.timed("anything") is REGISTRY.timed("other")
+    engine = CollaborationEngine(GraphPersistence())
+    _add_node(engine, "a", engine.current_graph("g").version)
+    assert REGISTRY.snapshot()["counters"] == {}
+    assert REGISTRY.to_prometheus() == ""
+
+
+def test_hot_paths_are_instrumented(registry):
+    engine = CollaborationEngine(GraphPersistence())
+    version = _add_node(engine, "a", engine.current_graph("g").version)
+    version = _add_node(engine, "b", version.version)
+    with pytest.raises(OperationConflict):
+        _add_node(engine, "c", version.version - 1)
+    ExportService().bundle(version, formats=("mermaid", "svg"))
+
+    snapshot = registry.snapshot()
+    counters, histograms = snapshot["counters"], snapshot["histograms"]
+    assert counters["renderer_ot_operations_total"] == {'{type="add_node"}': 2.0}
+    assert counters["renderer_ot_conflicts_total"] == {"": 1.0}
+    assert counters["renderer_storage_rows_written_total"]['{table="graph_nodes"}'] == 3.0
+    assert counters["renderer_storage_bytes_serialized_total"][""] > 0
+    assert histograms["renderer_ot_apply_seconds"]['{method="apply"}']["count"] == 3
+    assert set(histograms["renderer_ot_stage_seconds"]) >= {
+        '{stage="load"}',
+        '{stage="transform"}',
+        '{stage="quality"}',
+        '{stage="save"}',
+    }
+    assert '{statement="select",table="graph_versions"}' in histograms["renderer_storage_query_seconds"]
+    assert histograms["renderer_quality_evaluate_seconds"]['{input="objects"}']["count"] == 2
+    assert set(histograms["renderer_export_seconds"]) == {'{format="mermaid"}', '{format="svg"}'}
+
+    text = registry.to_prometheus()
+    assert "# TYPE renderer_ot_apply_seconds histogram" in text
+    assert 'renderer_ot_apply_seconds_bucket{method="apply",le="+Inf"} 3' in text
+    assert 'renderer_ot_operations_total{type="add_node"} 2' in text
+
+
+def test_histogram_quantiles_and_type_conflicts():
+    local = MetricsRegistry(enabled=True)
+    for value in (0.001, 0.002, 0.003, 0.2):
+        local.observe("latency", value)
+    histogram = local.histogram("latency")
+    assert 0.001 <= histogram.quantile(0.5) <= 0.0025
+    assert 0.1 <= histogram.quantile(0.99) <= 0.25
+    with pytest.raises(ValueError):
+        local.counter("latency")
+
+
+def test_profiler_samples_slow_operations(registry):
+    seen = []
+    registry.enable_profiling(threshold=0.02, interval=0.002, callback=seen.append)
+    with registry.timed("fast"):
+        pass
+    with registry.timed("slow", {"kind": "sleep"}):
+        time.sleep(0.15)
+    assert [operation.name for operation in seen] == ["slow"]
+    slow = registry.slow_operations()[0]
+    assert slow.labels == {"kind": "sleep"} and slow.duration >= 0.15
+    assert slow.samples and "test_profiler_samples_slow_operations" in slow.top_stacks(1)[0][0]
+
+
+def test_profiler_stops_sampling_operations_once_they_end():
+    profiler = SamplingProfiler(threshold=0, interval=0.0002)
+    ended = []
+    try:
+        for _ in range(200):
+            operation = profiler.begin("op", ())
+            time.sleep(0.0005)
+            profiler.end(operation, 1.0)
+            ended.append(operation)
+        time.sleep(0.01)
+    finally:
+        profiler.stop()
+    assert len(profiler.slow) == 50
+    assert [dict(operation.samples) for operation in ended[-50:]] == [slow.samples for slow in profiler.slow]
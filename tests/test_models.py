@@ -0,0 +1,90 @@
+from array import array
+
+from renderer.exporters import ExportService
+from renderer.models import Edge, GraphFrame, GraphVersion, Node, edge_columns, node_columns
+from renderer.quality import QualityAnalyzer
+
+
+def _elements():
+    nodes = [
+        Node(id="a", label="Start", trust=0.9),
+        Node(id="b", label="Middle", ambiguous=True, trust=0.4),
+        Node(id="c", label="Start", trust=0.7),
+        Node(id="d", label="Alone"),
+    ]
+    edges = [
+        Edge(id="e1", source="a", target="b", label="next"),
+        Edge(id="e2", source="b", target="c", weight=2.5),
+        Edge(id="e3", source="c", target="a"),
+        Edge(id="e4", source="c", target="ghost"),
+    ]
+    return nodes, edges
+
+
+def test_frame_columns_and_lazy_views():
+    nodes, edges = _elements()
+    frame = GraphFrame.from_elements(nodes, edges)
+    assert isinstance(frame.trust, array) and frame.trust.typecode == "d"
+    assert frame.labels.count("Start") == 1
+    assert frame.edge_sources.tolist()[:3] == [0, 1, 2]
+    assert frame.endpoint_id(frame.edge_targets[3]) == "ghost"
+    assert frame.ambiguous_flags() == [False, True, False, False]
+    assert list(frame.nodes) == nodes
+    assert list(frame.edges) == edges
+    assert frame.nodes[-1] == nodes[-1]
+    assert frame.edges[1:3] == edges[1:3]
+    assert node_columns(frame.nodes).labels == [node.label for node in nodes]
+    assert edge_columns(frame.edges).targets == [edge.target for edge in edges]
+
+
+def test_frame_round_trips_through_bytes_and_dict():
+    nodes, edges = _elements()
+    frame = GraphFrame.from_elements(nodes, edges)
+    decoded = GraphFrame.from_bytes(frame.to_bytes())
+    assert list(decoded.nodes) == nodes and list(decoded.edges) == edges
+
+    version = GraphVersion.from_frame("g", 3, frame)
+    restored = GraphVersion.from_dict(version.to_dict(columnar=True))
+    assert restored.frame is not None
+    assert list(restored.nodes) == nodes and list(restored.edges) == edges
+    assert GraphVersion.from_dict(version.to_dict()).nodes == nodes
+
+
+def test_frame_backed_versions_match_object_versions():
+    nodes, edges = _elements()
+    objects = GraphVersion(graph_id="g", version=1, nodes=nodes, edges=edges)
+    columnar = GraphVersion.from_frame("g", 1, objects.to_frame(), created_at=objects.created_at)
+
+    analyzer = QualityAnalyzer()
+    expected = analyzer.evaluate(objects.nodes, objects.edges)
+    report = analyzer.evaluate(columnar.nodes, columnar.edges)
+    assert report.ambiguous_nodes == expected.ambiguous_nodes == ["b"]
+    assert report.isolated_nodes == expected.isolated_nodes == ["d"]
+    assert report.trust_summary == expected.trust_summary
+    assert [sorted(cycle[:-1]) for cycle in report.cycles] == [["a", "b", "c"]]
+
+    exporter = ExportService()
+    assert exporter.to_mermaid(columnar) == exporter.to_mermaid(objects)
+    assert exporter.to_markdown(columnar) == exporter.to_markdown(objects)
+    assert exporter.to_svg(columnar) == exporter.to_svg(objects)
+
+
+def test_frame_cycle_detection_handles_long_chains():
+    count = 5000
+    nodes = [Node(id=f"n{i}", label=str(i)) for i in range(count)]
+    edges = [Edge(id=f"e{i}", source=f"n{i}", target=f"n{(i + 1) % count}") for i in range(count)]
+    report = QualityAnalyzer().evaluate_frame(GraphFrame.from_elements(nodes, edges))
+    assert len(report.cycles) == 1 and len(report.cycles[0]) == count + 1
+
+
+def test_frame_round_trips_unlabeled_edges_and_exposes_arrays():
+    nodes = [Node(id="a", label="A", trust=0.25, ambiguous=True), Node(id="b", label="")]
+    edges = [Edge(id="e1", source="a", target="b", label=None), Edge(id="e2", source="b", target="a", label="")]
+    frame = GraphFrame.from_elements(nodes, edges)
+    assert list(frame.edges) == edges
+    assert list(GraphFrame.from_bytes(frame.to_bytes()).edges) == edges
+    assert list(GraphFrame.from_columns(frame.to_columns()).edges) == edges
+    assert edge_columns(frame.edges).labels == [None, ""]
+    assert frame.edge_source_array().tolist() == [0, 1]
+    assert frame.trust_array().tolist() == [0.25, 1.0]
+    assert frame.ambiguous_array().tolist() == [True, False]
@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 from renderer.ot import CollaborationEngine, GraphOperation, OperationConflict, OperationType
@@ -75,3 +77,85 @@ def test_bulk_apply():
     assert final_version.version == base_version.version + 1
     assert len(final_version.nodes) == 2
     assert final_version.quality["isolated_nodes"] == []
+
+
+def test_history_versions_share_structure():
+    engine = CollaborationEngine(GraphPersistence(), history_size=3)
+    version = engine.current_graph("g5").version
+    for index in range(4):
+        op = GraphOperation(
+            type=OperationType.ADD_NODE,
+            payload={"id": f"n{index}", "label": str(index)},
+            session_id="s5",
+            version=version,
+        )
+        version = engine.apply("g5", op).version
+    edge = GraphOperation(
+        type=OperationType.ADD_EDGE,
+        payload={"id": "e1", "source": "n0", "target": "n1"},
+        session_id="s5",
+        version=version,
+    )
+    with_edge = engine.apply("g5", edge)
+    removed = engine.apply(
+        "g5",
+        GraphOperation(
+            type=OperationType.REMOVE_NODE,
+            payload={"id": "n1"},
+            session_id="s5",
+            version=with_edge.version,
+        ),
+    )
+
+    recent = engine.recent_versions("g5")
+    assert [v.version for v in recent] == [removed.version - 2, with_edge.version, removed.version]
+    assert [node.id for node in removed.nodes] == ["n0", "n2", "n3"]
+    assert list(removed.edges) == []
+    assert with_edge.nodes[0] is removed.nodes[0]
+    assert engine.current_graph("g5") is removed
+    assert [node.id for node in engine.persistence.load_version("g5", removed.version).nodes] == ["n0", "n2", "n3"]
+
+
+def test_concurrent_applies_keep_history_consistent():
+    engine = CollaborationEngine(GraphPersistence(), history_size=4)
+    engine.current_graph("g7")
+
+    def add(index):
+        while True:
+            op = GraphOperation(
+                type=OperationType.ADD_NODE,
+                payload={"id": f"n{index:02d}", "label": str(index)},
+                session_id=f"s{index}",
+                version=engine.current_graph("g7").version,
+            )
+            try:
+                return engine.apply("g7", op).version
+            except OperationConflict:
+                continue
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        versions = sorted(pool.map(add, range(40)))
+
+    assert versions == list(range(versions[0], versions[0] + 40))
+    recent = engine.recent_versions("g7")
+    assert [version.version for version in recent] == versions[-4:]
+    assert [node.id for node in recent[-1].nodes] == [f"n{index:02d}" for index in range(40)]
+
+
+def test_failing_commit_listener_does_not_fail_apply(caplog):
+    engine = build_engine()
+    base = engine.current_graph("g6")
+    seen = []
+
+    def broken(*args):
+        raise RuntimeError("listener bug")
+
+    engine.add_commit_listener(broken)
+    engine.add_commit_listener(lambda graph_id, old, new, ops: seen.append(new.version))
+    stored = engine.apply(
+        "g6",
+        GraphOperation(type=OperationType.ADD_NODE, payload={"id": "a", "label": "A"}, session_id="s1", version=base.version),
+    )
+    assert seen == [stored.version]
+    assert engine.current_graph("g6").version == stored.version
+    assert "listener bug" in caplog.text
@@ -0,0 +1,129 @@
+from renderer.exporters import ExportService
+from renderer.ot import CollaborationEngine, GraphOperation, OperationType
+from renderer.patches import apply_keyed, apply_lines, diff_lines
+from renderer.storage import GraphPersistence
+
+
+def grow_graph(engine, graph_id, count):
+    version = engine.current_graph(graph_id)
+    for index in range(count):
+        version = engine.apply(
+            graph_id,
+            GraphOperation(
+                type=OperationType.ADD_NODE,
+                payload={"id": f"n{index:03d}", "label": f"Node {index}"},
+                session_id="s1",
+                version=version.version,
+            ),
+        )
+        if index:
+            version = engine.apply(
+                graph_id,
+                GraphOperation(
+                    type=OperationType.ADD_EDGE,
+                    payload={"id": f"e{index:03d}", "source": f"n{index - 1:03d}", "target": f"n{index:03d}"},
+                    session_id="s1",
+                    version=version.version,
+                ),
+            )
+    return version
+
+
+def test_engine_listener_patches_reproduce_target_exports():
+    engine = CollaborationEngine(GraphPersistence())
+    exporter = ExportService(layout="force", warm_start=True)
+    base = grow_graph(engine, "g", 40)
+    exporter.to_svg(base)
+
+    patches = []
+    engine.add_commit_listener(lambda graph_id, old, new, ops: patches.append((old, new, exporter.patch(old, new))))
+    engine.apply(
+        "g",
+        GraphOperation(
+            type=OperationType.UPDATE_NODE,
+            payload={"id": "n010", "label": "Renamed", "ambiguous": True},
+            session_id="s2",
+            version=base.version,
+        ),
+    )
+    old, new, patch = patches[-1]
+    assert (patch.base_version, patch.version) == (base.version, base.version + 1)
+
+    base_edges, base_nodes = exporter.svg_elements(old)
+    target_edges, target_nodes = exporter.svg_elements(new)
+    assert apply_keyed(base_nodes, patch.svg, "nodes") == target_nodes
+    assert apply_keyed(base_edges, patch.svg, "edges") == target_edges
+    assert len(patch.svg) < 10
+
+    assert apply_lines(exporter.mermaid_lines(old), patch.mermaid) == exporter.mermaid_lines(new)
+    old_nodes, old_edges = exporter.markdown_rows(old)
+    new_nodes, new_edges = exporter.markdown_rows(new)
+    assert apply_keyed(old_nodes, patch.markdown, "nodes") == new_nodes
+    assert apply_keyed(old_edges, patch.markdown, "edges") == new_edges
+    assert [op["op"] for op in patch.markdown] == ["update"]
+
+
+def test_patch_for_removed_node_drops_its_edges():
+    engine = CollaborationEngine(GraphPersistence())
+    exporter = ExportService(layout="layered", warm_start=True)
+    base = grow_graph(engine, "g", 3)
+    new = engine.apply(
+        "g",
+        GraphOperation(type=OperationType.REMOVE_NODE, payload={"id": "n002"}, session_id="s1", version=base.version),
+    )
+    patch = exporter.patch(base, new)
+    removed = {op["id"] for op in patch.svg if op["op"] == "remove"}
+    assert removed == {"node-n002", "edge-e002"}
+    assert exporter.patch(new, new).is_empty
+
+
+def test_small_edit_on_large_graph_gives_small_svg_patch():
+    from renderer.models import Edge, GraphVersion, Node
+
+    nodes = [Node(id=f"n{i:03d}", label=str(i)) for i in range(300)]
+    edges = [Edge(id=f"e{i:03d}", source=f"n{i // 4:03d}", target=f"n{i:03d}") for i in range(1, 300)]
+    base = GraphVersion(graph_id="g", version=1, nodes=nodes, edges=edges)
+    target = GraphVersion(
+        graph_id="g",
+        version=2,
+        nodes=nodes + [Node(id="new", label="new")],
+        edges=edges + [Edge(id="e-new", source="n010", target="new")],
+    )
+    for exporter in (ExportService(), ExportService(layout="force")):
+        patch = exporter.patch(base, target)
+        # Bounded by the touched nodes' degree, not by the graph size.
+        assert len(patch.svg) <= 10
+        assert {op["id"] for op in patch.svg if op["op"] == "add"} == {"node-new", "edge-e-new"}
+
+
+def test_chained_patches_keep_client_in_sync_without_warm_start():
+    from renderer.models import Edge, GraphVersion, Node
+
+    nodes = [Node(id=f"n{i:02d}", label=str(i)) for i in range(60)]
+    edges = [Edge(id=f"e{i:02d}", source=f"n{i // 3:02d}", target=f"n{i:02d}") for i in range(1, 60)]
+    v1 = GraphVersion(graph_id="g", version=1, nodes=nodes, edges=edges)
+    v2 = GraphVersion(
+        graph_id="g",
+        version=2,
+        nodes=nodes + [Node(id="x", label="x")],
+        edges=edges + [Edge(id="ex", source="n05", target="x")],
+    )
+    v3 = GraphVersion(graph_id="g", version=3, nodes=v2.nodes + [Node(id="y", label="y")], edges=v2.edges)
+    for layout in ("auto", "layered", "force"):
+        exporter = ExportService(layout=layout)
+        client_edges, client_nodes = exporter.svg_elements(v1)
+        for base, target in ((v1, v2), (v2, v3)):
+            patch = exporter.patch(base, target)
+            client_edges = apply_keyed(client_edges, patch.svg, "edges")
+            client_nodes = apply_keyed(client_nodes, patch.svg, "nodes")
+            assert (client_edges, client_nodes) == exporter.svg_elements(target)
+            assert len(patch.svg) <= 10
+        document = exporter.to_svg(v3)
+        assert all(element in document for element in [*client_edges.values(), *client_nodes.values()])
+
+
+def test_diff_lines_roundtrip():
+    base = ["a", "b", "c", "d"]
+    target = ["a", "x", "c", "d", "e"]
+    assert apply_lines(base, diff_lines(base, target)) == target
+    assert diff_lines(base, base) == []
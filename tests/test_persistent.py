@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+from renderer.persistent import PersistentSortedMap
+
+
+def test_matches_dict_under_random_edits():
+    rng = random.Random(7)
+    reference = {}
+    current = PersistentSortedMap()
+    snapshots = []
+    for step in range(3000):
+        key = f"k{rng.randrange(400):03d}"
+        if rng.random() < 0.35:
+            reference.pop(key, None)
+            current = current.remove(key)
+        else:
+            reference[key] = step
+            current = current.set(key, step)
+        if step % 500 == 0:
+            snapshots.append((dict(reference), current))
+    assert list(current.items()) == sorted(reference.items())
+    assert len(current) == len(reference)
+    for expected, snapshot in snapshots:
+        assert dict(snapshot.items()) == expected
+    values = current.values()
+    assert [values[index] for index in range(len(values))] == list(values)
+    assert values[-1] == current[max(reference)]
+    with pytest.raises(IndexError):
+        values[len(values)]
+
+
+def test_updates_share_untouched_subtrees():
+    base = PersistentSortedMap((f"n{index:05d}", index) for index in range(10000))
+    updated = base.set("n00042", -1)
+    assert base["n00042"] == 42 and updated["n00042"] == -1
+    assert updated.remove("missing") is updated
+    assert updated.set("n00042", updated["n00042"]) is updated
+    assert base._root.left is not updated._root.left
+    assert base._root.right is updated._root.right
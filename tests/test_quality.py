@@ -19,3 +19,12 @@ def test_quality_metrics():
     assert any(cycle[0] == "n1" for cycle in report.cycles)
     assert report.trust_summary["min"] == 0.4
     assert report.trust_summary["count"] == 3.0
+
+
+def test_cycle_detection_handles_long_chains():
+    count = 5000
+    nodes = [Node(id=f"n{i:04d}", label=str(i)) for i in range(count)]
+    edges = [Edge(id=f"e{i}", source=f"n{i:04d}", target=f"n{i + 1:04d}") for i in range(count - 1)]
+    edges.append(Edge(id="back", source=f"n{count - 1:04d}", target="n0000"))
+    report = QualityAnalyzer().evaluate(nodes, edges)
+    assert len(report.cycles) == 1 and len(report.cycles[0]) == count + 1
@@ -0,0 +1,39 @@
+import io
+
+import numpy as np
+
+from renderer.models import Edge, Node
+from renderer.raster import PngRasterizer, decode_png, encode_png, text_mask
+
+
+def render(band_height):
+    nodes = [
+        Node(id="a", label="Alpha", trust=0.5),
+        Node(id="b", label="Beta", ambiguous=True),
+        Node(id="c", label="Gamma"),
+    ]
+    edges = [
+        Edge(id="e1", source="a", target="b", label="next"),
+        Edge(id="e2", source="b", target="c"),
+        Edge(id="e3", source="c", target="missing"),
+    ]
+    positions = {"a": (40.0, 40.0), "b": (160.0, 110.0), "c": (60.0, 170.0)}
+    stream = io.BytesIO()
+    PngRasterizer(200, 200, band_height=band_height).render(nodes, edges, positions, stream)
+    return decode_png(stream.getvalue())
+
+
+def test_banded_rendering_matches_single_pass():
+    assert np.array_equal(render(7), render(512))
+
+
+def test_encode_decode_roundtrip():
+    pixels = np.random.default_rng(1).integers(0, 256, size=(5, 9, 4), dtype=np.uint8)
+    assert np.array_equal(decode_png(encode_png(pixels)), pixels)
+
+
+def test_text_mask_dimensions():
+    mask = text_mask("ab", 2)
+    assert mask.shape == (14, 22)
+    assert mask.any()
+    assert text_mask("あ", 1).any()
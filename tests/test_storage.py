@@ -1,7 +1,11 @@
+import dataclasses
 import os
+import pickle
 import tempfile
 
-from renderer.models import Edge, Node
+import pytest
+
+from renderer.models import Edge, GraphVersion, Node
 from renderer.storage import GraphPersistence
 
 
@@ -35,3 +39,76 @@ def test_prune_removes_old_versions():
     persistence.prune("g", keep_last=3)
     history = persistence.history("g")
     assert [v.version for v in history] == [6, 5, 4]
+
+
+def test_columnar_versions_round_trip():
+    persistence = GraphPersistence(columnar=True)
+    nodes = [Node(id="n1", label="Root", trust=0.5), Node(id="n2", label="Child", ambiguous=True)]
+    edges = [Edge(id="e1", source="n1", target="n2", label="connects", weight=3.0)]
+    saved = persistence.save_version("graph", nodes, edges, author_session="s1")
+    assert saved.frame is not None
+
+    loaded = persistence.load_version("graph", 1)
+    assert loaded.frame is not None
+    assert list(loaded.nodes) == nodes
+    assert list(loaded.edges) == edges
+
+    row_store = GraphPersistence()
+    copied = row_store.save_version("graph", loaded.nodes, loaded.edges, author_session="s2")
+    assert row_store.load_version("graph", copied.version).nodes == nodes
+
+
+def test_loaded_versions_read_elements_on_demand():
+    persistence = GraphPersistence(page_size=4)
+    nodes = [Node(id=f"n{i:02d}", label=str(i)) for i in range(10)]
+    edges = [Edge(id=f"e{i:02d}", source=f"n{i:02d}", target=f"n{i + 1:02d}") for i in range(9)]
+    persistence.save_version("graph", nodes, edges, author_session="s1", quality={"score": 1.0})
+    statements = []
+    persistence._conn.set_trace_callback(statements.append)
+
+    latest = persistence.latest_version("graph")
+    assert (latest.version, latest.quality) == (1, {"score": 1.0})
+    assert len([sql for sql in statements if sql.lstrip().startswith("SELECT")]) == 1
+
+    statements.clear()
+    assert latest.nodes[5] == nodes[5]
+    assert list(latest.nodes) == nodes
+    assert latest.nodes[-1] == nodes[-1] and len(latest.nodes) == 10
+    # Page 1 by offset, a COUNT for list(), then pages 0 and 2 by key.
+    assert len([sql for sql in statements if "FROM graph_nodes" in sql]) == 4
+    assert not any("FROM graph_edges" in sql for sql in statements)
+    assert latest.edges == edges
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_pruned_versions_fail_consistently_when_read(columnar):
+    persistence = GraphPersistence(columnar=columnar)
+    nodes = [Node(id="n1", label="Root")]
+    for _ in range(3):
+        persistence.save_version("g", nodes, [], author_session="s")
+    stale = persistence.load_version("g", 1)
+    persistence.prune("g", keep_last=1)
+    with pytest.raises(KeyError, match="graph g version 1 does not exist"):
+        list(stale.nodes)
+    with pytest.raises(KeyError, match="graph g version 1 does not exist"):
+        len(stale.edges)
+    # An existing version without edges still reads as empty.
+    assert list(persistence.load_version("g", 3).edges) == []
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_loaded_versions_replace_and_pickle_as_plain_versions(columnar):
+    persistence = GraphPersistence(columnar=columnar)
+    nodes = [Node(id="n1", label="Root"), Node(id="n2", label="Child")]
+    edges = [Edge(id="e1", source="n1", target="n2", label=None)]
+    persistence.save_version("g", nodes, edges, author_session="s", quality={"score": 1})
+    loaded = persistence.load_version("g", 1)
+
+    replaced = dataclasses.replace(loaded, quality={})
+    assert replaced.quality == {} and loaded.quality == {"score": 1}
+    assert list(replaced.nodes) == nodes and list(replaced.edges) == edges
+
+    restored = pickle.loads(pickle.dumps(persistence.load_version("g", 1)))
+    assert type(restored) is GraphVersion
+    assert restored == loaded
+    assert (restored.frame is not None) == columnar